@@ -14,6 +14,7 @@ from safety_manager import SafetyManager
 from error_handler import ErrorHandler, ErrorCategory, ErrorSeverity
 from monitoring import MonitoringSystem
 from websocket_manager import WebSocketManager
+from route_stats import RouteStatsStore
 from config import TRADING_CONFIG, RISK_CONFIG, PERFORMANCE_CONFIG, LOGGING_CONFIG
 
 logger = logging.getLogger(__name__)
@@ -44,13 +45,16 @@ class Trade:
     error_message: Optional[str] = None
 
 class TradingEngine:
-    def __init__(self, exchange_manager: ExchangeManager, safety_manager: SafetyManager, error_handler: ErrorHandler, monitoring_system: MonitoringSystem):
+    def __init__(self, exchange_manager: ExchangeManager, safety_manager: SafetyManager, error_handler: ErrorHandler, monitoring_system: MonitoringSystem,
+                 route_stats: Optional[RouteStatsStore] = None):
         self.exchange_manager = exchange_manager
         self.safety_manager = safety_manager
         self.error_handler = error_handler
         self.monitoring_system = monitoring_system
         self.active_trades: Dict[str, Trade] = {}
         self.completed_trades: List[Trade] = []
+        self.in_flight_routes: Dict[Tuple, str] = {} # route_key -> id of the trade working it; one trade per route at a time
+        self.route_stats = route_stats # Per-route fill and profit history, fed back into opportunity scoring
         self.trading_enabled = True
         self.total_trades = 0
         self.successful_trades = 0
@@ -72,6 +76,20 @@ class TradingEngine:
         )
         return True
 
+    def on_order_update(self, update):
+        """Pushed order state from the user-data stream: records real fill prices on the trade that placed the order."""
+        if update.status != "closed" or not update.average:
+            return
+        for trade in self.active_trades.values():
+            if trade.buy_order_id == update.order_id:
+                trade.buy_price = update.average
+            elif trade.sell_order_id == update.order_id:
+                trade.sell_price = update.average
+            else:
+                continue
+            logger.info(f"Order {update.order_id} on {update.exchange} filled {update.filled} at {update.average} (trade {trade.id}).")
+            return
+
     def disable_trading(self):
         self.trading_enabled = False
         logger.warning("Trading disabled.")
@@ -92,6 +110,11 @@ class TradingEngine:
          )
          return
   
+      if opportunity.route != "direct":
+         # Multi-leg routes (cross-quote) are reported but not executed; this engine only places a buy and a sell
+         logger.debug(f"Skipping {opportunity.route} route {opportunity.legs}: execution supports direct routes only.")
+         return
+
       trade_id = str(uuid.uuid4())
       
       # Dynamic position sizing
@@ -109,6 +132,12 @@ class TradingEngine:
           logger.warning(f"Invalid buy price ({opportunity.buy_price}) for {opportunity.symbol}. Cannot determine trade amount.")
           return
 
+      route_key = opportunity.route_key
+      if route_key in self.in_flight_routes:
+         logger.info(f"Skipping {opportunity.route_id}: trade {self.in_flight_routes[route_key]} is still working this route.")
+         return
+      self.in_flight_routes[route_key] = trade_id
+
       trade = Trade(id=trade_id, opportunity=opportunity, amount=trade_amount)
       self.active_trades[trade_id] = trade
       self.total_trades += 1
@@ -126,6 +155,9 @@ class TradingEngine:
   
       buy_fee = 0.0
       sell_fee = 0.0
+      # Detection-time prices, to measure slippage against
+      expected_buy_price = opportunity.buy_price
+      expected_sell_price = opportunity.sell_price
   
       try:
          ticker = await self.exchange_manager.fetch_ticker(opportunity.buy_exchange, opportunity.symbol)
@@ -192,6 +224,11 @@ class TradingEngine:
          self.total_profit_usd += trade.actual_profit_usd
          self.safety_manager.record_profit(trade.actual_profit_usd)
  
+         if self.route_stats is not None:
+            slippage_pct = ((trade.buy_price - expected_buy_price) / expected_buy_price + (expected_sell_price - trade.sell_price) / expected_sell_price) * 100
+            self.route_stats.record(opportunity.route_id, True, opportunity.potential_profit_pct, trade.actual_profit_usd / cost * 100 if cost > 0 else 0.0,
+                                    trade.execution_time_ms, slippage_pct)
+ 
          logger.info(f"Trade {trade_id} completed. Profit: ${trade.actual_profit_usd:.2f}")
          self.monitoring_system.alert_manager.create_alert(
              "Trade Completed", f"Trade {trade_id} for {opportunity.symbol} completed. Profit: ${trade.actual_profit_usd:.2f}", "success", "TradingEngine"
@@ -202,6 +239,8 @@ class TradingEngine:
          trade.error_message = str(e)
          potential_loss = -(trade.amount * trade.buy_price) if trade.buy_price else 0.0
          self.safety_manager.record_loss(potential_loss)
+         if self.route_stats is not None:
+            self.route_stats.record(opportunity.route_id, False, latency_ms=(time.time() - trade.timestamp) * 1000)
          logger.error(f"Trade {trade_id} failed: {e}")
          self.error_handler.handle_error(e, ErrorCategory.TRADING, ErrorSeverity.HIGH, "TradingEngine", f"Trade execution failed for {opportunity.symbol}")
          self.monitoring_system.alert_manager.create_alert(
@@ -211,6 +250,7 @@ class TradingEngine:
          self.completed_trades.append(trade)
          if trade_id in self.active_trades:
             del self.active_trades[trade_id]
+         self.in_flight_routes.pop(route_key, None)
 
     def get_trading_statistics(self) -> Dict[str, Any]:
         success_rate = (self.successful_trades / self.total_trades * 100) if self.total_trades > 0 else 0
@@ -232,8 +272,19 @@ class ArbitrageBot:
         self.error_handler = ErrorHandler(self.monitoring_system)
         self.safety_manager = SafetyManager(self.monitoring_system, config["RISK_CONFIG"])
         self.websocket_manager = None # Initialize as None, set later
-        self.price_monitor = PriceMonitor(self.exchange_manager, self.monitoring_system, config["PERFORMANCE_CONFIG"])
-        self.trading_engine = TradingEngine(self.exchange_manager, self.safety_manager, self.error_handler, self.monitoring_system)
+        performance_config = config["PERFORMANCE_CONFIG"]
+        self.route_stats = RouteStatsStore(
+            path=performance_config.get("route_stats_path") or None,
+            half_life=performance_config.get("route_stats_half_life_hours", 24.0) * 3600,
+            min_attempts=performance_config.get("route_min_attempts", 3),
+            min_fill_rate=performance_config.get("route_min_fill_rate", 0.2),
+            save_interval=performance_config.get("route_stats_save_interval", 60.0),
+        )
+        self.route_stats.load() # Route history survives restarts
+        self._route_stats_task = None
+        self.price_monitor = PriceMonitor(self.exchange_manager, self.monitoring_system, performance_config, route_stats=self.route_stats)
+        self.exchange_manager.set_volatility_source(self.price_monitor) # Live volatility for dynamic trade sizing
+        self.trading_engine = TradingEngine(self.exchange_manager, self.safety_manager, self.error_handler, self.monitoring_system, self.route_stats)
         
         self.is_running = False
         self.is_initialized = False
@@ -245,8 +296,15 @@ class ArbitrageBot:
     def set_websocket_manager(self, manager):
         self.websocket_manager = manager
         logger.info("WebSocketManager set on ArbitrageBot.")
+        if hasattr(manager, "set_feed_latency_monitor"):
+            manager.set_feed_latency_monitor(self.monitoring_system.feed_latency_monitor)
         self.price_monitor.set_websocket_manager(manager)
         logger.info("WebSocketManager set on PriceMonitor.")
+        if getattr(manager, "user_data_enabled", False):
+            # Order status and balances come from the private streams while they are up, REST otherwise
+            manager.balance_source = self.exchange_manager
+            self.exchange_manager.set_user_data_source(manager)
+            manager.subscribe_orders(self.trading_engine.on_order_update)
 
 
 
@@ -281,6 +339,7 @@ class ArbitrageBot:
         
         logger.info("Initializing bot components...")
         await self.exchange_manager.initialize_exchanges()
+        self.price_monitor.load_markets()
         await self.safety_manager.initialize_balances(self.exchange_manager)
         self.is_initialized = True
         logger.info("Bot initialization complete.")
@@ -307,23 +366,31 @@ class ArbitrageBot:
 
         # Now it's safe to start monitoring:
         asyncio.create_task(self.price_monitor.start_monitoring())
+        # Route statistics are persisted in the background, off the trading path
+        if self.route_stats.path:
+            self._route_stats_task = asyncio.create_task(self.route_stats.run_periodic_save())
         # ...etc.
 
 
-        # Main arbitrage loop
+        # Main arbitrage loop: woken by the price monitor as soon as new opportunities are found,
+        # main_loop_interval is only an upper bound on how long it idles
         while not self.shutdown_event.is_set():
             try:
-                opportunities = self.price_monitor.get_arbitrage_opportunities()
-                # Sort opportunities by score (highest first)
-                opportunities.sort(key=lambda x: x.score, reverse=True)
-
-                for opportunity in opportunities:
-                    if not self.shutdown_event.is_set():
-                        logger.info(f"Found opportunity: {opportunity.symbol} profit {opportunity.potential_profit_pct:.2f}% (Score: {opportunity.score:.2f})")
-                        asyncio.create_task(self.trading_engine.execute_arbitrage_trade(opportunity))
-                        await asyncio.sleep(PERFORMANCE_CONFIG.get("opportunity_scan_interval", 0.05)) # Small delay to prevent overwhelming
-
-                await asyncio.sleep(PERFORMANCE_CONFIG.get("main_loop_interval", 1))
+                try:
+                    await asyncio.wait_for(self.price_monitor.opportunity_event.wait(), timeout=PERFORMANCE_CONFIG.get("main_loop_interval", 1))
+                except asyncio.TimeoutError:
+                    continue
+                self.price_monitor.opportunity_event.clear()
+
+                # Pop the best pending opportunity each time: anything found while we pace dispatches competes
+                # on score, and entries that sat past their TTL are discarded by the queue
+                while not self.shutdown_event.is_set():
+                    opportunity = self.price_monitor.pop_opportunity()
+                    if opportunity is None:
+                        break
+                    logger.info(f"Found opportunity: {opportunity.symbol} profit {opportunity.potential_profit_pct:.2f}% (Score: {opportunity.score:.2f})")
+                    asyncio.create_task(self.trading_engine.execute_arbitrage_trade(opportunity))
+                    await asyncio.sleep(PERFORMANCE_CONFIG.get("opportunity_scan_interval", 0.05)) # Small delay to prevent overwhelming
 
             except Exception as e:
                 logger.error(f"Error in main arbitrage loop: {e}")
@@ -350,6 +417,15 @@ class ArbitrageBot:
         if self.websocket_manager:
             await self.websocket_manager.close()
 
+        # Stop the scan worker processes
+        self.price_monitor.close()
+
+        # Persist route statistics for the next run
+        if self._route_stats_task is not None:
+            self._route_stats_task.cancel()
+            self._route_stats_task = None
+        await self.route_stats.save_async()
+
         # Cancel all active tasks (if any)
         tasks = [t for t in asyncio.all_tasks() if t is not asyncio.current_task()]
         for task in tasks:
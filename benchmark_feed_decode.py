@@ -0,0 +1,105 @@
+"""
+Microbenchmark for the feed decode path: messages per second per core, before and after.
+
+"before" replays the original handler (stdlib json.loads, a 12-key dict per update with an
+isoformat() timestamp and the raw payload attached). "after" runs the current
+Binance feed adapter and WebSocketManager dispatch (pluggable decoder + slotted Tick) for every available decoder.
+
+    python benchmark_feed_decode.py [--messages 200000] [--symbols 200]
+"""
+
+import argparse
+import json
+import random
+import time
+from datetime import datetime
+
+from config import load_config
+from feed_adapters import BinanceFeedAdapter
+from market_data import JSON_DECODERS, get_json_decoder
+from websocket_manager import WebSocketManager
+
+def build_frames(message_count: int, symbol_count: int):
+    """Synthetic Binance combined-stream bookTicker frames, as the raw bytes the socket delivers."""
+    symbols = [f"SYM{i}USDT" for i in range(symbol_count)]
+    frames = []
+    for update_id in range(message_count):
+        symbol = random.choice(symbols)
+        bid = round(random.uniform(10, 50000), 2)
+        frames.append(json.dumps({
+            "stream": f"{symbol.lower()}@bookTicker",
+            "data": {
+                "u": update_id, "s": symbol,
+                "b": f"{bid:.8f}", "B": f"{random.uniform(0.1, 10):.8f}",
+                "a": f"{bid * 1.0001:.8f}", "A": f"{random.uniform(0.1, 10):.8f}",
+            },
+        }).encode())
+    return symbols, frames
+
+def run_legacy(frames):
+    """The original per-update path: stdlib decode and a fat dict with isoformat + raw payload."""
+    market_data = {}
+    start = time.perf_counter()
+    for message in frames:
+        data = json.loads(message)
+        ticker_data = data["data"]
+        timestamp = int(time.time() * 1000)
+        market_data.setdefault("binance", {})[ticker_data["s"]] = {
+            "bid": float(ticker_data["b"]),
+            "ask": float(ticker_data["a"]),
+            "timestamp": timestamp,
+            "datetime": datetime.fromtimestamp(timestamp / 1000).isoformat(),
+            "high": None,
+            "low": None,
+            "volume": float(ticker_data["B"]),
+            "quoteVolume": float(ticker_data["A"]),
+            "info": ticker_data,
+            "bids": [],
+            "asks": [],
+            "updateId": ticker_data["u"],
+        }
+    return time.perf_counter() - start
+
+def run_current(frames, symbols, decoder_name):
+    config = load_config()
+    config["TRADING_CONFIG"]["trade_symbols"] = symbols
+    config["PERFORMANCE_CONFIG"]["feed_json_decoder"] = decoder_name
+    manager = WebSocketManager(config)
+    adapter = BinanceFeedAdapter(config["EXCHANGES"]["binance"], config["PERFORMANCE_CONFIG"], symbols, manager.json_loads)
+    parse = adapter.parse
+    dispatch = manager._on_feed_event
+    start = time.perf_counter()
+    for message in frames:
+        for event in parse(message, time.monotonic()):
+            dispatch(adapter, event)
+    return time.perf_counter() - start
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--messages", type=int, default=200000)
+    parser.add_argument("--symbols", type=int, default=200)
+    args = parser.parse_args()
+
+    symbols, frames = build_frames(args.messages, args.symbols)
+    print(f"Feed decode benchmark: {args.messages} bookTicker frames across {args.symbols} symbols (single core)")
+    print("=" * 70)
+
+    legacy_elapsed = run_legacy(frames)
+    legacy_rate = args.messages / legacy_elapsed
+    print(f"  {'before (json + dict + isoformat)':<40} {legacy_rate:>12,.0f} msg/s")
+
+    for decoder_name in JSON_DECODERS:
+        try:
+            JSON_DECODERS[decoder_name]()
+        except ImportError:
+            print(f"  {'after (' + decoder_name + ' + Tick)':<40} {'not installed':>12}")
+            continue
+        elapsed = run_current(frames, symbols, decoder_name)
+        rate = args.messages / elapsed
+        print(f"  {'after (' + decoder_name + ' + Tick)':<40} {rate:>12,.0f} msg/s  ({rate / legacy_rate:.2f}x)")
+
+    print("=" * 70)
+    print(f"Default decoder on this host: {get_json_decoder().__module__}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,106 @@
+"""
+Feed ingest load test: WebSocketManager against the local exchange simulator.
+
+The simulator runs in a child process so its frame generation does not share a
+core with the feed handlers. Every second the benchmark reports messages sent
+and received, the backlog (sent but not yet parsed, i.e. queued in socket
+buffers; the sent count is published per batch, so small backlogs read as 0)
+and the CPU the feed process spent per message.
+
+    python benchmark_feed_ingest.py [--exchange binance] [--rate 20000] [--symbols 100] [--duration 20]
+"""
+
+import argparse
+import asyncio
+import logging
+import multiprocessing
+import time
+
+from config import load_config
+from exchange_simulator import ExchangeSimulator
+from websocket_manager import WebSocketManager
+
+def run_simulator(symbol_count, rate, seed, sent_counter, ports, ready):
+    async def serve():
+        simulator = ExchangeSimulator(symbol_count=symbol_count, rate=rate, seed=seed, sent_counter=sent_counter)
+        await simulator.start()
+        ports.put((simulator.port, simulator.rest_port))
+        ready.set()
+        await asyncio.Event().wait()
+
+    asyncio.run(serve())
+
+def count_parsed(adapter, counter):
+    parse = adapter.parse
+
+    def counting_parse(message, recv_ts):
+        counter[0] += 1
+        return parse(message, recv_ts)
+
+    adapter.parse = counting_parse
+
+async def run_benchmark(args, port, rest_port, sent_counter):
+    config = load_config()
+    symbols = [f"SIM{i}USDT" for i in range(args.symbols)]
+    config["EXCHANGES"] = {args.exchange: {"api_key": "simulator", "secret": "simulator"}}
+    config["TRADING_CONFIG"]["trade_symbols"] = symbols
+    performance_config = config["PERFORMANCE_CONFIG"]
+    performance_config["websocket_data_source"] = "native_websocket"
+    performance_config["websocket_urls"] = {"binance": f"ws://127.0.0.1:{port}/ws/", "bybit": f"ws://127.0.0.1:{port}/v5/public/spot"}
+    performance_config["binance_rest_url"] = f"http://127.0.0.1:{rest_port}"
+    performance_config["feed_depth_enabled"] = not args.no_depth
+
+    manager = WebSocketManager(config)
+    await manager.start()
+    received = [0]
+    for adapter in manager.feed_adapters.values():
+        count_parsed(adapter, received)
+
+    print(f"{'t':>4} {'sent/s':>10} {'recv/s':>10} {'backlog':>9} {'cpu%':>6} {'cpu us/msg':>11}")
+    last_sent, last_received = sent_counter.value, received[0]
+    last_cpu, last_wall = time.process_time(), time.perf_counter()
+    totals = []
+    for second in range(1, args.duration + 1):
+        await asyncio.sleep(1)
+        sent, now_received = sent_counter.value, received[0]
+        cpu, wall = time.process_time(), time.perf_counter()
+        elapsed = wall - last_wall
+        delta_received = now_received - last_received
+        cpu_per_msg = (cpu - last_cpu) / delta_received * 1e6 if delta_received else 0.0
+        print(f"{second:>4} {(sent - last_sent) / elapsed:>10,.0f} {delta_received / elapsed:>10,.0f} "
+              f"{max(sent - now_received, 0):>9,} {(cpu - last_cpu) / elapsed * 100:>6.1f} {cpu_per_msg:>11.1f}")
+        totals.append(delta_received / elapsed)
+        last_sent, last_received, last_cpu, last_wall = sent, now_received, cpu, wall
+
+    await manager.close()
+    print("=" * 56)
+    print(f"Mean ingest: {sum(totals) / len(totals):,.0f} msg/s; books synced: {sum(manager.depth_resync_counts.values())}")
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--exchange", choices=["binance", "bybit"], default="binance")
+    parser.add_argument("--rate", type=float, default=20000)
+    parser.add_argument("--symbols", type=int, default=100)
+    parser.add_argument("--duration", type=int, default=20)
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--no-depth", action="store_true", help="top-of-book streams only")
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.WARNING)
+
+    context = multiprocessing.get_context("spawn")
+    sent_counter = context.Value("q", 0, lock=False)
+    ports = context.Queue()
+    ready = context.Event()
+    simulator = context.Process(target=run_simulator, args=(args.symbols, args.rate, args.seed, sent_counter, ports, ready), daemon=True)
+    simulator.start()
+    try:
+        ready.wait(30)
+        port, rest_port = ports.get(timeout=5)
+        print(f"Feed ingest benchmark: {args.exchange}, {args.symbols} symbols, {args.rate:,.0f} msg/s target, {args.duration}s")
+        asyncio.run(run_benchmark(args, port, rest_port, sent_counter))
+    finally:
+        simulator.terminate()
+        simulator.join(5)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,103 @@
+"""
+Microbenchmark for opportunity detection: full-scan time as symbols and venues grow.
+
+"before" is the original scan, a Python loop over symbols x buy exchanges x sell
+exchanges with dict lookups, type checks and two fee lookups per route. "after"
+is SpreadMatrix.scan over the same quotes. Quotes are random around a common mid
+with a spread wider than the fees, so almost no route is profitable, as in
+production; both scanners must agree on the routes that are.
+
+    python benchmark_spread_scan.py [--symbols 10,100,500,1000] [--exchanges 2,4,8,16] [--repeat 20]
+"""
+
+import argparse
+import random
+import time
+
+from spread_matrix import SpreadMatrix
+
+FEE = 0.001
+MIN_PROFIT = 0.001
+
+def build_quotes(symbol_count: int, exchange_count: int, seed: int = 1):
+    rng = random.Random(seed)
+    symbols = [f"SYM{i}USDT" for i in range(symbol_count)]
+    exchanges = [f"venue{i}" for i in range(exchange_count)]
+    tickers = {exchange: {} for exchange in exchanges}
+    for symbol in symbols:
+        mid = rng.uniform(1, 50000)
+        for exchange in exchanges:
+            bid = mid * (1 + rng.gauss(0, 0.0007))
+            tickers[exchange][symbol] = {"bid": bid, "ask": bid * 1.0005}
+    return symbols, exchanges, tickers
+
+def get_fee(exchange_id: str) -> float:
+    return FEE
+
+def scan_loop(symbols, tickers):
+    """The original triple loop, minus sizing and scoring (identical in both versions)."""
+    routes = []
+    for symbol in symbols:
+        for buy_exchange_id, buy_exchange_tickers in tickers.items():
+            if symbol not in buy_exchange_tickers or not buy_exchange_tickers[symbol]:
+                continue
+            buy_price = buy_exchange_tickers[symbol].get("ask")
+            if buy_price is None or not isinstance(buy_price, (int, float)) or buy_price <= 0:
+                continue
+            for sell_exchange_id, sell_exchange_tickers in tickers.items():
+                if buy_exchange_id == sell_exchange_id:
+                    continue
+                if symbol not in sell_exchange_tickers or not sell_exchange_tickers[symbol]:
+                    continue
+                sell_price = sell_exchange_tickers[symbol].get("bid")
+                if sell_price is None or not isinstance(sell_price, (int, float)) or sell_price <= 0:
+                    continue
+                if sell_price > buy_price:
+                    buy_fee = get_fee(buy_exchange_id)
+                    sell_fee = get_fee(sell_exchange_id)
+                    effective_buy_price = buy_price * (1 + buy_fee)
+                    effective_sell_price = sell_price * (1 - sell_fee)
+                    if effective_sell_price > effective_buy_price:
+                        potential_profit_pct = ((effective_sell_price - effective_buy_price) / effective_buy_price) * 100
+                        if potential_profit_pct > MIN_PROFIT * 100:
+                            routes.append((symbol, buy_exchange_id, sell_exchange_id, potential_profit_pct))
+    return routes
+
+def build_matrix(symbols, exchanges, tickers):
+    matrix = SpreadMatrix(symbols, exchanges, {exchange: FEE for exchange in exchanges})
+    for exchange, quotes in tickers.items():
+        for symbol, quote in quotes.items():
+            matrix.update(exchange, symbol, quote["bid"], quote["ask"])
+    return matrix
+
+def time_scan(scan, repeat: int) -> float:
+    """Best of repeat runs, in microseconds."""
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        scan()
+        best = min(best, time.perf_counter() - start)
+    return best * 1e6
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--symbols", default="10,100,500,1000", help="comma-separated symbol counts")
+    parser.add_argument("--exchanges", default="2,4,8,16", help="comma-separated exchange counts")
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    print(f"{'symbols':>8} {'venues':>7} {'routes':>9} {'found':>6} {'before us':>11} {'after us':>10} {'speedup':>8}")
+    for exchange_count in (int(value) for value in args.exchanges.split(",")):
+        for symbol_count in (int(value) for value in args.symbols.split(",")):
+            symbols, exchanges, tickers = build_quotes(symbol_count, exchange_count)
+            matrix = build_matrix(symbols, exchanges, tickers)
+            expected = scan_loop(symbols, tickers)
+            found = matrix.scan(MIN_PROFIT)
+            assert sorted(route[:3] for route in expected) == sorted(route[:3] for route in found), "scanners disagree"
+            before = time_scan(lambda: scan_loop(symbols, tickers), args.repeat)
+            after = time_scan(lambda: matrix.scan(MIN_PROFIT), args.repeat)
+            routes = symbol_count * exchange_count * (exchange_count - 1)
+            print(f"{symbol_count:>8} {exchange_count:>7} {routes:>9,} {len(found):>6} {before:>11,.0f} {after:>10,.0f} {before / after:>7.1f}x")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,121 @@
+"""
+Cumulative order book depth and the profit-maximizing quantity of a two-sided route.
+"""
+
+import math
+from dataclasses import dataclass
+from typing import Iterable, Tuple
+
+import numpy as np
+
+@dataclass(slots=True)
+class DepthFill:
+    """Result of walking both books: how much to trade and what it earns at the VWAPs."""
+    quantity: float
+    buy_vwap: float  # Raw prices, before fees
+    sell_vwap: float
+    profit: float  # Net of fees, in the buy leg's quote currency
+    profit_pct: float  # profit / net cost * 100
+
+EMPTY_FILL = DepthFill(0.0, 0.0, 0.0, 0.0, 0.0)
+
+class BookDepth:
+    """One side of a book as prefix arrays: cumulative quantity and notional through each level, best level first.
+
+    Any quantity's fill cost is then a binary search plus one partial level,
+    instead of a walk over the levels.
+    """
+
+    __slots__ = ("prices", "cum_quantity", "cum_notional")
+
+    def __init__(self, levels: Iterable[Tuple[float, float]]):
+        table = np.asarray(list(levels), dtype=np.float64).reshape(-1, 2)
+        self.prices = table[:, 0]
+        self.cum_quantity = np.cumsum(table[:, 1])
+        self.cum_notional = np.cumsum(table[:, 0] * table[:, 1])
+
+    def __len__(self) -> int:
+        return len(self.prices)
+
+    @property
+    def total_quantity(self) -> float:
+        return float(self.cum_quantity[-1]) if len(self.prices) else 0.0
+
+    def notional(self, quantity: float) -> float:
+        """Price * quantity summed over the first `quantity` units (inf beyond the visible depth)."""
+        if quantity <= 0:
+            return 0.0
+        level = int(np.searchsorted(self.cum_quantity, quantity, side="left"))
+        if level >= len(self.prices):
+            return math.inf
+        before_quantity = float(self.cum_quantity[level - 1]) if level else 0.0
+        before_notional = float(self.cum_notional[level - 1]) if level else 0.0
+        return before_notional + (quantity - before_quantity) * float(self.prices[level])
+
+    def quantity_for_notional(self, notional: float) -> float:
+        """Largest quantity whose notional fits within the given amount, capped at the visible depth."""
+        if notional <= 0:
+            return 0.0
+        level = int(np.searchsorted(self.cum_notional, notional, side="left"))
+        if level >= len(self.prices):
+            return self.total_quantity
+        before_quantity = float(self.cum_quantity[level - 1]) if level else 0.0
+        before_notional = float(self.cum_notional[level - 1]) if level else 0.0
+        return before_quantity + (notional - before_notional) / float(self.prices[level])
+
+def optimal_fill(asks: BookDepth, bids: BookDepth, buy_fee: float = 0.0, sell_fee: float = 0.0,
+                 min_profit: float = 0.0, max_notional: float = math.inf, sell_rate: float = 1.0) -> DepthFill:
+    """Quantity that maximizes net profit buying through asks and selling through bids.
+
+    Both marginal prices are step functions that only change at the books'
+    cumulative-quantity breakpoints, so the merged walk is vectorized over
+    the union of breakpoints: profit keeps growing while the net bid of the
+    level being hit exceeds the net ask of the level being lifted. The
+    quantity is then cut back, if needed, to where the VWAP net profit still
+    clears min_profit (average profit only falls with size, so this is
+    solved exactly inside one segment) and to max_notional of net cost.
+    sell_rate converts sell proceeds into the buy leg's currency (1 for a
+    same-symbol route).
+    """
+    if not len(asks) or not len(bids):
+        return EMPTY_FILL
+    buy_scale, sell_scale = 1.0 + buy_fee, (1.0 - sell_fee) * sell_rate
+    limit = min(asks.total_quantity, bids.total_quantity)
+    breaks = np.union1d(asks.cum_quantity, bids.cum_quantity)
+    breaks = breaks[breaks <= limit]
+    ask_levels = np.searchsorted(asks.cum_quantity, breaks, side="left")  # Level filling the segment that ends at each break
+    bid_levels = np.searchsorted(bids.cum_quantity, breaks, side="left")
+    marginal_ok = bids.prices[bid_levels] * sell_scale > asks.prices[ask_levels] * buy_scale
+    segments = len(breaks) if marginal_ok.all() else int(np.argmin(marginal_ok))
+    if segments == 0:
+        return EMPTY_FILL
+    breaks = breaks[:segments]
+    threshold = 1.0 + min_profit
+    net_costs = _notionals(asks, breaks, ask_levels[:segments]) * buy_scale
+    net_revenues = _notionals(bids, breaks, bid_levels[:segments]) * sell_scale
+    average_ok = net_revenues >= net_costs * threshold
+    if average_ok.all():
+        quantity = float(breaks[-1])
+    else:
+        # First segment whose end misses the threshold: solve for the point where the average meets it
+        segment = int(np.argmin(average_ok))
+        start = float(breaks[segment - 1]) if segment else 0.0
+        start_cost = float(net_costs[segment - 1]) if segment else 0.0
+        start_revenue = float(net_revenues[segment - 1]) if segment else 0.0
+        slope = (float(bids.prices[bid_levels[segment]]) * sell_scale
+                 - threshold * float(asks.prices[ask_levels[segment]]) * buy_scale)
+        slack = start_revenue - threshold * start_cost
+        quantity = start + (slack / -slope if slope < 0 else 0.0)
+    quantity = min(quantity, asks.quantity_for_notional(max_notional / buy_scale))
+    if quantity <= 0:
+        return EMPTY_FILL
+    cost, revenue = asks.notional(quantity), bids.notional(quantity)
+    net_cost = cost * buy_scale
+    profit = revenue * sell_scale - net_cost
+    return DepthFill(quantity, cost / quantity, revenue / quantity, profit, profit / net_cost * 100)
+
+def _notionals(depth: BookDepth, quantities: np.ndarray, levels: np.ndarray) -> np.ndarray:
+    """depth.notional() for sorted quantities within the visible depth, given the level each one ends in."""
+    before_quantity = np.where(levels > 0, depth.cum_quantity[levels - 1], 0.0)
+    before_notional = np.where(levels > 0, depth.cum_notional[levels - 1], 0.0)
+    return before_notional + (quantities - before_quantity) * depth.prices[levels]
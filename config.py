@@ -118,10 +118,71 @@ def load_config():
         "price_update_interval": float(os.getenv("PRICE_UPDATE_INTERVAL", 0.1)),
         "main_loop_interval": float(os.getenv("MAIN_LOOP_INTERVAL", 1)),
         "opportunity_scan_interval": float(os.getenv("OPPORTUNITY_SCAN_INTERVAL", 0.05)),
-        "websocket_data_source": os.getenv("WEBSOCKET_DATA_SOURCE", "native_websocket"),  # use native exchange websockets
+        "event_driven_scanning": os.getenv("EVENT_DRIVEN_SCANNING", "true").lower() == "true",  # re-evaluate on feed updates instead of polling
+        "websocket_data_source": os.getenv("WEBSOCKET_DATA_SOURCE", "native_websocket"),  # "native_websocket" (feed_adapters.py where available), "ccxt" or "replay"
+        "binance_stream_mode": os.getenv("BINANCE_STREAM_MODE", "book_ticker"),  # "book_ticker" (per-symbol, real-time) or "ticker_arr" (all-market, 1s)
+        "binance_depth_snapshot_limit": int(os.getenv("BINANCE_DEPTH_SNAPSHOT_LIMIT", 1000)),
+        "binance_rest_url": os.getenv("BINANCE_REST_URL", ""),  # depth snapshot endpoint override
+        "feed_json_decoder": os.getenv("FEED_JSON_DECODER", "auto"),  # "auto", "orjson", "msgspec" or "json"
+        "feed_depth_enabled": os.getenv("FEED_DEPTH_ENABLED", "true").lower() == "true",  # local L2 books on every native feed
+        "feed_retain_raw": os.getenv("FEED_RETAIN_RAW", "false").lower() == "true",  # keep the raw payload on every tick
+        "feed_shard_size": int(os.getenv("FEED_SHARD_SIZE", 50)),  # symbols per feed connection
+        "feed_shard_processes": int(os.getenv("FEED_SHARD_PROCESSES", 0)),  # >0 parses top-of-book in worker processes via shared memory
+        "feed_shared_poll_interval": float(os.getenv("FEED_SHARED_POLL_INTERVAL", 0.001)),
+        "feed_redundancy": int(os.getenv("FEED_REDUNDANCY", 1)),  # live connections per feed shard; >1 keeps hot standbys, first copy of each update wins
+        "feed_failover_ms": float(os.getenv("FEED_FAILOVER_MS", 1000)),  # feeds without update ids (Kraken): a standby takes a symbol over after the primary is silent this long
+        "feed_reconnect_backoff_initial": float(os.getenv("FEED_RECONNECT_BACKOFF_INITIAL", 0.5)),  # seconds, doubled per failed attempt, with jitter
+        "feed_reconnect_backoff_max": float(os.getenv("FEED_RECONNECT_BACKOFF_MAX", 30)),
+        "user_data_enabled": os.getenv("USER_DATA_ENABLED", "false").lower() == "true",  # private order/balance streams (binance, bybit) instead of REST polling
+        "order_update_wait_seconds": float(os.getenv("ORDER_UPDATE_WAIT_SECONDS", 2.0)),  # how long fetch_order waits for a pushed update before REST
+        "order_update_cache_size": int(os.getenv("ORDER_UPDATE_CACHE_SIZE", 10000)),  # latest pushed state kept for this many orders
+        "journal_enabled": os.getenv("JOURNAL_ENABLED", "false").lower() == "true",  # record every tick/book event to market_journal files
+        "journal_dir": os.getenv("JOURNAL_DIR", "journal"),
+        "journal_queue_size": int(os.getenv("JOURNAL_QUEUE_SIZE", 100000)),  # events buffered for the writer thread before dropping
+        "journal_chunk_records": int(os.getenv("JOURNAL_CHUNK_RECORDS", 65536)),  # file growth step, in records
+        "replay_dir": os.getenv("REPLAY_DIR", ""),  # websocket_data_source="replay": journals to replay (default journal_dir)
+        "replay_speed": os.getenv("REPLAY_SPEED", "1"),  # 1 = real time, N = N times faster, "max" = as fast as possible
+        "replay_exchanges": [e.strip() for e in os.getenv("REPLAY_EXCHANGES", "").split(",") if e.strip()],  # empty = all recorded
+        "replay_start_day": os.getenv("REPLAY_START_DAY", ""),  # YYYYMMDD, inclusive
+        "replay_end_day": os.getenv("REPLAY_END_DAY", ""),
+        "replay_trading_enabled": os.getenv("REPLAY_TRADING_ENABLED", "false").lower() == "true",  # let replayed opportunities reach the exchanges
+        "replay_exit_on_complete": os.getenv("REPLAY_EXIT_ON_COMPLETE", "true").lower() == "true",
+        "max_quote_age_ms": float(os.getenv("MAX_QUOTE_AGE_MS", 5000)),  # quotes older than this are excluded from scanning
+        "scan_max_pending_updates": int(os.getenv("SCAN_MAX_PENDING_UPDATES", 0)),  # cap on (exchange, symbol) keys awaiting a scan, 0 = one per key
+        "scan_batch_size": int(os.getenv("SCAN_BATCH_SIZE", 0)),  # keys evaluated per scan pass before yielding to the feed, 0 = all pending
+        "volatility_window_seconds": float(os.getenv("VOLATILITY_WINDOW_SECONDS", 300)),  # decay window of the streaming realized volatility used for scoring and trade sizing
+        "price_history_capacity": int(os.getenv("PRICE_HISTORY_CAPACITY", 1024)),  # quotes kept per (exchange, symbol) in the ring-buffer history
+        "opportunity_change_threshold_pct": float(os.getenv("OPPORTUNITY_CHANGE_THRESHOLD_PCT", 0.05)),  # re-emit a persisting route only if its profit moved this many percentage points
+        "opportunity_quantity_change_ratio": float(os.getenv("OPPORTUNITY_QUANTITY_CHANGE_RATIO", 0.25)),  # ...or its fillable quantity changed by this fraction
+        "opportunity_queue_size": int(os.getenv("OPPORTUNITY_QUEUE_SIZE", 100)),  # pending opportunities kept for the executor (best scores win)
+        "opportunity_ttl_seconds": float(os.getenv("OPPORTUNITY_TTL_SECONDS", 2.0)),  # a pending opportunity not taken within this time is dropped
+        "route_stats_path": os.getenv("ROUTE_STATS_PATH", "route_stats.json"),  # per-route execution history, kept across restarts (empty disables persistence)
+        "route_stats_half_life_hours": float(os.getenv("ROUTE_STATS_HALF_LIFE_HOURS", 24.0)),  # weight of a past trade halves every this many hours
+        "route_min_fill_rate": float(os.getenv("ROUTE_MIN_FILL_RATE", 0.2)),  # routes filling less often than this are not queued for execution
+        "route_min_attempts": float(os.getenv("ROUTE_MIN_ATTEMPTS", 3)),  # decayed attempts needed before a route can be blocked
+        "route_stats_save_interval": float(os.getenv("ROUTE_STATS_SAVE_INTERVAL", 60.0)),  # seconds between route stats writes
+        "scan_shard_processes": int(os.getenv("SCAN_SHARD_PROCESSES", 0)),  # >0 scans direct routes of trade_symbols in this many worker processes via shared memory
+        "scan_shared_poll_interval": float(os.getenv("SCAN_SHARED_POLL_INTERVAL", 0.001)),  # seconds between polls of the shared quote table and result queue
+        "scan_shard_queue_size": int(os.getenv("SCAN_SHARD_QUEUE_SIZE", 10000)),  # scan results in flight before workers wait for the main process
+        "cross_quote_routes_enabled": os.getenv("CROSS_QUOTE_ROUTES_ENABLED", "true").lower() == "true",  # price synthetic routes such as BTCUSDC vs BTCUSDT via USDCUSDT (needs the conversion pair in trade_symbols)
+        "triangular_enabled": os.getenv("TRIANGULAR_ENABLED", "false").lower() == "true",  # detect currency cycles within each exchange (e.g. USDT->BTC->ETH->USDT)
+        "triangular_max_cycle_length": int(os.getenv("TRIANGULAR_MAX_CYCLE_LENGTH", 3)),  # currencies per cycle; 4 also finds quadrangular routes
+        "triangular_max_cycles": int(os.getenv("TRIANGULAR_MAX_CYCLES", 200000)),  # enumeration cap per exchange
         "websocket_urls": {
             "binance": os.getenv("BINANCE_WS_URL", ""),
-            "bybit": os.getenv("BYBIT_WS_URL", "")
+            "bybit": os.getenv("BYBIT_WS_URL", ""),
+            "okx": os.getenv("OKX_WS_URL", ""),
+            "kraken": os.getenv("KRAKEN_WS_URL", "")
+        },
+        "websocket_standby_urls": {  # endpoints for the standby connections when feed_redundancy > 1 (default: the primary URL)
+            "binance": os.getenv("BINANCE_STANDBY_WS_URL", ""),
+            "bybit": os.getenv("BYBIT_STANDBY_WS_URL", ""),
+            "okx": os.getenv("OKX_STANDBY_WS_URL", ""),
+            "kraken": os.getenv("KRAKEN_STANDBY_WS_URL", "")
+        },
+        "user_data_urls": {  # private stream endpoint overrides (default: production or sandbox)
+            "binance": os.getenv("BINANCE_USER_DATA_URL", ""),
+            "bybit": os.getenv("BYBIT_USER_DATA_URL", "")
         },
         "WEBSOCKET_CONFIG": {
             "binance": {
@@ -129,6 +190,12 @@ def load_config():
             },
             "bybit": {
                 "ping_interval": int(os.getenv("BYBIT_WS_PING_INTERVAL", 25)),
+            },
+            "okx": {
+                "ping_interval": int(os.getenv("OKX_WS_PING_INTERVAL", 25)),
+            },
+            "kraken": {
+                "ping_interval": int(os.getenv("KRAKEN_WS_PING_INTERVAL", 30)),
             }
         }
     }
@@ -0,0 +1,172 @@
+"""
+Consolidated best bid/offer per symbol across venues, maintained incrementally from ticks.
+"""
+
+import heapq
+from typing import Dict, Iterable, List, Optional, Tuple
+
+class ConsolidatedQuote:
+    """Fee-adjusted best bid and ask of one symbol across venues.
+
+    Bids live in a max-heap (negated) and asks in a min-heap, keyed by the
+    price net of the venue's taker fee, so the top of each heap is the best
+    venue to sell to / buy from. A tick pushes fresh entries in O(log E);
+    superseded entries are dropped lazily when they surface at the top (their
+    version no longer matches the venue's current quote), and the heaps are
+    rebuilt once stale entries outnumber live ones.
+    """
+
+    __slots__ = ("symbol", "quotes", "bid_heap", "ask_heap", "_version")
+
+    def __init__(self, symbol: str):
+        self.symbol = symbol
+        self.quotes: Dict[str, Tuple[float, float, float, float, int]] = {}  # {exchange: (bid, ask, net_bid, net_ask, version)}
+        self.bid_heap: List[Tuple[float, int, str]] = []  # (-net_bid, version, exchange)
+        self.ask_heap: List[Tuple[float, int, str]] = []  # (net_ask, version, exchange)
+        self._version = 0
+
+    def update(self, exchange: str, bid: float, ask: float, fee: float = 0.0):
+        self._version += 1
+        net_bid, net_ask = bid * (1.0 - fee), ask * (1.0 + fee)
+        self.quotes[exchange] = (bid, ask, net_bid, net_ask, self._version)
+        heapq.heappush(self.bid_heap, (-net_bid, self._version, exchange))
+        heapq.heappush(self.ask_heap, (net_ask, self._version, exchange))
+        if len(self.bid_heap) > 2 * len(self.quotes) + 8:
+            self._rebuild()
+
+    def remove(self, exchange: str):
+        """Drops a venue's quote (stale or missing); its heap entries expire lazily."""
+        self.quotes.pop(exchange, None)
+
+    def _rebuild(self):
+        self.bid_heap = [(-net_bid, version, exchange) for exchange, (_, _, net_bid, _, version) in self.quotes.items()]
+        self.ask_heap = [(net_ask, version, exchange) for exchange, (_, _, _, net_ask, version) in self.quotes.items()]
+        heapq.heapify(self.bid_heap)
+        heapq.heapify(self.ask_heap)
+
+    def _top(self, heap) -> Optional[Tuple[float, int, str]]:
+        quotes = self.quotes
+        while heap:
+            entry = heap[0]
+            quote = quotes.get(entry[2])
+            if quote is not None and quote[4] == entry[1]:
+                return entry
+            heapq.heappop(heap)
+        return None
+
+    def best_bid(self) -> Optional[Tuple[str, float]]:
+        """(exchange, raw bid) of the venue paying the most net of fees."""
+        entry = self._top(self.bid_heap)
+        return None if entry is None else (entry[2], self.quotes[entry[2]][0])
+
+    def best_ask(self) -> Optional[Tuple[str, float]]:
+        """(exchange, raw ask) of the venue charging the least net of fees."""
+        entry = self._top(self.ask_heap)
+        return None if entry is None else (entry[2], self.quotes[entry[2]][1])
+
+    def routes(self, min_profit: float) -> List[Tuple[str, str, float]]:
+        """(buy_exchange, sell_exchange, profit_pct) of every cross-venue route above min_profit net of fees.
+
+        Only the heap tops are read in the common case where the best bid does
+        not clear the best ask: if the best pair fails (and the venues
+        differ), every other pair fails too. When the best bid and ask sit on
+        the same venue the runners-up on either side are checked next; only a
+        crossed consolidated book pays for a full sort of the venues.
+        """
+        bid_top, ask_top = self._top(self.bid_heap), self._top(self.ask_heap)
+        if bid_top is None or ask_top is None:
+            return []
+        threshold = 1.0 + min_profit
+        best_net_bid, best_net_ask = -bid_top[0], ask_top[0]
+        if best_net_bid <= best_net_ask * threshold:
+            return []  # No venue pays enough over the cheapest venue
+        if bid_top[2] == ask_top[2] and len(self.quotes) > 1:
+            second_bid, second_ask = self._runner_up(self.bid_heap), self._runner_up(self.ask_heap)
+            if ((second_bid is None or -second_bid[0] <= best_net_ask * threshold) and
+                    (second_ask is None or best_net_bid <= second_ask[0] * threshold)):
+                return []
+        quotes = self.quotes
+        routes = []
+        sells = sorted(quotes.items(), key=lambda item: -item[1][2])
+        buys = sorted(quotes.items(), key=lambda item: item[1][3])
+        for sell_exchange, (_, _, net_bid, _, _) in sells:
+            if net_bid <= best_net_ask * threshold:
+                break
+            for buy_exchange, (_, _, _, net_ask, _) in buys:
+                if net_bid <= net_ask * threshold:
+                    break
+                if buy_exchange != sell_exchange:
+                    routes.append((buy_exchange, sell_exchange, (net_bid - net_ask) / net_ask * 100))
+        return routes
+
+    def _runner_up(self, heap) -> Optional[Tuple[float, int, str]]:
+        """Second live entry of a heap whose top is live, found by popping the top and pushing it back."""
+        top = heapq.heappop(heap)
+        try:
+            return self._top(heap)
+        finally:
+            heapq.heappush(heap, top)
+
+    def snapshot(self) -> Dict[str, object]:
+        """Best bid/ask venues read from the quotes alone.
+
+        Called from the dashboard thread while the scanner owns the heaps, so
+        it must not pop stale entries (or anything else) off them; a linear
+        pass over a copy of the quotes is cheap at a handful of venues.
+        """
+        quotes = tuple(self.quotes.items())
+        best_bid = max(quotes, key=lambda item: item[1][2], default=None)
+        best_ask = min(quotes, key=lambda item: item[1][3], default=None)
+        return {
+            "bid_exchange": best_bid[0] if best_bid else None,
+            "best_bid": best_bid[1][0] if best_bid else None,
+            "ask_exchange": best_ask[0] if best_ask else None,
+            "best_ask": best_ask[1][1] if best_ask else None,
+            "venues": len(quotes),
+        }
+
+class ConsolidatedBook:
+    """ConsolidatedQuote per symbol, with the taker fee per venue applied on every update."""
+
+    def __init__(self, fees: Optional[Dict[str, float]] = None):
+        self.symbols: Dict[str, ConsolidatedQuote] = {}
+        self.fees: Dict[str, float] = dict(fees or {})
+
+    def set_fees(self, fees: Dict[str, float]):
+        """Updates venue fees; quotes already held are re-priced if any fee changed."""
+        if all(self.fees.get(exchange) == fee for exchange, fee in fees.items()):
+            return
+        self.fees.update(fees)
+        for consolidated in self.symbols.values():
+            for exchange, (bid, ask, _, _, _) in list(consolidated.quotes.items()):
+                consolidated.update(exchange, bid, ask, self.fees.get(exchange, 0.0))
+
+    def update(self, exchange: str, symbol: str, bid: float, ask: float):
+        consolidated = self.symbols.get(symbol)
+        if consolidated is None:
+            consolidated = self.symbols[symbol] = ConsolidatedQuote(symbol)
+        if bid > 0 and ask > 0:
+            consolidated.update(exchange, bid, ask, self.fees.get(exchange, 0.0))
+        else:
+            consolidated.remove(exchange)
+
+    def remove(self, exchange: str, symbol: str):
+        consolidated = self.symbols.get(symbol)
+        if consolidated is not None:
+            consolidated.remove(exchange)
+
+    def get(self, symbol: str) -> Optional[ConsolidatedQuote]:
+        return self.symbols.get(symbol)
+
+    def scan(self, min_profit: float, symbols: Iterable[str]) -> List[Tuple[str, str, str, float]]:
+        """(symbol, buy_exchange, sell_exchange, profit_pct) of every route of symbols above min_profit."""
+        routes = []
+        for symbol in symbols:
+            consolidated = self.symbols.get(symbol)
+            if consolidated is not None:
+                routes.extend((symbol, buy, sell, profit_pct) for buy, sell, profit_pct in consolidated.routes(min_profit))
+        return routes
+
+    def snapshot(self) -> Dict[str, Dict[str, object]]:
+        """{symbol: best bid/ask venues and prices} for the market summary."""
+        return {symbol: consolidated.snapshot() for symbol, consolidated in list(self.symbols.items())}
@@ -0,0 +1,170 @@
+"""
+Synthetic cross-quote routes across exchanges, e.g. buy BTC/USDC on one venue, sell BTC/USDT on another
+and convert the USDT proceeds back to USDC through a live USDC/USDT quote.
+"""
+
+import logging
+from dataclasses import dataclass
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+from feed_adapters import split_symbol
+from spread_matrix import SpreadMatrix
+
+logger = logging.getLogger(__name__)
+
+BUY = "buy"
+SELL = "sell"
+
+@dataclass(slots=True)
+class CrossQuoteRoute:
+    """One priced synthetic route: three legs, each paying its venue's taker fee."""
+    buy_symbol: str  # Base bought with the start quote currency
+    buy_exchange: str
+    sell_symbol: str  # Base sold for the other quote currency
+    sell_exchange: str
+    conversion_symbol: str  # Market converting the proceeds back to the start quote currency
+    conversion_exchange: str
+    conversion_side: str  # "sell" when the proceeds are the conversion market's base, "buy" when its quote
+    profit_pct: float  # Net of all three fees, per unit of the start quote currency
+    conversion_rate: float  # Start quote currency received per unit of the sell leg's quote, net of the conversion fee
+
+    @property
+    def legs(self) -> Tuple[Tuple[str, str, str], ...]:
+        """(native symbol, exchange, side) in execution order."""
+        return ((self.buy_symbol, self.buy_exchange, BUY), (self.sell_symbol, self.sell_exchange, SELL),
+                (self.conversion_symbol, self.conversion_exchange, self.conversion_side))
+
+class CrossQuoteRouter:
+    """Route index over a SpreadMatrix for symbols that share a base but not a quote currency.
+
+    Symbols are grouped into families by base currency when the markets are
+    loaded. For every ordered pair of family members (buy in quote A, sell in
+    quote B) with a tracked market between B and A, each pair of distinct
+    venues gets a route whose conversion leg runs on either of them. The
+    legs are stored as parallel row/column arrays into the matrix, plus a
+    per-market index of the routes that read it, so pricing a tick is a
+    gather over those routes:
+
+        profit = eff_bid[sell] * rate(conversion) / eff_ask[buy] - 1
+
+    where rate is eff_bid (selling B for A) or 1 / eff_ask (buying A with B),
+    so every leg carries its venue's fee through the matrix's effective prices.
+    """
+
+    def __init__(self, matrix: SpreadMatrix, currencies: Optional[Dict[str, Tuple[str, str]]] = None):
+        self.matrix = matrix
+        self.evaluations = 0  # Routes priced so far
+        self.build(currencies)
+
+    def build(self, currencies: Optional[Dict[str, Tuple[str, str]]] = None) -> int:
+        """(Re)builds the route index. currencies maps native symbols to (base, quote); symbols
+        missing from it are split by their quote-currency suffix. Returns the number of routes."""
+        currencies = dict(currencies or {})
+        pairs: Dict[str, Tuple[str, str]] = {}
+        for symbol in self.matrix.symbols:
+            if symbol in currencies:
+                pairs[symbol] = currencies[symbol]
+                continue
+            try:
+                pairs[symbol] = split_symbol(symbol)
+            except ValueError:
+                logger.debug(f"Cross-quote routes: skipping {symbol}, quote currency unknown.")
+        by_currencies = {(base, quote): symbol for symbol, (base, quote) in pairs.items()}
+        families: Dict[str, List[str]] = {}
+        for symbol, (base, _) in pairs.items():
+            families.setdefault(base, []).append(symbol)
+
+        index, exchanges = self.matrix.symbol_index, range(len(self.matrix.exchanges))
+        routes: List[Tuple[int, int, int, int, int, int, bool]] = []
+        for members in families.values():
+            for buy_symbol in members:
+                for sell_symbol in members:
+                    pay, receive = pairs[buy_symbol][1], pairs[sell_symbol][1]
+                    if pay == receive:
+                        continue
+                    # Proceeds in `receive` go back to `pay`: sell receive/pay, or buy pay/receive
+                    conversion = by_currencies.get((receive, pay))
+                    buys_conversion = conversion is None
+                    if buys_conversion:
+                        conversion = by_currencies.get((pay, receive))
+                    if conversion is None:
+                        continue
+                    for buy_column in exchanges:
+                        for sell_column in exchanges:
+                            if buy_column == sell_column:
+                                continue  # Same-venue routes are cycles for the triangular detector
+                            for conversion_column in (buy_column, sell_column):
+                                routes.append((index[buy_symbol], buy_column, index[sell_symbol], sell_column,
+                                               index[conversion], conversion_column, buys_conversion))
+
+        table = np.array(routes, dtype=np.intp).reshape(len(routes), 7)
+        self.buy_rows, self.buy_columns = table[:, 0].copy(), table[:, 1].copy()
+        self.sell_rows, self.sell_columns = table[:, 2].copy(), table[:, 3].copy()
+        self.conversion_rows, self.conversion_columns = table[:, 4].copy(), table[:, 5].copy()
+        self.buys_conversion = table[:, 6].astype(bool)
+        by_row: List[List[int]] = [[] for _ in self.matrix.symbols]
+        for route_id, (buy_row, _, sell_row, _, conversion_row, _, _) in enumerate(routes):
+            for row in {buy_row, sell_row, conversion_row}:
+                by_row[row].append(route_id)
+        self.routes_by_row = [np.array(ids, dtype=np.intp) for ids in by_row]
+        self.families = {base: members for base, members in families.items() if len(members) > 1}
+        logger.info(f"Cross-quote routes: {len(routes)} routes over {len(self.families)} symbol families.")
+        return len(routes)
+
+    def __len__(self) -> int:
+        return len(self.buy_rows)
+
+    def route_ids(self, rows: Optional[np.ndarray] = None) -> np.ndarray:
+        """Routes reading any of the given matrix rows (all routes when rows is None)."""
+        if rows is None:
+            return np.arange(len(self), dtype=np.intp)
+        selected = [self.routes_by_row[row] for row in rows.tolist() if len(self.routes_by_row[row])]
+        if not selected:
+            return np.empty(0, dtype=np.intp)
+        return selected[0] if len(selected) == 1 else np.unique(np.concatenate(selected))
+
+    def profits(self, route_ids: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """(net profit fraction, conversion rate) of each route, NaN where any leg has no quote."""
+        self.evaluations += len(route_ids)
+        effective_bids, effective_asks = self.matrix.effective_bids, self.matrix.effective_asks
+        cost = effective_asks[self.buy_rows[route_ids], self.buy_columns[route_ids]]
+        proceeds = effective_bids[self.sell_rows[route_ids], self.sell_columns[route_ids]]
+        conversion_rows, conversion_columns = self.conversion_rows[route_ids], self.conversion_columns[route_ids]
+        rate = np.where(self.buys_conversion[route_ids],
+                        1.0 / effective_asks[conversion_rows, conversion_columns],
+                        effective_bids[conversion_rows, conversion_columns])
+        return proceeds * rate / cost - 1.0, rate
+
+    def scan(self, min_profit: float, rows: Optional[np.ndarray] = None) -> List[CrossQuoteRoute]:
+        """Every route through the given rows whose net profit fraction exceeds min_profit, best first."""
+        route_ids = self.route_ids(rows)
+        if not len(route_ids):
+            return []
+        profit, rate = self.profits(route_ids)
+        with np.errstate(invalid="ignore"):
+            hits = profit > min_profit
+        if not hits.any():
+            return []
+        symbols, exchanges = self.matrix.symbols, self.matrix.exchanges
+        found = []
+        for route_id, fraction, conversion_rate in zip(route_ids[hits].tolist(), profit[hits].tolist(), rate[hits].tolist()):
+            found.append(CrossQuoteRoute(
+                symbols[self.buy_rows[route_id]], exchanges[self.buy_columns[route_id]],
+                symbols[self.sell_rows[route_id]], exchanges[self.sell_columns[route_id]],
+                symbols[self.conversion_rows[route_id]], exchanges[self.conversion_columns[route_id]],
+                BUY if self.buys_conversion[route_id] else SELL, fraction * 100, conversion_rate,
+            ))
+        return sorted(found, key=lambda route: -route.profit_pct)
+
+def market_currencies(markets_by_exchange: Iterable[Dict[str, dict]], symbols: Iterable[str]) -> Dict[str, Tuple[str, str]]:
+    """{native id: (base, quote)} for the given symbols, read from ccxt markets of any exchange."""
+    wanted = set(symbols)
+    currencies = {}
+    for markets in markets_by_exchange:
+        for market in markets.values():
+            native_id = market.get("id") or market["symbol"].replace("/", "")
+            if native_id in wanted and native_id not in currencies:
+                currencies[native_id] = (market["base"], market["quote"])
+    return currencies
@@ -318,6 +318,30 @@ def get_health_status():
             "message": str(e)
         }), 500
 
+@bot_api.route("/monitoring/feeds", methods=["GET"])
+def get_feed_latency():
+    """Get per-feed staleness, feed lag and inter-arrival latency."""
+    try:
+        if _bot_instance is None:
+            return jsonify({
+                "status": "error",
+                "message": "Bot is not running"
+            }), 400
+        
+        metrics = _bot_instance.monitoring_system.get_feed_latency_metrics()
+        
+        return jsonify({
+            "status": "success",
+            "data": metrics
+        }), 200
+        
+    except Exception as e:
+        logger.error(f"Error getting feed latency metrics: {e}", exc_info=True)
+        return jsonify({
+            "status": "error",
+            "message": str(e)
+        }), 500
+
 @bot_api.route("/exchanges/balances", methods=["GET"])
 def get_exchange_balances():
     """Get balances across all exchanges."""
@@ -358,13 +382,7 @@ def get_market_summary():
                 "message": "Bot is not running"
             }), 400
         
-        # This needs to be awaited as get_market_summary is async
-        try:
-            loop = asyncio.get_running_loop()
-        except RuntimeError:
-            loop = asyncio.new_event_loop()
-            asyncio.set_event_loop(loop)
-        summary = loop.run_until_complete(_bot_instance.price_monitor.get_market_summary())
+        summary = _bot_instance.price_monitor.get_market_summary()
         
         return jsonify({
             "status": "success",
@@ -378,6 +396,63 @@ def get_market_summary():
             "message": str(e)
         }), 500
 
+@bot_api.route("/market/consolidated", methods=["GET"])
+def get_consolidated_bbo():
+    """Get the best bid and ask venue per symbol across exchanges."""
+    try:
+        if _bot_instance is None:
+            return jsonify({
+                "status": "error",
+                "message": "Bot is not running"
+            }), 400
+        
+        consolidated = _bot_instance.price_monitor.consolidated_book.snapshot()
+        
+        return jsonify({
+            "status": "success",
+            "data": consolidated
+        }), 200
+        
+    except Exception as e:
+        logger.error(f"Error getting consolidated BBO: {e}", exc_info=True)
+        return jsonify({
+            "status": "error",
+            "message": str(e)
+        }), 500
+
+@bot_api.route("/market/history", methods=["GET"])
+def get_price_history():
+    """Get recent quotes of one symbol on one exchange, for charts."""
+    try:
+        if _bot_instance is None:
+            return jsonify({
+                "status": "error",
+                "message": "Bot is not running"
+            }), 400
+        
+        exchange = request.args.get("exchange")
+        symbol = request.args.get("symbol")
+        if not exchange or not symbol:
+            return jsonify({
+                "status": "error",
+                "message": "exchange and symbol are required"
+            }), 400
+        seconds = request.args.get("seconds", 300, type=float)
+        points = request.args.get("points", 500, type=int)
+        history = _bot_instance.price_monitor.get_price_history(exchange, symbol, seconds, points)
+        
+        return jsonify({
+            "status": "success",
+            "data": history or {}
+        }), 200
+        
+    except Exception as e:
+        logger.error(f"Error getting price history: {e}", exc_info=True)
+        return jsonify({
+            "status": "error",
+            "message": str(e)
+        }), 500
+
 @bot_api.route("/trades/active", methods=["GET"])
 def get_active_trades():
     """Get active trades."""
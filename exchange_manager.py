@@ -3,7 +3,7 @@ import os
 import math
 import asyncio
 import logging
-from typing import Dict, Any, Optional
+from typing import Dict, Any, Optional, Tuple
 from dataclasses import dataclass
 import time
 
@@ -21,6 +21,27 @@ class ArbitrageOpportunity:
     max_quantity: float
     timestamp: float
     score: float = 0.0 # Added score to dataclass
+    route: str = "direct" # "direct" (same symbol on two venues) or "cross_quote" (synthetic, see cross_quote_routes.py)
+    legs: Tuple[Tuple[str, str, str], ...] = () # (symbol, exchange, side) per leg of a non-direct route
+    first_seen: float = 0.0 # Lifecycle of the route, stamped by the price monitor's OpportunityTracker
+    last_seen: float = 0.0
+    peak_profit_pct: float = 0.0
+
+    @property
+    def route_key(self) -> Tuple:
+        """Identifies the route independently of its prices."""
+        return self.legs or (self.symbol, self.buy_exchange, self.sell_exchange)
+
+    @property
+    def route_id(self) -> str:
+        """Stable string form of route_key, e.g. BTCUSDT:binance>bybit."""
+        if self.legs:
+            return "|".join(f"{symbol}@{exchange}:{side}" for symbol, exchange, side in self.legs)
+        return f"{self.symbol}:{self.buy_exchange}>{self.sell_exchange}"
+
+    @property
+    def persistence_seconds(self) -> float:
+        return self.last_seen - self.first_seen
 
 class ExchangeManager:
     def __init__(self, exchanges_config: Dict[str, Any]):
@@ -28,6 +49,14 @@ class ExchangeManager:
         self.exchanges: Dict[str, Any] = {}
         self.initialized = False
         self.trading_fees: Dict[str, float] = {}
+        self.user_data = None # WebSocketManager with user-data streams; pushed orders/balances skip the REST round-trip
+        self.volatility_source = None # PriceMonitor, which tracks streaming volatility per (exchange, symbol)
+
+    def set_user_data_source(self, manager):
+        self.user_data = manager
+
+    def set_volatility_source(self, price_monitor):
+        self.volatility_source = price_monitor
 
     async def initialize_exchanges(self):
         if self.initialized:
@@ -88,6 +117,12 @@ class ExchangeManager:
         self.initialized = True
 
     async def fetch_order(self, exchange_name: str, symbol: str, order_id: str):
+        if self.user_data is not None and self.user_data.is_user_data_live(exchange_name):
+            # The venue pushes the order's state right after placement, so wait briefly for it before asking REST
+            update = await self.user_data.wait_for_order_update(exchange_name, order_id)
+            if update is not None:
+                logger.debug(f"Order {order_id} on {exchange_name} served from the user data stream: {update.status}")
+                return update.to_order_dict()
         exchange = self.exchanges[exchange_name]
 
         try:
@@ -245,6 +280,10 @@ class ExchangeManager:
             return None
 
     async def get_balance(self, exchange_id: str, currency: str) -> float:
+        if self.user_data is not None:
+            free = self.user_data.balance_book.get_free(exchange_id, currency)
+            if free is not None:
+                return free
         exchange = self.exchanges.get(exchange_id)
         try:
             balance = await asyncio.to_thread(exchange.fetch_balance)
@@ -253,9 +292,17 @@ class ExchangeManager:
             logger.error(f"Failed to fetch balance: {e}")
             return 0.0
 
+    async def fetch_balance_snapshot(self, exchange_id: str) -> Dict[str, Dict[str, float]]:
+        """REST {"free", "used", "total"} balances of one exchange, bypassing the balance book; raises on failure."""
+        balance = await asyncio.to_thread(self.exchanges[exchange_id].fetch_balance)
+        return {"free": balance["free"], "used": balance["used"], "total": balance["total"]}
+
     async def get_all_balances(self) -> Dict[str, Dict[str, float]]:
         all_balances = {}
         for exchange_id, exchange in self.exchanges.items():
+            if self.user_data is not None and self.user_data.balance_book.is_live(exchange_id):
+                all_balances[exchange_id] = self.user_data.balance_book.get_exchange(exchange_id)
+                continue
             try:
                 balance = await asyncio.to_thread(exchange.fetch_balance)
                 if asyncio.iscoroutine(balance):
@@ -302,12 +349,13 @@ class ExchangeManager:
         return self.trading_fees.get(exchange_id, 0.001) # Default to 0.001 if not found
 
     def get_exchange_volatility(self, exchange_id: str, symbol: str) -> float:
-        """Placeholder for getting exchange-specific volatility. 
-        In a real scenario, this would be calculated based on historical price data
-        or fetched from a market data provider.
+        """Realized volatility of symbol on exchange as a fraction (0.01 = 1%), from the price monitor's
+        streaming estimate. Falls back to 0.5% until enough ticks have been seen.
         """
-        # For now, return a dummy value. Lower value means lower volatility.
-        # This can be made dynamic based on actual market data later.
+        if self.volatility_source is not None:
+            volatility = self.volatility_source.get_volatility(exchange_id, symbol)
+            if volatility is not None:
+                return volatility
         return 0.005 # Example: 0.5% volatility
 
 
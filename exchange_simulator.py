@@ -0,0 +1,382 @@
+"""
+Local exchange simulator for feed load testing.
+
+Speaks the Binance combined-stream protocol (/stream?streams=<sym>@bookTicker/<sym>@depth@100ms)
+with a matching /api/v3/depth REST endpoint, and the Bybit v5 public spot protocol
+(orderbook.1 / orderbook.50 topics, ping/pong). Market data is synthetic (a random
+order book per symbol, so top-of-book, diffs and snapshots stay consistent) or replayed
+from MarketJournal files. Point WebSocketManager at it with
+
+    PERFORMANCE_CONFIG["websocket_urls"] = {"binance": sim.binance_ws_url, "bybit": sim.bybit_ws_url}
+    PERFORMANCE_CONFIG["binance_rest_url"] = sim.rest_url
+
+    python exchange_simulator.py [--rate 10000] [--symbols 50] [--port 9443] [--rest-port 9444]
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import random
+import time
+from typing import Dict, List, Optional, Tuple
+from urllib.parse import parse_qs, urlparse
+
+import websockets
+from aiohttp import web
+from websockets.protocol import State
+
+from market_data import BookDelta, BookSnapshot, Tick
+from market_journal import iter_journal_events, list_journals
+
+logger = logging.getLogger(__name__)
+
+BOOK_TICKER_FRAME = '{"stream":"%s@bookTicker","data":{"u":%d,"s":"%s","b":"%.8f","B":"%.8f","a":"%.8f","A":"%.8f"}}'
+DEPTH_FRAME = '{"stream":"%s@depth@100ms","data":{"e":"depthUpdate","E":%d,"s":"%s","U":%d,"u":%d,"b":%s,"a":%s}}'
+BYBIT_FRAME = '{"topic":"orderbook.%d.%s","type":"%s","ts":%d,"data":{"s":"%s","b":%s,"a":%s,"u":%d,"seq":%d},"cts":%d}'
+
+def _levels_json(levels) -> str:
+    return "[" + ",".join('["%.8f","%.8f"]' % (price, qty) for price, qty in levels) + "]"
+
+class SimulatedBook:
+    """Random-walk L2 book for one symbol; every change bumps the update id like a real venue."""
+
+    def __init__(self, symbol: str, rng: random.Random, levels: int = 20):
+        self.symbol = symbol
+        self.rng = rng
+        self.levels = levels
+        self.tick_size = 0.01
+        mid = round(rng.uniform(10, 50000), 2)
+        self.bids: Dict[float, float] = {round(mid - self.tick_size * i, 2): self._qty() for i in range(1, levels + 1)}
+        self.asks: Dict[float, float] = {round(mid + self.tick_size * i, 2): self._qty() for i in range(1, levels + 1)}
+        self.update_id = 1
+
+    def _qty(self) -> float:
+        return round(self.rng.uniform(0.01, 10), 4)
+
+    def step(self, changes: int = 2) -> Tuple[List, List]:
+        """Applies a few random level changes: quantity updates, removals and new levels, including inside the spread."""
+        bid_changes, ask_changes = [], []
+        for _ in range(changes):
+            is_bid = self.rng.random() < 0.5
+            side, out = (self.bids, bid_changes) if is_bid else (self.asks, ask_changes)
+            best_bid, best_ask = max(self.bids), min(self.asks)
+            offset = self.tick_size * self.rng.randint(-1, self.levels - 1)
+            price = round(best_bid - offset if is_bid else best_ask + offset, 2)
+            if (is_bid and price >= best_ask) or (not is_bid and price <= best_bid):
+                price = best_bid if is_bid else best_ask  # Never cross the book
+            if price in side and len(side) > 2 and self.rng.random() < 0.2:
+                del side[price]
+                out.append((price, 0.0))
+            else:
+                side[price] = self._qty()
+                out.append((price, side[price]))
+            if len(side) > 3 * self.levels:
+                # Drop the level furthest from the touch so the book stays bounded
+                worst = min(side) if is_bid else max(side)
+                del side[worst]
+                out.append((worst, 0.0))
+        return bid_changes, ask_changes
+
+    def top(self) -> Tuple[float, float, float, float]:
+        bid, ask = max(self.bids), min(self.asks)
+        return bid, self.bids[bid], ask, self.asks[ask]
+
+    def top_levels(self, depth: int):
+        bids = sorted(self.bids.items(), reverse=True)[:depth]
+        asks = sorted(self.asks.items())[:depth]
+        return bids, asks
+
+    def snapshot(self, limit: int = 1000) -> Dict:
+        bids, asks = self.top_levels(limit)
+        return {
+            "lastUpdateId": self.update_id,
+            "bids": [["%.8f" % price, "%.8f" % qty] for price, qty in bids],
+            "asks": [["%.8f" % price, "%.8f" % qty] for price, qty in asks],
+        }
+
+class ExchangeSimulator:
+    """WebSocket + REST server generating market data at a fixed total message rate.
+
+    The rate is shared by every open connection in proportion to its number of
+    streams, so sharded clients see the same aggregate load as a single
+    connection. gap_probability skips update ids to exercise the resync paths.
+    """
+
+    def __init__(self, symbols: Optional[List[str]] = None, symbol_count: int = 10, rate: float = 1000.0,
+                 host: str = "127.0.0.1", port: int = 0, rest_port: int = 0, seed: Optional[int] = None,
+                 gap_probability: float = 0.0, journal_dir: Optional[str] = None, tick_interval: float = 0.005,
+                 sent_counter=None):
+        self.symbols = list(symbols) if symbols else [f"SIM{i}USDT" for i in range(symbol_count)]
+        self.rate = rate
+        self.host = host
+        self.port = port
+        self.rest_port = rest_port
+        self.rng = random.Random(seed)
+        self.gap_probability = gap_probability
+        self.tick_interval = tick_interval
+        self.replay_frames: Optional[Dict[str, List]] = self._load_journal(journal_dir) if journal_dir else None
+        self.books = {symbol: SimulatedBook(symbol, self.rng) for symbol in self.symbols}
+        self.bybit_books = {symbol: SimulatedBook(symbol, self.rng) for symbol in self.symbols}  # Independent update ids per venue
+        self.replay_snapshots: Dict[str, Dict] = {}
+        self.messages_sent = 0
+        self.sent_counter = sent_counter  # Optional multiprocessing.Value mirroring messages_sent for another process
+        self.connections = 0
+        self._active_streams = 0
+        self._server = None
+        self._rest_runner = None
+
+    @property
+    def binance_ws_url(self) -> str:
+        return f"ws://{self.host}:{self.port}/ws/"
+
+    @property
+    def bybit_ws_url(self) -> str:
+        return f"ws://{self.host}:{self.port}/v5/public/spot"
+
+    @property
+    def rest_url(self) -> str:
+        return f"http://{self.host}:{self.rest_port}"
+
+    async def start(self):
+        self._server = await websockets.serve(self._handle_connection, self.host, self.port, max_queue=None)
+        self.port = self._server.sockets[0].getsockname()[1]
+        app = web.Application()
+        app.router.add_get("/api/v3/depth", self._handle_depth)
+        self._rest_runner = web.AppRunner(app)
+        await self._rest_runner.setup()
+        site = web.TCPSite(self._rest_runner, self.host, self.rest_port)
+        await site.start()
+        self.rest_port = site._server.sockets[0].getsockname()[1]
+        logger.info(f"Exchange simulator: {len(self.symbols)} symbols at {self.rate:,.0f} msg/s on {self.binance_ws_url}, REST {self.rest_url}")
+
+    async def stop(self):
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+            self._server = None
+        if self._rest_runner is not None:
+            await self._rest_runner.cleanup()
+            self._rest_runner = None
+
+    def _load_journal(self, directory: str) -> Dict[str, List]:
+        """Recorded Binance ticks/deltas per symbol, replayed (and looped) instead of synthetic data."""
+        frames: Dict[str, List] = {}
+        for _, exchange_id, path in list_journals(directory, "binance"):
+            for _, event in iter_journal_events(path, exchange_id):
+                frames.setdefault(event.symbol, []).append(event)
+        if frames:
+            self.symbols = sorted(frames)
+        logger.info(f"Exchange simulator replaying {sum(len(events) for events in frames.values())} recorded events from {directory}")
+        return frames
+
+    async def _handle_depth(self, request):
+        symbol = request.query.get("symbol", "")
+        limit = int(request.query.get("limit", 1000))
+        if self.replay_frames is not None and symbol in self.replay_snapshots:
+            return web.json_response(self.replay_snapshots[symbol])
+        book = self.books.get(symbol)
+        if book is None:
+            return web.json_response({"code": -1121, "msg": "Invalid symbol."}, status=400)
+        return web.json_response(book.snapshot(limit))
+
+    async def _handle_connection(self, connection):
+        path = connection.request.path
+        self.connections += 1
+        try:
+            if path.startswith("/stream"):
+                streams = parse_qs(urlparse(path).query).get("streams", [""])[0].split("/")
+                await self._serve_binance(connection, [stream for stream in streams if stream])
+            elif path.startswith("/v5/public"):
+                await self._serve_bybit(connection)
+            else:
+                await connection.close(code=1008, reason=f"Unsupported path {path}")
+        except websockets.ConnectionClosed:
+            pass
+        finally:
+            self.connections -= 1
+
+    async def _pace(self, connection, stream_count, send_batch):
+        """Calls send_batch(n) every tick_interval with this connection's share of the total rate, until it closes.
+
+        stream_count() is re-read every tick, since Bybit clients subscribe in several requests.
+        """
+        counted = 0
+        try:
+            budget = 0.0
+            last = time.perf_counter()
+            while connection.state is State.OPEN:
+                await asyncio.sleep(self.tick_interval)
+                current = stream_count()
+                self._active_streams += current - counted
+                counted = current
+                now = time.perf_counter()
+                budget += self.rate * current / max(self._active_streams, 1) * (now - last)
+                last = now
+                count = int(budget)
+                budget -= count
+                if count:
+                    await send_batch(count)
+                    if self.sent_counter is not None:
+                        self.sent_counter.value = self.messages_sent
+        finally:
+            self._active_streams -= counted
+
+    async def _serve_binance(self, connection, streams: List[str]):
+        subscriptions = []
+        for stream in streams:
+            symbol, _, kind = stream.partition("@")
+            symbol = symbol.upper()
+            if symbol in self.books or (self.replay_frames and symbol in self.replay_frames):
+                subscriptions.append((symbol, kind.startswith("depth")))
+        if not subscriptions:
+            await connection.close(code=1008, reason="No known streams")
+            return
+        cursor = {"index": 0, "replay": {}}
+
+        async def send_batch(count):
+            for _ in range(count):
+                symbol, depth = subscriptions[cursor["index"] % len(subscriptions)]
+                cursor["index"] += 1
+                frame = self._binance_frame(symbol, depth, cursor["replay"])
+                if frame is not None:
+                    await connection.send(frame)
+                    self.messages_sent += 1
+
+        await self._pace(connection, lambda: len(subscriptions), send_batch)
+
+    def _binance_frame(self, symbol: str, depth: bool, replay_cursor: Dict[str, int]) -> Optional[str]:
+        if self.replay_frames is not None:
+            return self._replayed_binance_frame(symbol, depth, replay_cursor)
+        book = self.books[symbol]
+        if depth:
+            first_update_id = book.update_id + 1
+            if self.gap_probability and self.rng.random() < self.gap_probability:
+                first_update_id += 1  # Simulated lost message
+            bids, asks = book.step()
+            book.update_id = first_update_id + self.rng.randint(0, 2)
+            return DEPTH_FRAME % (symbol.lower(), int(time.time() * 1000), symbol, first_update_id, book.update_id,
+                                  _levels_json(bids), _levels_json(asks))
+        bid, bid_qty, ask, ask_qty = book.top()
+        return BOOK_TICKER_FRAME % (symbol.lower(), book.update_id, symbol, bid, bid_qty, ask, ask_qty)
+
+    def _replayed_binance_frame(self, symbol: str, depth: bool, replay_cursor: Dict[str, int]) -> Optional[str]:
+        events = self.replay_frames.get(symbol)
+        if not events:
+            return None
+        key = f"{symbol}:{depth}"
+        for _ in range(len(events)):
+            index = replay_cursor.get(key, 0)
+            replay_cursor[key] = (index + 1) % len(events)
+            event = events[index]
+            if type(event) is BookSnapshot:
+                self.replay_snapshots[symbol] = {
+                    "lastUpdateId": event.update_id,
+                    "bids": [[str(price), str(qty)] for price, qty in event.bids],
+                    "asks": [[str(price), str(qty)] for price, qty in event.asks],
+                }
+            elif depth and type(event) is BookDelta:
+                return DEPTH_FRAME % (symbol.lower(), event.timestamp or int(time.time() * 1000), symbol,
+                                      event.first_update_id, event.final_update_id, _levels_json(event.bids), _levels_json(event.asks))
+            elif not depth and type(event) is Tick:
+                return BOOK_TICKER_FRAME % (symbol.lower(), event.update_id, symbol, event.bid, event.bid_qty, event.ask, event.ask_qty)
+        return None
+
+    async def _serve_bybit(self, connection):
+        subscriptions: List[Tuple[str, int]] = []
+        sender = None
+        try:
+            async for message in connection:
+                request = json.loads(message)
+                op = request.get("op")
+                if op == "ping":
+                    await connection.send(json.dumps({"success": True, "ret_msg": "pong", "conn_id": "sim", "op": "ping"}))
+                    continue
+                topics = request.get("args", [])
+                for topic in topics:
+                    _, depth, symbol = topic.split(".", 2)
+                    if symbol not in self.bybit_books:
+                        continue
+                    if op == "subscribe":
+                        subscriptions.append((symbol, int(depth)))
+                        if int(depth) > 1:
+                            await connection.send(self._bybit_frame(symbol, int(depth), snapshot=True))
+                    elif op == "unsubscribe" and (symbol, int(depth)) in subscriptions:
+                        subscriptions.remove((symbol, int(depth)))
+                await connection.send(json.dumps({"success": True, "ret_msg": "", "conn_id": "sim", "op": op}))
+                if sender is None and subscriptions:
+                    sender = asyncio.create_task(self._pump_bybit(connection, subscriptions))
+        finally:
+            if sender is not None:
+                sender.cancel()
+
+    async def _pump_bybit(self, connection, subscriptions):
+        cursor = {"index": 0}
+
+        async def send_batch(count):
+            for _ in range(count):
+                if not subscriptions:
+                    return
+                symbol, depth = subscriptions[cursor["index"] % len(subscriptions)]
+                cursor["index"] += 1
+                await connection.send(self._bybit_frame(symbol, depth))
+                self.messages_sent += 1
+
+        await self._pace(connection, lambda: len(subscriptions), send_batch)
+
+    def _bybit_frame(self, symbol: str, depth: int, snapshot: bool = False) -> str:
+        book = self.bybit_books[symbol]
+        now = int(time.time() * 1000)
+        if depth == 1:
+            bid, bid_qty, ask, ask_qty = book.top()
+            return BYBIT_FRAME % (1, symbol, "snapshot", now, symbol, _levels_json([(bid, bid_qty)]),
+                                  _levels_json([(ask, ask_qty)]), book.update_id, book.update_id, now)
+        if snapshot:
+            bids, asks = book.top_levels(depth)
+            return BYBIT_FRAME % (depth, symbol, "snapshot", now, symbol, _levels_json(bids), _levels_json(asks),
+                                  book.update_id, book.update_id, now)
+        bids, asks = book.step()
+        book.update_id += 2 if self.gap_probability and self.rng.random() < self.gap_probability else 1
+        return BYBIT_FRAME % (depth, symbol, "delta", now, symbol, _levels_json(bids), _levels_json(asks),
+                              book.update_id, book.update_id, now)
+
+    def get_stats(self) -> Dict[str, float]:
+        return {"messages_sent": self.messages_sent, "connections": self.connections, "symbols": len(self.symbols)}
+
+async def _serve_forever(args):
+    symbols = [symbol.strip().upper() for symbol in args.symbol_list.split(",")] if args.symbol_list else None
+    simulator = ExchangeSimulator(symbols=symbols, symbol_count=args.symbols, rate=args.rate, host=args.host,
+                                  port=args.port, rest_port=args.rest_port, seed=args.seed,
+                                  gap_probability=args.gap_probability, journal_dir=args.journal)
+    await simulator.start()
+    print(f"Binance WS: {simulator.binance_ws_url}  Bybit WS: {simulator.bybit_ws_url}  REST: {simulator.rest_url}")
+    last_sent = 0
+    try:
+        while True:
+            await asyncio.sleep(5)
+            sent = simulator.messages_sent
+            print(f"{simulator.connections} connection(s), {(sent - last_sent) / 5:,.0f} msg/s sent, {sent:,} total")
+            last_sent = sent
+    finally:
+        await simulator.stop()
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rate", type=float, default=10000, help="total messages per second across all connections")
+    parser.add_argument("--symbols", type=int, default=50, help="number of synthetic symbols (SIM0USDT, ...)")
+    parser.add_argument("--symbol-list", default="", help="comma-separated symbols instead of synthetic names")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=9443)
+    parser.add_argument("--rest-port", type=int, default=9444)
+    parser.add_argument("--seed", type=int, default=None)
+    parser.add_argument("--gap-probability", type=float, default=0.0, help="chance of skipping an update id per depth message")
+    parser.add_argument("--journal", default=None, help="replay Binance events from this MarketJournal directory")
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(name)s - %(levelname)s - %(message)s")
+    try:
+        asyncio.run(_serve_forever(args))
+    except KeyboardInterrupt:
+        pass
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,386 @@
+"""
+Native exchange feed adapters.
+
+Each adapter owns one venue's wire protocol: the connection URL, subscribe
+requests, parsing, application-level heartbeats and how a broken order book is
+resynced. Everything it parses is normalized into Tick, BookSnapshot and
+BookDelta records, so WebSocketManager runs every venue through the same
+connection loop, quote store and LocalOrderBook code.
+"""
+
+import json
+import logging
+import time
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Sequence, Type
+
+import aiohttp
+
+from market_data import BookDelta, BookSnapshot, Tick
+
+logger = logging.getLogger(__name__)
+
+# Longest first where one is a suffix of another (USDT before USD, FDUSD before USD)
+QUOTE_CURRENCIES = ("USDT", "USDC", "FDUSD", "BUSD", "TUSD", "DAI", "USD", "EUR", "GBP", "TRY", "BTC", "ETH", "BNB")
+
+def split_symbol(symbol: str):
+    """Splits a native symbol such as BTCUSDT into (base, quote)."""
+    for quote in QUOTE_CURRENCIES:
+        if symbol.endswith(quote) and len(symbol) > len(quote):
+            return symbol[:-len(quote)], quote
+    raise ValueError(f"Cannot determine the quote currency of symbol {symbol}")
+
+class FeedAdapter:
+    """Base class for a venue's native market data feed.
+
+    Subclasses set the class attributes and implement parse(); the other hooks
+    have defaults that suit venues which subscribe through the URL and rely on
+    protocol-level pings. Order books are resynced either from a REST snapshot
+    (snapshot_via_rest, with deltas buffered meanwhile) or by re-subscribing so
+    the venue pushes a fresh snapshot over the socket (resync_messages()).
+
+    With feed_redundancy > 1 the same adapter serves several connections per
+    shard (endpoint 0 is the primary URL, the others the standby URL), so
+    parse() must not let a late copy of an update roll its state back.
+    """
+
+    exchange_id = ""
+    default_url = ""
+    sandbox_url = ""
+    snapshot_via_rest = False
+    heartbeat_interval = 0.0  # Seconds between application-level pings, 0 = none needed
+    exchange_timestamps = True  # Tick.timestamp is the venue's event time (False: local receive time)
+    sequenced_books = True  # Book events carry venue-wide update ids, so copies from redundant connections can be deduped
+
+    def __init__(self, exchange_config: Dict[str, Any], performance_config: Dict[str, Any],
+                 symbols: Sequence[str], json_loads=None):
+        self.exchange_config = exchange_config or {}
+        self.performance_config = performance_config or {}
+        self.json_loads = json_loads or json.loads
+        self.retain_raw = self.performance_config.get("feed_retain_raw", False)
+        self.depth_enabled = self.performance_config.get("feed_depth_enabled", True)
+
+        self.url = self.sandbox_url if self.exchange_config.get("sandbox", False) and self.sandbox_url else self.default_url
+        if self.performance_config.get("websocket_urls", {}).get(self.exchange_id):
+            self.url = self.performance_config["websocket_urls"][self.exchange_id]
+        self.standby_url = self.performance_config.get("websocket_standby_urls", {}).get(self.exchange_id) or self.url
+        ws_config = self.performance_config.get("WEBSOCKET_CONFIG", {}).get(self.exchange_id, {})
+        if self.heartbeat_interval and ws_config.get("ping_interval"):
+            self.heartbeat_interval = ws_config["ping_interval"]
+
+        self.symbols = list(symbols)
+        self.symbol_by_venue = {self.venue_symbol(symbol): symbol for symbol in self.symbols}
+
+    def venue_symbol(self, symbol: str) -> str:
+        """Maps a native symbol (BTCUSDT) to the venue's instrument name."""
+        return symbol
+
+    def endpoint_url(self, endpoint: int = 0) -> str:
+        return self.url if endpoint == 0 else self.standby_url
+
+    def connection_url(self, symbols: Sequence[str], tickers: bool, depth: bool, endpoint: int = 0) -> str:
+        return self.endpoint_url(endpoint)
+
+    def subscribe_messages(self, symbols: Sequence[str], tickers: bool, depth: bool) -> List[Any]:
+        """Requests to send right after connecting."""
+        return []
+
+    def heartbeat_message(self) -> Optional[Any]:
+        return None
+
+    def resync_messages(self, symbol: str) -> List[Any]:
+        """Requests that make the venue push a fresh book snapshot for symbol."""
+        return []
+
+    async def fetch_snapshot(self, symbol: str) -> BookSnapshot:
+        raise NotImplementedError(f"{self.exchange_id} books are resynced over the WebSocket")
+
+    def parse(self, message, recv_ts: float) -> Sequence:
+        """Decodes one frame into Tick / BookSnapshot / BookDelta records (empty for control frames)."""
+        raise NotImplementedError
+
+    @staticmethod
+    def encode(message) -> str:
+        return message if isinstance(message, str) else json.dumps(message)
+
+FEED_ADAPTERS: Dict[str, Type[FeedAdapter]] = {}
+
+def register_feed_adapter(adapter_class: Type[FeedAdapter]) -> Type[FeedAdapter]:
+    """Class decorator that makes an adapter available to WebSocketManager under its exchange_id."""
+    FEED_ADAPTERS[adapter_class.exchange_id] = adapter_class
+    return adapter_class
+
+def get_feed_adapter(exchange_id: str) -> Optional[Type[FeedAdapter]]:
+    return FEED_ADAPTERS.get(exchange_id)
+
+@register_feed_adapter
+class BinanceFeedAdapter(FeedAdapter):
+    """Binance spot combined streams: <symbol>@bookTicker and <symbol>@depth@100ms.
+
+    Subscriptions are encoded in the URL. Books are synced from /api/v3/depth
+    and continued with the U/u ids of depthUpdate events.
+    """
+
+    exchange_id = "binance"
+    default_url = "wss://stream.binance.com:9443/ws/"
+    sandbox_url = "wss://stream.testnet.binance.vision/ws/"
+    snapshot_via_rest = True
+    exchange_timestamps = False  # bookTicker carries no event time
+
+    def __init__(self, exchange_config, performance_config, symbols, json_loads=None):
+        super().__init__(exchange_config, performance_config, symbols, json_loads)
+        self.rest_url = "https://testnet.binance.vision" if self.exchange_config.get("sandbox", False) else "https://api.binance.com"
+        if self.performance_config.get("binance_rest_url"):
+            self.rest_url = self.performance_config["binance_rest_url"]
+        self.snapshot_limit = self.performance_config.get("binance_depth_snapshot_limit", 1000)
+
+    def connection_url(self, symbols, tickers, depth, endpoint=0):
+        """Builds a combined-stream URL (/stream?streams=a/b/c) from the configured /ws/ endpoint."""
+        streams = []
+        if tickers:
+            streams.extend(f"{symbol.lower()}@bookTicker" for symbol in symbols)
+        if depth:
+            streams.extend(f"{symbol.lower()}@depth@100ms" for symbol in symbols)
+        base_url = self.endpoint_url(endpoint).rstrip("/")
+        if base_url.endswith("/ws"):
+            base_url = base_url[:-len("/ws")]
+        return f"{base_url}/stream?streams={'/'.join(streams)}"
+
+    def parse(self, message, recv_ts):
+        message = self.json_loads(message)
+        if not isinstance(message, dict):
+            return ()  # Only {"stream": ..., "data": {...}} frames carry market data
+        event = message.get("data")
+        if not isinstance(event, dict) or "s" not in event:
+            return ()
+        if event.get("e") == "depthUpdate":
+            return (BookDelta("binance", event["s"], event["b"], event["a"], event["U"], event["u"], event["E"]),)
+        return (Tick(
+            "binance",
+            event["s"],
+            float(event["b"]),
+            float(event["a"]),
+            float(event["B"]),
+            float(event["A"]),
+            int(time.time() * 1000),
+            event["u"],
+            recv_ts,
+            event if self.retain_raw else None,
+        ),)
+
+    async def fetch_snapshot(self, symbol):
+        url = f"{self.rest_url.rstrip('/')}/api/v3/depth"
+        params = {"symbol": symbol, "limit": self.snapshot_limit}
+        async with aiohttp.ClientSession() as session:
+            async with session.get(url, params=params, timeout=aiohttp.ClientTimeout(total=10)) as response:
+                response.raise_for_status()
+                snapshot = await response.json()
+        return BookSnapshot("binance", symbol, snapshot["bids"], snapshot["asks"], snapshot["lastUpdateId"])
+
+@register_feed_adapter
+class BybitFeedAdapter(FeedAdapter):
+    """Bybit v5 public spot: orderbook.1 for top of book, orderbook.50 for the local book.
+
+    Every orderbook.50 delta carries the next u, so a delta continues the book
+    when u == last u + 1; a snapshot (including the u=1 snapshot Bybit sends
+    after a service restart) replaces it.
+    """
+
+    exchange_id = "bybit"
+    default_url = "wss://stream.bybit.com/v5/public/spot"
+    sandbox_url = "wss://stream-testnet.bybit.com/v5/public/spot"
+    heartbeat_interval = 20.0
+    max_args_per_request = 10  # Spot rejects subscribe requests with more args
+    book_depth = 50
+
+    def __init__(self, exchange_config, performance_config, symbols, json_loads=None):
+        super().__init__(exchange_config, performance_config, symbols, json_loads)
+        self._top: Dict[str, List] = {}  # symbol -> [bid, bid_qty, ask, ask_qty, u], orderbook.1 may send one side only
+
+    def subscribe_messages(self, symbols, tickers, depth):
+        topics = []
+        if tickers:
+            topics.extend(f"orderbook.1.{symbol}" for symbol in symbols)
+        if depth:
+            topics.extend(f"orderbook.{self.book_depth}.{symbol}" for symbol in symbols)
+        return [
+            {"op": "subscribe", "args": topics[i:i + self.max_args_per_request]}
+            for i in range(0, len(topics), self.max_args_per_request)
+        ]
+
+    def heartbeat_message(self):
+        return {"op": "ping"}
+
+    def resync_messages(self, symbol):
+        topic = f"orderbook.{self.book_depth}.{symbol}"
+        return [{"op": "unsubscribe", "args": [topic]}, {"op": "subscribe", "args": [topic]}]
+
+    def parse(self, message, recv_ts):
+        data = self.json_loads(message)
+        topic = data.get("topic")
+        if topic is None:
+            if data.get("success") is False:
+                logger.warning(f"Bybit feed request failed: {data.get('ret_msg')}")
+            return ()
+        book = data["data"]
+        symbol = book["s"]
+        if topic.startswith("orderbook.1."):
+            top = self._top.get(symbol)
+            update_id = book["u"]
+            if top is not None and update_id < top[4] and update_id != 1:
+                return ()  # Late copy from a redundant connection; u=1 is Bybit's reset after a service restart
+            if top is None or data.get("type") == "snapshot":
+                top = self._top[symbol] = [0.0, 0.0, 0.0, 0.0, 0]
+            top[4] = update_id
+            if book["b"]:
+                top[0], top[1] = float(book["b"][0][0]), float(book["b"][0][1])
+            if book["a"]:
+                top[2], top[3] = float(book["a"][0][0]), float(book["a"][0][1])
+            if not top[0] or not top[2] or not top[1] or not top[3]:
+                return ()
+            return (Tick("bybit", symbol, top[0], top[2], top[1], top[3], data["ts"], update_id, recv_ts,
+                         data if self.retain_raw else None),)
+        if data.get("type") == "snapshot":
+            return (BookSnapshot("bybit", symbol, book["b"], book["a"], book["u"], data["ts"], self.book_depth),)
+        return (BookDelta("bybit", symbol, book["b"], book["a"], book["u"], book["u"], data["ts"], self.book_depth),)
+
+@register_feed_adapter
+class OkxFeedAdapter(FeedAdapter):
+    """OKX v5 public: bbo-tbt for top of book, books (400 levels) for the local book.
+
+    Book updates link to the previous message through prevSeqId, which maps to
+    first_update_id = prevSeqId + 1, final_update_id = seqId. OKX expects a
+    plain-text "ping" when the socket has been idle and answers "pong".
+    """
+
+    exchange_id = "okx"
+    default_url = "wss://ws.okx.com:8443/ws/v5/public"
+    sandbox_url = "wss://wspap.okx.com:8443/ws/v5/public"
+    heartbeat_interval = 25.0
+    book_depth = 400
+
+    def venue_symbol(self, symbol):
+        base, quote = split_symbol(symbol)
+        return f"{base}-{quote}"
+
+    def subscribe_messages(self, symbols, tickers, depth):
+        args = []
+        for symbol in symbols:
+            inst_id = self.venue_symbol(symbol)
+            if tickers:
+                args.append({"channel": "bbo-tbt", "instId": inst_id})
+            if depth:
+                args.append({"channel": "books", "instId": inst_id})
+        return [{"op": "subscribe", "args": args}] if args else []
+
+    def heartbeat_message(self):
+        return "ping"
+
+    def resync_messages(self, symbol):
+        args = [{"channel": "books", "instId": self.venue_symbol(symbol)}]
+        return [{"op": "unsubscribe", "args": args}, {"op": "subscribe", "args": args}]
+
+    def parse(self, message, recv_ts):
+        if message == b"pong" or message == "pong":
+            return ()
+        data = self.json_loads(message)
+        if "data" not in data:
+            if data.get("event") == "error":
+                logger.warning(f"OKX feed request failed: {data.get('code')} {data.get('msg')}")
+            return ()
+        arg = data["arg"]
+        symbol = self.symbol_by_venue.get(arg["instId"])
+        if symbol is None:
+            return ()
+        entry = data["data"][0]
+        bids = [(level[0], level[1]) for level in entry["bids"]]  # Levels are [price, size, "0", order_count]
+        asks = [(level[0], level[1]) for level in entry["asks"]]
+        timestamp = int(entry["ts"])
+        if arg["channel"] == "bbo-tbt":
+            if not bids or not asks:
+                return ()
+            return (Tick("okx", symbol, float(bids[0][0]), float(asks[0][0]), float(bids[0][1]), float(asks[0][1]),
+                         timestamp, entry.get("seqId", 0), recv_ts, data if self.retain_raw else None),)
+        if data.get("action") == "snapshot":
+            return (BookSnapshot("okx", symbol, bids, asks, entry["seqId"], timestamp, self.book_depth),)
+        return (BookDelta("okx", symbol, bids, asks, entry["prevSeqId"] + 1, entry["seqId"], timestamp, self.book_depth),)
+
+@register_feed_adapter
+class KrakenFeedAdapter(FeedAdapter):
+    """Kraken v2 public: ticker (event_trigger=bbo) for top of book, book (depth 10) for the local book.
+
+    Kraken book messages carry no sequence numbers, only a CRC32 of the top ten
+    levels that needs the pair's price/qty precision to reproduce. Updates are
+    therefore numbered locally (always in sequence) and a lost update is
+    recovered by the reconnect path, which rebuilds every book from the fresh
+    snapshots sent on subscribe.
+    """
+
+    exchange_id = "kraken"
+    default_url = "wss://ws.kraken.com/v2"
+    heartbeat_interval = 30.0
+    exchange_timestamps = False  # ticker messages carry no event time
+    sequenced_books = False  # Book updates are numbered locally, so only one connection per shard may carry them
+    book_depth = 10
+
+    def __init__(self, exchange_config, performance_config, symbols, json_loads=None):
+        super().__init__(exchange_config, performance_config, symbols, json_loads)
+        self._book_seq: Dict[str, int] = {}
+
+    def venue_symbol(self, symbol):
+        base, quote = split_symbol(symbol)
+        return f"{base}/{quote}"
+
+    def subscribe_messages(self, symbols, tickers, depth):
+        venue_symbols = [self.venue_symbol(symbol) for symbol in symbols]
+        requests = []
+        if tickers:
+            requests.append({"method": "subscribe", "params": {"channel": "ticker", "symbol": venue_symbols, "event_trigger": "bbo"}})
+        if depth:
+            requests.append({"method": "subscribe", "params": {"channel": "book", "symbol": venue_symbols, "depth": self.book_depth}})
+        return requests
+
+    def heartbeat_message(self):
+        return {"method": "ping"}
+
+    def resync_messages(self, symbol):
+        params = {"channel": "book", "symbol": [self.venue_symbol(symbol)], "depth": self.book_depth}
+        return [{"method": "unsubscribe", "params": params}, {"method": "subscribe", "params": params}]
+
+    @staticmethod
+    def _timestamp_ms(value) -> int:
+        if not value:
+            return 0
+        return int(datetime.fromisoformat(value.replace("Z", "+00:00")).timestamp() * 1000)
+
+    def parse(self, message, recv_ts):
+        data = self.json_loads(message)
+        channel = data.get("channel")
+        if channel == "ticker":
+            ticks = []
+            for entry in data["data"]:
+                symbol = self.symbol_by_venue.get(entry["symbol"])
+                if symbol is not None:
+                    ticks.append(Tick("kraken", symbol, float(entry["bid"]), float(entry["ask"]),
+                                      float(entry["bid_qty"]), float(entry["ask_qty"]), int(time.time() * 1000),
+                                      0, recv_ts, entry if self.retain_raw else None))
+            return ticks
+        if channel == "book":
+            events = []
+            for entry in data["data"]:
+                symbol = self.symbol_by_venue.get(entry["symbol"])
+                if symbol is None:
+                    continue
+                bids = [(level["price"], level["qty"]) for level in entry["bids"]]
+                asks = [(level["price"], level["qty"]) for level in entry["asks"]]
+                timestamp = self._timestamp_ms(entry.get("timestamp"))
+                if data.get("type") == "snapshot":
+                    self._book_seq[symbol] = 1
+                    events.append(BookSnapshot("kraken", symbol, bids, asks, 1, timestamp, self.book_depth))
+                else:
+                    seq = self._book_seq[symbol] = self._book_seq.get(symbol, 0) + 1
+                    events.append(BookDelta("kraken", symbol, bids, asks, seq, seq, timestamp, self.book_depth))
+            return events
+        if data.get("success") is False:
+            logger.warning(f"Kraken feed request failed: {data.get('error')}")
+        return ()
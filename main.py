@@ -6,6 +6,7 @@ import logging
 from arbitrage_bot import ArbitrageBot
 from config import load_config
 from websocket_manager import WebSocketManager
+from replay_feed import ReplayFeedManager
 
 logger = logging.getLogger(__name__)
 
@@ -14,12 +15,31 @@ def signal_handler(signum, frame):
     if hasattr(signal_handler, 'bot') and signal_handler.bot:
         signal_handler.bot.shutdown_event.set()
 
+def create_websocket_manager(config):
+    """Picks the market data source from PERFORMANCE_CONFIG["websocket_data_source"]."""
+    if config["PERFORMANCE_CONFIG"].get("websocket_data_source") == "replay":
+        return ReplayFeedManager(config)
+    return WebSocketManager(config)
+
+async def stop_when_replay_completes(bot, websocket_manager):
+    await websocket_manager.replay_complete.wait()
+    logger.info(f"Replay complete: {websocket_manager.get_replay_stats()}. Shutting down...")
+    bot.shutdown_event.set()
+
 async def main():
     config = load_config()
-    websocket_manager = WebSocketManager(config)
+    websocket_manager = create_websocket_manager(config)
     bot = ArbitrageBot(config)
     bot.set_websocket_manager(websocket_manager)  # <-- ENSURE THIS HAPPENS BEFORE STARTING BOT
 
+    if isinstance(websocket_manager, ReplayFeedManager):
+        # Replayed opportunities are historical, so they must not reach the exchanges unless explicitly allowed
+        if not config["PERFORMANCE_CONFIG"].get("replay_trading_enabled", False):
+            bot.trading_engine.trading_enabled = False
+            logger.info("Replay mode: trading disabled, opportunities are only logged.")
+        if config["PERFORMANCE_CONFIG"].get("replay_exit_on_complete", True):
+            asyncio.get_running_loop().create_task(stop_when_replay_completes(bot, websocket_manager))
+
     signal_handler.bot = bot
     signal.signal(signal.SIGINT, signal_handler)
     signal.signal(signal.SIGTERM, signal_handler)
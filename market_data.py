@@ -0,0 +1,94 @@
+"""
+Normalized market data records and the JSON decode path used by the feed handlers.
+"""
+
+import json
+import logging
+from dataclasses import dataclass
+from typing import Any, Callable, Optional, Sequence
+
+logger = logging.getLogger(__name__)
+
+@dataclass(slots=True)
+class Tick:
+    """Top-of-book quote for one (exchange, symbol).
+
+    Fixed fields and __slots__ keep a tick to a single small allocation. Ticks
+    are treated as immutable once published to the QuoteStore: a new update is
+    a new Tick, never an in-place edit.
+    """
+    exchange: str
+    symbol: str
+    bid: float
+    ask: float
+    bid_qty: float = 0.0
+    ask_qty: float = 0.0
+    timestamp: int = 0  # Exchange event time in ms (local receive time if the venue sends none)
+    update_id: int = 0
+    recv_ts: float = 0.0  # Local time.monotonic() when the update was received, for staleness checks
+    raw: Optional[Any] = None  # Original payload, only kept when feed_retain_raw is enabled
+
+@dataclass(slots=True)
+class BookSnapshot:
+    """Full L2 book replacement for one (exchange, symbol)."""
+    exchange: str
+    symbol: str
+    bids: Sequence  # [(price, qty), ...], prices/quantities as numbers or strings
+    asks: Sequence
+    update_id: int = 0
+    timestamp: int = 0  # Exchange event time in ms, 0 if unknown
+    max_depth: int = 0  # Venue only maintains this many levels per side (0 = unbounded)
+
+@dataclass(slots=True)
+class BookDelta:
+    """Incremental L2 update, normalized to Binance U/u continuity semantics.
+
+    A delta continues the book when first_update_id == last applied id + 1 (the
+    first delta after a snapshot only has to straddle it). Adapters map their
+    venue's sequencing onto this: a per-message counter becomes first == final,
+    a prev/current id pair becomes first = prev + 1, final = current.
+    """
+    exchange: str
+    symbol: str
+    bids: Sequence
+    asks: Sequence
+    first_update_id: int
+    final_update_id: int
+    timestamp: int = 0
+    max_depth: int = 0
+
+def _load_orjson() -> Callable[[Any], Any]:
+    import orjson
+    return orjson.loads
+
+def _load_msgspec() -> Callable[[Any], Any]:
+    import msgspec
+    return msgspec.json.Decoder().decode
+
+JSON_DECODERS = {
+    "orjson": _load_orjson,
+    "msgspec": _load_msgspec,
+    "json": lambda: json.loads,
+}
+
+def get_json_decoder(name: str = "auto") -> Callable[[Any], Any]:
+    """Returns a loads(bytes | str) callable.
+
+    "auto" picks orjson, then msgspec, then the stdlib, depending on what is
+    installed. An explicitly requested decoder that is not installed falls back
+    to the stdlib with a warning.
+    """
+    candidates = ["orjson", "msgspec", "json"] if name == "auto" else [name, "json"]
+    for candidate in candidates:
+        loader = JSON_DECODERS.get(candidate)
+        if loader is None:
+            logger.warning(f"Unknown JSON decoder '{candidate}', ignoring.")
+            continue
+        try:
+            decoder = loader()
+            logger.debug(f"Using {candidate} for feed JSON decoding.")
+            return decoder
+        except ImportError:
+            if name != "auto":
+                logger.warning(f"JSON decoder '{candidate}' is not installed. Falling back to stdlib json.")
+    return json.loads
@@ -0,0 +1,280 @@
+"""
+Binary market-data journal: fixed-width records in memory-mapped files, one file per exchange per UTC day.
+"""
+
+import logging
+import mmap
+import os
+import queue
+import struct
+import threading
+import time
+from datetime import datetime, timezone
+from typing import Dict, Iterator, List, Optional, Tuple
+
+import numpy as np
+
+from market_data import BookDelta, BookSnapshot, Tick
+
+logger = logging.getLogger(__name__)
+
+RECORD_TICK = 0
+RECORD_BOOK_SNAPSHOT = 1
+RECORD_BOOK_DELTA = 2
+
+FLAG_EVENT_END = 1  # Set on the last record of a book event
+
+JOURNAL_DTYPE = np.dtype([
+    ("recv_time_ns", "i8"),     # Local wall-clock receive time
+    ("timestamp", "i8"),        # Exchange event time in ms (0 if unknown)
+    ("update_id", "i8"),        # Tick update id, snapshot id, or a delta's final_update_id
+    ("first_update_id", "i8"),  # Delta's first_update_id
+    ("bid", "f8"),              # Tick: best bid. Book records: one bid level (NaN when the row has none)
+    ("bid_qty", "f8"),
+    ("ask", "f8"),
+    ("ask_qty", "f8"),
+    ("symbol", "S16"),
+    ("kind", "u1"),             # RECORD_TICK / RECORD_BOOK_SNAPSHOT / RECORD_BOOK_DELTA
+    ("flags", "u1"),
+    ("max_depth", "u2"),
+    ("_reserved", "V4"),
+])
+
+SYMBOL_BYTES = JOURNAL_DTYPE["symbol"].itemsize  # Longer symbols would be silently truncated, so they are not journaled
+
+JOURNAL_MAGIC = b"ARBJRNL1"
+_HEADER = struct.Struct("<8sIIQ")  # magic, format version, record size, record count
+HEADER_SIZE = 64
+JOURNAL_VERSION = 1
+
+def journal_path(directory: str, exchange_id: str, day: str) -> str:
+    return os.path.join(directory, f"{exchange_id}-{day}.journal")
+
+def event_to_records(event, recv_time_ns: int) -> List[Tuple]:
+    """Flattens a Tick / BookSnapshot / BookDelta into journal rows.
+
+    Book events become one row per level pair (bids[i], asks[i]) with NaN
+    padding on the shorter side; the last row carries FLAG_EVENT_END so the
+    reader can regroup them.
+    """
+    if type(event) is Tick:
+        return [(recv_time_ns, event.timestamp, event.update_id, 0, event.bid, event.bid_qty,
+                 event.ask, event.ask_qty, event.symbol.encode(), RECORD_TICK, FLAG_EVENT_END, 0, b"")]
+    if type(event) is BookDelta:
+        kind, first_update_id, update_id = RECORD_BOOK_DELTA, event.first_update_id, event.final_update_id
+    else:
+        kind, first_update_id, update_id = RECORD_BOOK_SNAPSHOT, 0, event.update_id
+    symbol = event.symbol.encode()
+    bids, asks = event.bids, event.asks
+    rows = []
+    nan = float("nan")
+    for i in range(max(len(bids), len(asks), 1)):
+        bid, bid_qty = (float(bids[i][0]), float(bids[i][1])) if i < len(bids) else (nan, nan)
+        ask, ask_qty = (float(asks[i][0]), float(asks[i][1])) if i < len(asks) else (nan, nan)
+        rows.append((recv_time_ns, event.timestamp, update_id, first_update_id, bid, bid_qty, ask, ask_qty,
+                     symbol, kind, 0, event.max_depth, b""))
+    rows[-1] = rows[-1][:10] + (FLAG_EVENT_END,) + rows[-1][11:]
+    return rows
+
+class _JournalFile:
+    """One memory-mapped journal file, grown in chunks of records as it fills up. Writer thread only."""
+
+    def __init__(self, path: str, chunk_records: int):
+        self.path = path
+        self.chunk_records = chunk_records
+        exists = os.path.exists(path) and os.path.getsize(path) >= HEADER_SIZE
+        self.fd = os.open(path, os.O_RDWR | os.O_CREAT, 0o644)
+        if exists:
+            with open(path, "rb") as f:
+                magic, _, record_size, self.count = _HEADER.unpack(f.read(_HEADER.size))
+            if magic != JOURNAL_MAGIC or record_size != JOURNAL_DTYPE.itemsize:
+                os.close(self.fd)
+                raise ValueError(f"{path} is not a compatible market journal")
+        else:
+            self.count = 0
+        self.capacity = 0
+        self.mm = None
+        self.records = None
+        self._map(max(self.count + chunk_records, chunk_records))
+
+    def _map(self, capacity: int):
+        if self.mm is not None:
+            self.records = None
+            self.mm.close()
+        os.ftruncate(self.fd, HEADER_SIZE + capacity * JOURNAL_DTYPE.itemsize)
+        self.mm = mmap.mmap(self.fd, HEADER_SIZE + capacity * JOURNAL_DTYPE.itemsize)
+        self.records = np.ndarray((capacity,), dtype=JOURNAL_DTYPE, buffer=self.mm, offset=HEADER_SIZE)
+        self.capacity = capacity
+        self._write_header()
+
+    def _write_header(self):
+        self.mm[:_HEADER.size] = _HEADER.pack(JOURNAL_MAGIC, JOURNAL_VERSION, JOURNAL_DTYPE.itemsize, self.count)
+
+    def append(self, rows: List[Tuple]):
+        if self.count + len(rows) > self.capacity:
+            self._map(self.capacity + max(self.chunk_records, len(rows)))
+        self.records[self.count:self.count + len(rows)] = rows
+        self.count += len(rows)
+        # The count is published after the rows, so a concurrent reader never sees unwritten records
+        self._write_header()
+
+    def close(self):
+        self.records = None
+        self.mm.flush()
+        self.mm.close()
+        self.mm = None
+        os.ftruncate(self.fd, HEADER_SIZE + self.count * JOURNAL_DTYPE.itemsize)  # Drop unused preallocation
+        os.close(self.fd)
+
+class MarketJournal:
+    """Records normalized ticks and book events to per-exchange, per-day journals.
+
+    record() only stamps the event with the wall clock and puts it on a bounded
+    queue, so it is safe to call from the feed handlers; a background thread
+    does the encoding and the disk I/O. When the queue is full the event is
+    dropped and counted rather than stalling the event loop.
+    """
+
+    def __init__(self, directory: str, queue_size: int = 100000, chunk_records: int = 65536, batch_size: int = 1024):
+        self.directory = directory
+        self.chunk_records = chunk_records
+        self.batch_size = batch_size
+        self.queue: "queue.Queue" = queue.Queue(maxsize=queue_size)
+        self.recorded = 0  # Events written
+        self.dropped = 0   # Events lost to a full queue
+        self.rejected = 0  # Events whose symbol does not fit the record
+        self._rejected_symbols = set()
+        self._files: Dict[Tuple[str, str], _JournalFile] = {}
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self):
+        os.makedirs(self.directory, exist_ok=True)
+        self._thread = threading.Thread(target=self._run, name="market-journal-writer", daemon=True)
+        self._thread.start()
+        logger.info(f"Market data journal recording to {self.directory}")
+
+    def record(self, event):
+        try:
+            self.queue.put_nowait((time.time_ns(), event))
+        except queue.Full:
+            self.dropped += 1
+
+    def _run(self):
+        while True:
+            item = self.queue.get()
+            batch = [item]
+            while item is not None and len(batch) < self.batch_size:
+                try:
+                    item = self.queue.get_nowait()
+                except queue.Empty:
+                    break
+                batch.append(item)
+            stop = batch[-1] is None
+            if stop:
+                batch.pop()
+            try:
+                self._write_batch(batch)
+            except Exception as e:
+                logger.error(f"Market journal write failed, {len(batch)} events lost: {e}")
+            if stop:
+                break
+        for journal_file in self._files.values():
+            journal_file.close()
+        self._files = {}
+
+    def _write_batch(self, batch):
+        rows_by_file: Dict[Tuple[str, str], List[Tuple]] = {}
+        written = 0
+        for recv_time_ns, event in batch:
+            if len(event.symbol.encode()) > SYMBOL_BYTES:
+                self._reject(event)
+                continue
+            day = datetime.fromtimestamp(recv_time_ns / 1e9, tz=timezone.utc).strftime("%Y%m%d")
+            rows_by_file.setdefault((event.exchange, day), []).extend(event_to_records(event, recv_time_ns))
+            written += 1
+        for (exchange_id, day), rows in rows_by_file.items():
+            journal_file = self._files.get((exchange_id, day))
+            if journal_file is None:
+                # A new day for this exchange: rotate, closing (and trimming) the previous day's file
+                for key in [key for key in self._files if key[0] == exchange_id]:
+                    self._files.pop(key).close()
+                journal_file = _JournalFile(journal_path(self.directory, exchange_id, day), self.chunk_records)
+                self._files[(exchange_id, day)] = journal_file
+            journal_file.append(rows)
+        self.recorded += written
+
+    def _reject(self, event):
+        self.rejected += 1
+        if event.symbol not in self._rejected_symbols:
+            self._rejected_symbols.add(event.symbol)
+            logger.error(f"Not journaling {event.exchange} {event.symbol}: symbols are limited to {SYMBOL_BYTES} bytes, "
+                         f"a truncated name would replay as a different market.")
+
+    def close(self, timeout: float = 10.0):
+        """Flushes everything queued so far and stops the writer thread. Blocks, so call it off the event loop."""
+        if self._thread is None:
+            return
+        self.queue.put(None)
+        self._thread.join(timeout)
+        self._thread = None
+        logger.info(f"Market data journal closed: {self.recorded} events recorded, {self.dropped} dropped, {self.rejected} rejected.")
+
+    def get_stats(self) -> Dict[str, int]:
+        return {"recorded": self.recorded, "dropped": self.dropped, "rejected": self.rejected, "queued": self.queue.qsize()}
+
+def read_journal(path: str) -> np.ndarray:
+    """Memory-maps a journal read-only and returns its records as a structured array, without copying."""
+    with open(path, "rb") as f:
+        magic, _, record_size, count = _HEADER.unpack(f.read(_HEADER.size))
+    if magic != JOURNAL_MAGIC or record_size != JOURNAL_DTYPE.itemsize:
+        raise ValueError(f"{path} is not a compatible market journal")
+    if count == 0:
+        return np.empty(0, dtype=JOURNAL_DTYPE)
+    return np.memmap(path, dtype=JOURNAL_DTYPE, mode="r", offset=HEADER_SIZE, shape=(count,))
+
+def iter_journal(path: str, batch_size: int = 65536) -> Iterator[np.ndarray]:
+    """Yields consecutive views of batch_size records."""
+    records = read_journal(path)
+    for start in range(0, len(records), batch_size):
+        yield records[start:start + batch_size]
+
+def iter_journal_events(path: str, exchange_id: str, batch_size: int = 65536) -> Iterator[Tuple[int, object]]:
+    """Rebuilds (recv_time_ns, Tick | BookSnapshot | BookDelta) from a journal, in file order."""
+    symbols: Dict[bytes, str] = {}
+    pending = []
+    for batch in iter_journal(path, batch_size):
+        for row in batch.tolist():
+            recv_time_ns, timestamp, update_id, first_update_id, bid, bid_qty, ask, ask_qty, symbol, kind, flags, max_depth, _ = row
+            name = symbols.get(symbol)
+            if name is None:
+                name = symbols[symbol] = symbol.decode()
+            if kind == RECORD_TICK:
+                yield recv_time_ns, Tick(exchange_id, name, bid, ask, bid_qty, ask_qty, timestamp, update_id)
+                continue
+            pending.append(row)
+            if not flags & FLAG_EVENT_END:
+                continue
+            bids = [(r[4], r[5]) for r in pending if r[4] == r[4]]  # NaN padding fails the self-comparison
+            asks = [(r[6], r[7]) for r in pending if r[6] == r[6]]
+            pending = []
+            if kind == RECORD_BOOK_SNAPSHOT:
+                yield recv_time_ns, BookSnapshot(exchange_id, name, bids, asks, update_id, timestamp, max_depth)
+            else:
+                yield recv_time_ns, BookDelta(exchange_id, name, bids, asks, first_update_id, update_id, timestamp, max_depth)
+
+def journal_files(directory: str, exchange_id: Optional[str] = None) -> List[str]:
+    """Journal paths in directory, ordered by day then exchange."""
+    return [path for _, _, path in list_journals(directory, exchange_id)]
+
+def list_journals(directory: str, exchange_id: Optional[str] = None) -> List[Tuple[str, str, str]]:
+    """(day, exchange_id, path) for every journal in directory, ordered by day then exchange."""
+    if not os.path.isdir(directory):
+        return []
+    journals = []
+    for name in os.listdir(directory):
+        if not name.endswith(".journal"):
+            continue
+        exchange, _, day = name[:-len(".journal")].rpartition("-")
+        if exchange_id is None or exchange == exchange_id:
+            journals.append((day, exchange, os.path.join(directory, name)))
+    return sorted(journals)
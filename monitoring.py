@@ -5,8 +5,9 @@ import smtplib
 from email.mime.text import MIMEText
 from email.mime.multipart import MIMEMultipart
 from datetime import datetime, timedelta
-from collections import deque
-from typing import Dict, Any, List, Optional
+from collections import deque, defaultdict
+from typing import Dict, Any, List, Optional, Tuple
+import bisect
 import uuid
 import time
 from dataclasses import dataclass
@@ -132,11 +133,99 @@ class PerformanceMonitor:
             "active_trades": self.active_trades_count
         }
 
+class LatencyHistogram:
+    """Fixed log-scale latency histogram (milliseconds). Recording is O(log buckets) and allocation-free."""
+
+    BUCKET_BOUNDS_MS = (0.1, 0.25, 0.5, 1, 2.5, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000, float("inf"))
+
+    def __init__(self):
+        self.counts = [0] * len(self.BUCKET_BOUNDS_MS)
+        self.count = 0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+
+    def record(self, value_ms: float):
+        self.counts[bisect.bisect_left(self.BUCKET_BOUNDS_MS, value_ms)] += 1
+        self.count += 1
+        self.total_ms += value_ms
+        if value_ms > self.max_ms:
+            self.max_ms = value_ms
+
+    def percentile(self, pct: float) -> float:
+        """Upper bound of the bucket containing the given percentile."""
+        if self.count == 0:
+            return 0.0
+        target = self.count * pct / 100.0
+        cumulative = 0
+        for bound, bucket_count in zip(self.BUCKET_BOUNDS_MS, self.counts):
+            cumulative += bucket_count
+            if cumulative >= target:
+                return min(bound, self.max_ms)
+        return self.max_ms
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "count": self.count,
+            "avg_ms": self.total_ms / self.count if self.count else 0.0,
+            "p50_ms": self.percentile(50),
+            "p99_ms": self.percentile(99),
+            "max_ms": self.max_ms,
+        }
+
+class FeedLatencyMonitor:
+    """Per-(exchange, symbol) feed lag (exchange event time -> local receive) and inter-arrival histograms.
+
+    Feed lag tells a slow or stalled venue apart from a slow bot: lag grows when the exchange or
+    network is behind, inter-arrival gaps grow when updates stop coming at all.
+    """
+
+    def __init__(self):
+        self.feed_lag: Dict[Tuple[str, str], LatencyHistogram] = defaultdict(LatencyHistogram)
+        self.inter_arrival: Dict[Tuple[str, str], LatencyHistogram] = defaultdict(LatencyHistogram)
+        self.last_receive: Dict[Tuple[str, str], float] = {}
+
+    def record_tick(self, exchange: str, symbol: str, recv_ts: float, exchange_ts_ms: Optional[float] = None):
+        """recv_ts is time.monotonic() at receipt; exchange_ts_ms is the venue's event time, if it sends one."""
+        key = (exchange, symbol)
+        previous = self.last_receive.get(key)
+        if previous is not None:
+            self.inter_arrival[key].record((recv_ts - previous) * 1000)
+        self.last_receive[key] = recv_ts
+        if exchange_ts_ms:
+            # Wall clocks on both sides, so clock skew shows up here as a constant offset
+            self.record_lag(exchange, symbol, time.time() * 1000 - exchange_ts_ms)
+
+    def record_lag(self, exchange: str, symbol: str, lag_ms: float):
+        """Records one exchange-to-local lag sample (negative values from clock skew count as 0)."""
+        self.feed_lag[(exchange, symbol)].record(max(0.0, lag_ms))
+
+    def get_stale_feeds(self, max_age_ms: float) -> List[Dict[str, Any]]:
+        now = time.monotonic()
+        return [
+            {"exchange": exchange, "symbol": symbol, "age_ms": (now - last) * 1000}
+            for (exchange, symbol), last in list(self.last_receive.items())
+            if (now - last) * 1000 > max_age_ms
+        ]
+
+    def get_feed_metrics(self) -> Dict[str, Any]:
+        now = time.monotonic()
+        metrics = {}
+        for key, last in list(self.last_receive.items()):
+            exchange, symbol = key
+            metrics.setdefault(exchange, {})[symbol] = {
+                "age_ms": (now - last) * 1000,
+                "feed_lag": self.feed_lag[key].to_dict() if key in self.feed_lag else None,
+                "inter_arrival": self.inter_arrival[key].to_dict() if key in self.inter_arrival else None,
+            }
+        return metrics
+
 class MonitoringSystem:
     def __init__(self, config: Dict[str, Any]):
         self.config = config
         self.alert_manager = AlertManager(config["MONITORING_CONFIG"])
         self.performance_monitor = PerformanceMonitor()
+        self.feed_latency_monitor = FeedLatencyMonitor()
+        self.max_quote_age_ms = config["PERFORMANCE_CONFIG"].get("max_quote_age_ms", 5000)
         self.is_running = False
         self.health_check_interval = config["PERFORMANCE_CONFIG"].get("main_loop_interval", 10) # Default 10 seconds
 
@@ -184,6 +273,12 @@ class MonitoringSystem:
             self.alert_manager.create_alert("High Memory Usage", f"Memory usage is {memory_usage}%", "warning", "System")
             risk_level = "Medium"
 
+        stale_feeds = self.feed_latency_monitor.get_stale_feeds(self.max_quote_age_ms)
+        if stale_feeds:
+            stale_names = ", ".join(f"{feed['exchange']}:{feed['symbol']}" for feed in stale_feeds[:10])
+            self.alert_manager.create_alert("Stale Market Data", f"{len(stale_feeds)} feed(s) older than {self.max_quote_age_ms}ms: {stale_names}", "warning", "WebSocketManager")
+            risk_level = "Medium"
+
         return {
             "system_status": "Operational",
             "cpu_usage": cpu_usage,
@@ -192,6 +287,7 @@ class MonitoringSystem:
             "circuit_breaker_active": False, # This should come from SafetyManager
             "daily_loss": daily_loss,
             "consecutive_losses": consecutive_losses,
+            "stale_feeds": stale_feeds,
             "risk_level": risk_level
         }
 
@@ -199,4 +295,7 @@ class MonitoringSystem:
         self.performance_monitor.update_metrics(active_trades_count, opportunities_found, trade_execution_times)
 
     def get_current_performance_metrics(self) -> Dict[str, Any]:
-        return self.performance_monitor.get_current_metrics()
\ No newline at end of file
+        return self.performance_monitor.get_current_metrics()
+
+    def get_feed_latency_metrics(self) -> Dict[str, Any]:
+        return self.feed_latency_monitor.get_feed_metrics()
\ No newline at end of file
@@ -0,0 +1,117 @@
+"""
+Bounded, score-ordered queue of pending opportunities with per-entry expiry, popped directly by the executor.
+"""
+
+import heapq
+import time
+from collections import deque
+from typing import Deque, Dict, List, Optional, Tuple
+
+from exchange_manager import ArbitrageOpportunity
+
+class OpportunityQueue:
+    """Top-K pending opportunities by score, one entry per route.
+
+    The best entry comes off a max-heap and the worst off a min-heap, both
+    keyed by (score, version, route_key). Re-pushing a route replaces its
+    entry: the new version is pushed in O(log n) and the superseded heap
+    entries are dropped lazily when they surface (their version no longer
+    matches the live entry), with both heaps rebuilt once stale entries
+    outnumber live ones. When the queue is full a new entry must beat the
+    current worst, which is evicted. Entries expire ttl seconds after they
+    were pushed; as the TTL is the same for all, expiry order is push order,
+    so a FIFO of pushes lets every call drop whatever has expired in
+    amortized O(1) before touching the heaps.
+    """
+
+    def __init__(self, capacity: int = 100, ttl: float = 2.0):
+        self.capacity = max(1, capacity)
+        self.ttl = ttl
+        self.entries: Dict[Tuple, Tuple[ArbitrageOpportunity, int, float]] = {}  # {route_key: (opportunity, version, expires_at)}
+        self._best: List[Tuple[float, int, Tuple]] = []  # (-score, version, route_key)
+        self._worst: List[Tuple[float, int, Tuple]] = []  # (score, version, route_key)
+        self._expiry: Deque[Tuple[float, int, Tuple]] = deque()  # (expires_at, version, route_key) in push order
+        self._version = 0
+        self.stats = {"pushed": 0, "replaced": 0, "rejected": 0, "evicted": 0, "expired": 0, "popped": 0}
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    def push(self, opportunity: ArbitrageOpportunity, now: Optional[float] = None) -> bool:
+        """Adds or replaces the route's entry. Returns False when the queue is full of better opportunities."""
+        now = now if now is not None else time.time()
+        self._expire(now)
+        key = opportunity.route_key
+        if key in self.entries:
+            self.stats["replaced"] += 1
+        elif len(self.entries) >= self.capacity:
+            worst = self._top(self._worst)
+            if worst is not None:
+                if opportunity.score <= worst[0]:
+                    self.stats["rejected"] += 1
+                    return False
+                del self.entries[worst[2]]
+                self.stats["evicted"] += 1
+        self._version += 1
+        self.entries[key] = (opportunity, self._version, now + self.ttl)
+        heapq.heappush(self._best, (-opportunity.score, self._version, key))
+        heapq.heappush(self._worst, (opportunity.score, self._version, key))
+        self._expiry.append((now + self.ttl, self._version, key))
+        self.stats["pushed"] += 1
+        if len(self._best) + len(self._worst) > 4 * len(self.entries) + 32:
+            self._rebuild()
+        return True
+
+    def pop(self, now: Optional[float] = None) -> Optional[ArbitrageOpportunity]:
+        """Removes and returns the highest-scored live opportunity, None when nothing unexpired is queued."""
+        self._expire(now if now is not None else time.time())
+        entry = self._top(self._best)
+        if entry is None:
+            return None
+        heapq.heappop(self._best)
+        opportunity = self.entries.pop(entry[2])[0]
+        self.stats["popped"] += 1
+        return opportunity
+
+    def peek(self, now: Optional[float] = None) -> Optional[ArbitrageOpportunity]:
+        self._expire(now if now is not None else time.time())
+        entry = self._top(self._best)
+        return None if entry is None else self.entries[entry[2]][0]
+
+    def remove(self, route_key: Tuple) -> bool:
+        """Drops a route's entry (e.g. the route closed); its heap entries expire lazily."""
+        return self.entries.pop(route_key, None) is not None
+
+    def snapshot(self, now: Optional[float] = None) -> List[ArbitrageOpportunity]:
+        """Live entries, best first, without removing them."""
+        self._expire(now if now is not None else time.time())
+        return sorted((opportunity for opportunity, _, _ in self.entries.values()), key=lambda opportunity: -opportunity.score)
+
+    def _expire(self, now: float):
+        expiry, entries = self._expiry, self.entries
+        while expiry and expiry[0][0] <= now:
+            _, version, key = expiry.popleft()
+            live = entries.get(key)
+            if live is not None and live[1] == version:
+                del entries[key]
+                self.stats["expired"] += 1
+
+    def _top(self, heap: List[Tuple[float, int, Tuple]]) -> Optional[Tuple[float, int, Tuple]]:
+        """Live head of a heap, discarding superseded entries on the way."""
+        entries = self.entries
+        while heap:
+            entry = heap[0]
+            live = entries.get(entry[2])
+            if live is not None and live[1] == entry[1]:
+                return entry
+            heapq.heappop(heap)
+        return None
+
+    def _rebuild(self):
+        self._best = [(-opportunity.score, version, key) for key, (opportunity, version, _) in self.entries.items()]
+        self._worst = [(opportunity.score, version, key) for key, (opportunity, version, _) in self.entries.items()]
+        heapq.heapify(self._best)
+        heapq.heapify(self._worst)
+
+    def get_stats(self) -> Dict[str, int]:
+        return dict(self.stats, queued=len(self.entries))
@@ -0,0 +1,102 @@
+"""
+Lifecycle of arbitrage routes across scans: when a route opened, how long it persisted, and whether it changed enough to re-emit.
+"""
+
+import logging
+import time
+from collections import deque
+from dataclasses import dataclass
+from typing import Deque, Dict, Iterable, List, Optional, Tuple
+
+from exchange_manager import ArbitrageOpportunity
+
+logger = logging.getLogger(__name__)
+
+@dataclass(slots=True)
+class RouteLifecycle:
+    """One continuous run of a route being profitable."""
+    route_key: Tuple
+    route_id: str
+    first_seen: float
+    last_seen: float
+    peak_profit_pct: float
+    emitted_profit_pct: float  # Values at the last emission to the executor
+    emitted_quantity: float
+    observations: int = 1
+    emissions: int = 1
+
+    @property
+    def persistence_seconds(self) -> float:
+        return self.last_seen - self.first_seen
+
+def route_symbols(route_key: Tuple) -> Tuple[str, ...]:
+    """Symbols a route reads: (symbol,) for a direct route key, every leg's symbol for a multi-leg one."""
+    if route_key and isinstance(route_key[0], tuple):
+        return tuple(leg[0] for leg in route_key)
+    return (route_key[0],)
+
+class OpportunityTracker:
+    """Tracks routes by route_key across scans and decides which observations reach the executor.
+
+    A route is emitted when it first appears and again only when its profit
+    moved by at least min_change_pct percentage points or its quantity by
+    min_quantity_change (a fraction) since the last emission, so a
+    persistent dislocation is not dispatched on every tick. A route that a
+    scan no longer finds is closed, and its lifetime kept for statistics.
+    """
+
+    def __init__(self, min_change_pct: float = 0.05, min_quantity_change: float = 0.25, closed_history: int = 1000):
+        self.min_change_pct = min_change_pct
+        self.min_quantity_change = min_quantity_change
+        self.active: Dict[Tuple, RouteLifecycle] = {}
+        self.closed: Deque[RouteLifecycle] = deque(maxlen=closed_history)
+        self.suppressed = 0  # Observations not re-emitted
+
+    def observe(self, opportunity: ArbitrageOpportunity, now: Optional[float] = None) -> bool:
+        """Records an observation, stamps its lifecycle fields, and returns True if the executor should see it."""
+        now = now if now is not None else time.time()
+        key = opportunity.route_key
+        lifecycle = self.active.get(key)
+        if lifecycle is None:
+            lifecycle = self.active[key] = RouteLifecycle(key, opportunity.route_id, now, now, opportunity.potential_profit_pct,
+                                                          opportunity.potential_profit_pct, opportunity.max_quantity)
+            emit = True
+        else:
+            lifecycle.last_seen = now
+            lifecycle.observations += 1
+            lifecycle.peak_profit_pct = max(lifecycle.peak_profit_pct, opportunity.potential_profit_pct)
+            emit = (abs(opportunity.potential_profit_pct - lifecycle.emitted_profit_pct) >= self.min_change_pct or
+                    abs(opportunity.max_quantity - lifecycle.emitted_quantity) > self.min_quantity_change * lifecycle.emitted_quantity)
+            if emit:
+                lifecycle.emitted_profit_pct = opportunity.potential_profit_pct
+                lifecycle.emitted_quantity = opportunity.max_quantity
+                lifecycle.emissions += 1
+            else:
+                self.suppressed += 1
+        opportunity.first_seen = lifecycle.first_seen
+        opportunity.last_seen = lifecycle.last_seen
+        opportunity.peak_profit_pct = lifecycle.peak_profit_pct
+        return emit
+
+    def sweep(self, symbols: Iterable[str], seen: Iterable[Tuple], now: Optional[float] = None) -> List[RouteLifecycle]:
+        """Closes the active routes through any of symbols that the scan of those symbols did not find again."""
+        symbols, seen = set(symbols), set(seen)
+        closed = []
+        for key in [key for key in self.active if key not in seen and any(symbol in symbols for symbol in route_symbols(key))]:
+            lifecycle = self.active.pop(key)
+            if now is not None:
+                lifecycle.last_seen = max(lifecycle.last_seen, now)
+            self.closed.append(lifecycle)
+            closed.append(lifecycle)
+            logger.debug(f"Route {lifecycle.route_id} closed after {lifecycle.persistence_seconds:.3f}s (peak {lifecycle.peak_profit_pct:.3f}%).")
+        return closed
+
+    def get_stats(self) -> Dict[str, float]:
+        durations = [lifecycle.persistence_seconds for lifecycle in self.closed]
+        return {
+            "active": len(self.active),
+            "closed": len(self.closed),
+            "suppressed": self.suppressed,
+            "mean_persistence_seconds": sum(durations) / len(durations) if durations else 0.0,
+            "max_persistence_seconds": max(durations) if durations else 0.0,
+        }
@@ -0,0 +1,155 @@
+"""
+Locally maintained L2 order books built from a REST snapshot plus diff-depth events.
+"""
+
+import bisect
+import logging
+from typing import Dict, List, Tuple, Iterable
+
+from book_depth import BookDepth
+
+logger = logging.getLogger(__name__)
+
+class LocalOrderBook:
+    """L2 order book for one (exchange, symbol) kept in sync from diff events.
+
+    Prices are held in sorted lists next to a price -> quantity dict so a diff is a
+    bisect insert/delete and a top-N view is a plain slice. Views are cached per
+    book version, so repeated reads between updates cost nothing.
+    """
+
+    def __init__(self, exchange: str, symbol: str):
+        self.exchange = exchange
+        self.symbol = symbol
+        self.bids: Dict[float, float] = {}
+        self.asks: Dict[float, float] = {}
+        self._bid_prices: List[float] = []  # ascending, best bid is last
+        self._ask_prices: List[float] = []  # ascending, best ask is first
+        self.last_update_id = 0
+        self.synced = False
+        self.version = 0
+        self._first_diff_applied = False
+        self._view_cache: Dict[Tuple[str, int], object] = {}  # Top-N level lists and their BookDepth arrays
+        self._view_cache_version = -1
+
+    def apply_snapshot(self, bids: Iterable, asks: Iterable, last_update_id: int):
+        """Replaces the book with a REST snapshot and marks it synced."""
+        self.bids = {float(price): float(qty) for price, qty in bids if float(qty) > 0}
+        self.asks = {float(price): float(qty) for price, qty in asks if float(qty) > 0}
+        self._bid_prices = sorted(self.bids)
+        self._ask_prices = sorted(self.asks)
+        self.last_update_id = last_update_id
+        self.synced = True
+        self._first_diff_applied = False
+        self.version += 1
+
+    def apply_diff(self, first_update_id: int, final_update_id: int, bids: Iterable, asks: Iterable) -> bool:
+        """Applies a diff-depth event (Binance U/u semantics).
+
+        Returns False when the event does not continue the sequence, in which case
+        the book is marked unsynced and the caller must resync from a new snapshot.
+        Events already covered by the snapshot are ignored.
+        """
+        if not self.synced:
+            return False
+        if final_update_id <= self.last_update_id:
+            return True  # Already contained in the snapshot / previous diffs
+
+        if self._first_diff_applied:
+            in_sequence = first_update_id == self.last_update_id + 1
+        else:
+            in_sequence = first_update_id <= self.last_update_id + 1 <= final_update_id
+        if not in_sequence:
+            logger.warning(
+                f"Order book gap on {self.exchange} {self.symbol}: expected update {self.last_update_id + 1}, "
+                f"got {first_update_id}-{final_update_id}. Resync required."
+            )
+            self.invalidate()
+            return False
+
+        self.apply_levels(bids, asks)
+        self.last_update_id = final_update_id
+        self._first_diff_applied = True
+        return True
+
+    def apply_levels(self, bids: Iterable, asks: Iterable):
+        """Sets absolute quantities for price levels; a zero quantity removes the level."""
+        for price, qty in bids:
+            self._set_level(self.bids, self._bid_prices, float(price), float(qty))
+        for price, qty in asks:
+            self._set_level(self.asks, self._ask_prices, float(price), float(qty))
+        self.version += 1
+
+    @staticmethod
+    def _set_level(levels: Dict[float, float], prices: List[float], price: float, qty: float):
+        if qty <= 0:
+            if levels.pop(price, None) is not None:
+                index = bisect.bisect_left(prices, price)
+                del prices[index]
+        else:
+            if price not in levels:
+                bisect.insort(prices, price)
+            levels[price] = qty
+
+    def truncate(self, depth: int):
+        """Drops levels beyond depth per side, for venues whose feed only maintains the top N levels."""
+        if len(self._bid_prices) > depth:
+            for price in self._bid_prices[:-depth]:
+                del self.bids[price]
+            del self._bid_prices[:-depth]
+        if len(self._ask_prices) > depth:
+            for price in self._ask_prices[depth:]:
+                del self.asks[price]
+            del self._ask_prices[depth:]
+
+    def invalidate(self):
+        """Marks the book as out of sync; readers see no book until it is resynced."""
+        self.synced = False
+        self._first_diff_applied = False
+        self.version += 1
+
+    def _cached_view(self, side: str, depth: int) -> List[Tuple[float, float]]:
+        if self._view_cache_version != self.version:
+            self._view_cache = {}
+            self._view_cache_version = self.version
+        key = (side, depth)
+        view = self._view_cache.get(key)
+        if view is None:
+            if side == "bids":
+                view = [(price, self.bids[price]) for price in reversed(self._bid_prices[-depth:])]
+            else:
+                view = [(price, self.asks[price]) for price in self._ask_prices[:depth]]
+            self._view_cache[key] = view
+        return view
+
+    def top_bids(self, depth: int = 20) -> List[Tuple[float, float]]:
+        """Best bids first, as (price, quantity) tuples."""
+        return self._cached_view("bids", depth)
+
+    def top_asks(self, depth: int = 20) -> List[Tuple[float, float]]:
+        """Best asks first, as (price, quantity) tuples."""
+        return self._cached_view("asks", depth)
+
+    def depth(self, side: str, depth: int = 20) -> BookDepth:
+        """Cumulative quantity/notional arrays of the top levels of one side ("bids" or "asks"), cached per book version."""
+        self._cached_view(side, depth)  # Resets the cache if the book changed
+        key = (side + "_depth", depth)
+        cumulative = self._view_cache.get(key)
+        if cumulative is None:
+            cumulative = self._view_cache[key] = BookDepth(self._cached_view(side, depth))
+        return cumulative
+
+    def best_bid(self):
+        return self._bid_prices[-1] if self._bid_prices else None
+
+    def best_ask(self):
+        return self._ask_prices[0] if self._ask_prices else None
+
+    def to_dict(self, depth: int = 20) -> Dict[str, object]:
+        """ccxt-style order book dict, for callers that expect fetch_order_book output."""
+        return {
+            "symbol": self.symbol,
+            "bids": self.top_bids(depth),
+            "asks": self.top_asks(depth),
+            "nonce": self.last_update_id,
+        }
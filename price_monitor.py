@@ -1,12 +1,22 @@
 import asyncio
 import logging
+import math
 import time
-from typing import Dict, Any, List, Optional, Callable
+from typing import Dict, Any, List, Optional, Callable, Tuple
 from dataclasses import dataclass, field
-from collections import defaultdict, deque
-import statistics
 
 from exchange_manager import ExchangeManager, ArbitrageOpportunity
+from market_data import Tick
+from quote_store import ConflatingQueue
+from spread_matrix import SpreadMatrix
+from consolidated_book import ConsolidatedBook
+from triangular_arbitrage import TriangularArbitrageDetector
+from time_series import QuoteSeries, QuoteWindow
+from opportunity_tracker import OpportunityTracker
+from opportunity_queue import OpportunityQueue
+from sharded_scanner import ShardedScanner
+from cross_quote_routes import CrossQuoteRouter, CrossQuoteRoute, market_currencies
+from book_depth import BookDepth, DepthFill, optimal_fill
 from config import TRADING_CONFIG, PERFORMANCE_CONFIG, RISK_CONFIG
 
 logger = logging.getLogger(__name__)
@@ -23,6 +33,44 @@ class PriceAlert:
     timestamp: float
     message: str
 
+class StreamingVolatility:
+    """Realized volatility of a mid price over a sliding time window, updated in O(1) per tick.
+
+    Keeps an exponentially time-decayed sum of squared log returns: each
+    update decays the sum by exp(-dt / window) and adds the new return
+    squared, so the sum approximates the realized variance of the last
+    `window` seconds without storing the ticks. Reads apply the decay up to
+    the read time, so a quiet market drifts back towards zero volatility.
+    """
+
+    __slots__ = ("window", "variance", "last_price", "last_timestamp", "samples")
+
+    def __init__(self, window: float = 300.0):
+        self.window = window
+        self.variance = 0.0
+        self.last_price = 0.0
+        self.last_timestamp = 0.0
+        self.samples = 0
+
+    def update(self, price: float, timestamp: float):
+        if price <= 0:
+            return
+        if self.samples:
+            elapsed = max(0.0, timestamp - self.last_timestamp)
+            log_return = math.log(price / self.last_price)
+            self.variance = self.variance * math.exp(-elapsed / self.window) + log_return * log_return
+            timestamp = max(timestamp, self.last_timestamp)
+        self.last_price = price
+        self.last_timestamp = timestamp
+        self.samples += 1
+
+    def value(self, now: Optional[float] = None) -> Optional[float]:
+        """Volatility over the window as a fraction (0.01 = 1%), None until two prices were seen."""
+        if self.samples < 2:
+            return None
+        elapsed = max(0.0, (now if now is not None else time.time()) - self.last_timestamp)
+        return math.sqrt(self.variance * math.exp(-elapsed / self.window))
+
 @dataclass
 class MarketStats:
     """Market statistics for a trading pair."""
@@ -30,41 +78,43 @@ class MarketStats:
     exchanges: List[str] = field(default_factory=list)
     prices: Dict[str, float] = field(default_factory=dict)
     spreads: Dict[str, float] = field(default_factory=dict)  # bid-ask spread per exchange
-    price_history: Dict[str, deque] = field(default_factory=lambda: defaultdict(lambda: deque(maxlen=100)))
+    price_history: Dict[str, QuoteSeries] = field(default_factory=dict)  # Quote history per exchange, in preallocated ring buffers
     last_update: Dict[str, float] = field(default_factory=dict)
+    history_capacity: int = 1024  # Samples kept per exchange
+    volatility_window: float = 300.0  # Seconds
+    volatility: Dict[str, StreamingVolatility] = field(default_factory=dict)
     
     def add_price_data(self, exchange: str, bid: float, ask: float, timestamp: float):
-        """Add new price data for an exchange."""
+        """Add new price data for an exchange (timestamp in seconds)."""
         mid_price = (bid + ask) / 2
         spread = ask - bid
         
         self.prices[exchange] = mid_price
         self.spreads[exchange] = spread
-        self.price_history[exchange].append((timestamp, mid_price))
+        history = self.price_history.get(exchange)
+        if history is None:
+            history = self.price_history[exchange] = QuoteSeries(self.history_capacity)
+        history.append(timestamp, bid, ask)
         self.last_update[exchange] = timestamp
+        tracker = self.volatility.get(exchange)
+        if tracker is None:
+            tracker = self.volatility[exchange] = StreamingVolatility(self.volatility_window)
+        tracker.update(mid_price, timestamp)
         
         if exchange not in self.exchanges:
             self.exchanges.append(exchange)
     
-    def get_price_volatility(self, exchange: str, window_minutes: int = 5) -> Optional[float]:
-        """Calculate price volatility over a time window."""
-        if exchange not in self.price_history:
-            return None
-        
-        current_time = time.time()
-        cutoff_time = current_time - (window_minutes * 60)
-        
-        # Get recent prices
-        recent_prices = [
-            price for timestamp, price in self.price_history[exchange]
-            if timestamp >= cutoff_time
-        ]
-        
-        if len(recent_prices) < 2:
+    def get_price_volatility(self, exchange: str, now: Optional[float] = None) -> Optional[float]:
+        """Realized volatility of the mid price over the last volatility_window seconds, as a fraction."""
+        tracker = self.volatility.get(exchange)
+        return tracker.value(now) if tracker is not None else None
+
+    def get_price_window(self, exchange: str, seconds: float, now: Optional[float] = None) -> Optional[QuoteWindow]:
+        """Quotes of the last `seconds` on an exchange, as zero-copy column views."""
+        history = self.price_history.get(exchange)
+        if history is None:
             return None
-        
-        # Calculate standard deviation as volatility measure
-        return statistics.stdev(recent_prices)
+        return history.window((now if now is not None else time.time()) - seconds)
     
     def get_cross_exchange_spread(self) -> Optional[float]:
         """Calculate the spread between highest and lowest prices across exchanges."""
@@ -76,33 +126,153 @@ class MarketStats:
 
     
 class PriceMonitor:
-    def __init__(self, exchange_manager: ExchangeManager, monitoring_system: Any, performance_config: Dict[str, Any], websocket_manager=None):
+    def __init__(self, exchange_manager: ExchangeManager, monitoring_system: Any, performance_config: Dict[str, Any], websocket_manager=None,
+                 route_stats=None):
         self.exchange_manager = exchange_manager
         self.monitoring_system = monitoring_system
         self.performance_config = performance_config
         self.websocket_manager = websocket_manager # Will be set by ArbitrageBot
+        self.route_stats = route_stats # RouteStatsStore: execution history per route, for scoring and skipping routes that do not fill
+        self.blocked_routes_skipped = 0
         self.tickers: Dict[str, Dict[str, Any]] = {}
-        self.order_books: Dict[str, Dict[str, Any]] = {}
-        self.opportunities: deque[ArbitrageOpportunity] = deque(maxlen=100)
+        self.order_books: Dict[str, Dict[str, Any]] = {} # {exchange: {symbol: LocalOrderBook}}, for depth sizing
+        self._fill_cache: Dict[Tuple, Tuple[Tuple, DepthFill]] = {} # {route: (book versions and prices it was sized for, fill)}
+        self.opportunities: Dict[str, List[ArbitrageOpportunity]] = {} # Latest routes per symbol
+        # Not yet taken by the executor: best score first, one entry per route, dropped after opportunity_ttl_seconds
+        self.opportunity_queue = OpportunityQueue(performance_config.get("opportunity_queue_size", 100),
+                                                  performance_config.get("opportunity_ttl_seconds", 2.0))
+        # Route lifecycles across scans; only new or materially changed routes become pending
+        self.tracker = OpportunityTracker(performance_config.get("opportunity_change_threshold_pct", 0.05),
+                                          performance_config.get("opportunity_quantity_change_ratio", 0.25))
+        self.opportunity_event = asyncio.Event() # Set whenever new opportunities are pending
+        self.event_driven = performance_config.get("event_driven_scanning", True)
+        self.max_quote_age_ms = performance_config.get("max_quote_age_ms", 5000)
+        self.stale_quotes_skipped = 0
+        self.subscribed_to_feed = False
+        # Feed updates waiting to be scanned, conflated per (exchange, symbol) so a slow scan never builds a backlog
+        self.pending_updates = ConflatingQueue(performance_config.get("scan_max_pending_updates", 0))
+        self.scan_batch_size = performance_config.get("scan_batch_size", 0)
+        self._dropped_updates_reported = 0
+        # Every (symbol, exchange) quote in contiguous arrays; all routes are priced in one broadcast per scan
+        self.spread_matrix = SpreadMatrix(TRADING_CONFIG["trade_symbols"], list(exchange_manager.exchanges_config.keys()))
+        # Best net bid/ask venue per symbol, updated per tick; event-driven evaluation only looks at its tops
+        self.consolidated_book = ConsolidatedBook()
+        # Synthetic routes between symbols of one base with different quotes, priced from the same matrix
+        self.cross_quote_routes = CrossQuoteRouter(self.spread_matrix) if performance_config.get("cross_quote_routes_enabled", True) else None
+        self.cross_quote_opportunities: Dict[Tuple, ArbitrageOpportunity] = {}
+        self.triangular = None # Single-exchange cycle detector, fed from the same quotes; graphs are built by load_markets()
+        if performance_config.get("triangular_enabled", False):
+            self.triangular = TriangularArbitrageDetector(
+                TRADING_CONFIG.get("min_profit_threshold", 0.001),
+                max_cycle_length=performance_config.get("triangular_max_cycle_length", 3),
+                max_cycles=performance_config.get("triangular_max_cycles", 200000),
+            )
+        # Direct routes scanned by worker processes over a shared-memory quote table (scan_shard_processes > 0)
+        self.scan_shard_processes = performance_config.get("scan_shard_processes", 0)
+        self.sharded_scanner: Optional[ShardedScanner] = None
+        self._shard_scan_task = None
+        self.market_stats: Dict[str, MarketStats] = {} # Per symbol; mid prices and streaming volatility per exchange
+        self.volatility_window = performance_config.get("volatility_window_seconds", 300)
+        self.history_capacity = performance_config.get("price_history_capacity", 1024)
+        self._opportunities_since_metrics = 0
+        self._last_metrics_update = time.time()
         self.last_scan_time = time.time()
 
     def set_websocket_manager(self, manager):
         self.websocket_manager = manager
         logger.info("WebSocketManager has been set on PriceMonitor!")  # <-- confirms manager is set
+        if self.event_driven and hasattr(manager, "subscribe"):
+            manager.subscribe(self._on_market_update)
+            self.subscribed_to_feed = True
+            logger.info("PriceMonitor subscribed to market data updates (event-driven scanning).")
+
+    def load_markets(self):
+        """Rebuilds the market-dependent route indexes (cross-quote families, triangular graphs) from the markets ccxt loaded."""
+        if self.cross_quote_routes is not None:
+            markets = [getattr(exchange, "markets", None) or {} for exchange in self.exchange_manager.exchanges.values()]
+            self.cross_quote_routes.build(market_currencies(markets, TRADING_CONFIG["trade_symbols"]))
+        if self.triangular is None:
+            return
+        for exchange_id, exchange in self.exchange_manager.exchanges.items():
+            markets = getattr(exchange, "markets", None)
+            if markets:
+                self.triangular.load_markets(exchange_id, markets, self.exchange_manager.get_exchange_trading_fee(exchange_id),
+                                             TRADING_CONFIG["trade_symbols"])
+
+    def _on_market_update(self, exchange_id: str, symbol: str):
+        """Feed callback. Runs inline with the feed writer, so it only marks the key for re-evaluation."""
+        self.pending_updates.put(exchange_id, symbol)
 
     async def start_monitoring(self):
         logger.info(f"Starting price monitoring, websocket_manager: {self.websocket_manager}")
+        if self.scan_shard_processes > 0 and self.sharded_scanner is None:
+            self.start_scan_shards()
+            self._shard_scan_task = asyncio.create_task(self._consume_shard_scans())
         while True:
             try:
-                await self._scan_for_opportunities()
+                if self.subscribed_to_feed:
+                    await self.pending_updates.wait()
+                    keys = self.pending_updates.drain(self.scan_batch_size)
+                    if self.pending_updates.take_overflow():
+                        # Updates were dropped while the queue was full; their venues may not tick again, so rescan everything
+                        keys += self.pending_updates.drain()
+                        self._evaluate_symbols(dict.fromkeys([symbol for _, symbol in keys] + list(TRADING_CONFIG["trade_symbols"])))
+                    else:
+                        self._evaluate_symbols(dict.fromkeys(symbol for _, symbol in keys))
+                    if len(self.pending_updates):
+                        await asyncio.sleep(0) # Let the feed handlers run between batches
+                else:
+                    await self._scan_for_opportunities()
             except Exception as e:
                 logger.error(f"Error in price monitoring loop: {e}")
                 self.monitoring_system.alert_manager.create_alert(
                     "Price Monitor Error", f"Error in price monitoring loop: {e}", "error", "PriceMonitor"
                 )
-            await asyncio.sleep(self.performance_config.get("price_update_interval", 0.1))
+            if not self.subscribed_to_feed:
+                await asyncio.sleep(self.performance_config.get("price_update_interval", 0.1))
 
 
+    def start_scan_shards(self):
+        """Moves the direct-route scan of trade_symbols to scan_shard_processes worker processes."""
+        self.sharded_scanner = ShardedScanner(
+            self.spread_matrix.exchanges, self.spread_matrix.symbols, self.scan_shard_processes,
+            TRADING_CONFIG.get("min_profit_threshold", 0.001),
+            poll_interval=self.performance_config.get("scan_shared_poll_interval", 0.001),
+            queue_size=self.performance_config.get("scan_shard_queue_size", 10000),
+        )
+        self.sharded_scanner.start(self._refresh_fees())
+        # Quotes accepted before the workers existed
+        for exchange_id, tickers in self.tickers.items():
+            for symbol, ticker in tickers.items():
+                self.sharded_scanner.publish(exchange_id, symbol, ticker["bid"], ticker["ask"])
+
+    async def _consume_shard_scans(self):
+        """Turns the routes found by the scan workers into opportunities, one worker batch at a time."""
+        poll_interval = self.performance_config.get("scan_shared_poll_interval", 0.001)
+        while self.sharded_scanner is not None:
+            batches = []
+            try:
+                batches = self.sharded_scanner.drain()
+                if batches:
+                    self.sharded_scanner.set_fees(self._refresh_fees())
+            except Exception as e:
+                logger.error(f"Error draining sharded scan results: {e}")
+            for symbols, routes in batches:
+                # One bad batch must not discard the rest of the poll
+                try:
+                    self._process_routes(symbols, routes)
+                except Exception as e:
+                    logger.error(f"Error processing sharded scan results for {symbols}: {e}")
+            await asyncio.sleep(poll_interval)
+
+    def close(self):
+        if self._shard_scan_task is not None:
+            self._shard_scan_task.cancel()
+            self._shard_scan_task = None
+        if self.sharded_scanner is not None:
+            self.sharded_scanner.close()
+            self.sharded_scanner = None
+
     async def _scan_for_opportunities(self):
         if not self.websocket_manager:
             logger.warning("WebSocketManager not set. Cannot scan for opportunities.")
@@ -111,157 +281,330 @@ class PriceMonitor:
         # Fetch tickers from WebSocketManager
         self.tickers = {}
         for exchange_id in self.exchange_manager.exchanges_config.keys():
+            # One lock-free bulk read per exchange instead of an awaited lookup per symbol
+            exchange_market_data = self.websocket_manager.get_exchange_market_data(exchange_id)
             for symbol in TRADING_CONFIG["trade_symbols"]:
-                market_data = await self.websocket_manager.get_latest_market_data(exchange_id, symbol)
-                if market_data and market_data.get("bid") is not None and market_data.get("ask") is not None:
-                    if exchange_id not in self.tickers:
-                        self.tickers[exchange_id] = {}
-                    self.tickers[exchange_id][symbol] = {
-                        "bid": market_data["bid"],
-                        "ask": market_data["ask"],
-                        "timestamp": market_data["timestamp"],
-                        "bids": market_data.get("bids", []),
-                        "asks": market_data.get("asks", []),
-                    }
-                else:
-                    # This warning is expected if data isn't immediately available, but should resolve as data streams in.
-                    logger.debug(f"No valid WebSocket data for {symbol} on {exchange_id} yet.")
+                self._update_ticker(exchange_id, symbol, exchange_market_data.get(symbol))
+
+        self._evaluate_symbols(TRADING_CONFIG["trade_symbols"], refresh_tickers=False)
+
+    def _evaluate_symbols(self, symbols, refresh_tickers: bool = True):
+        """Re-evaluates every route of the given symbols and wakes the executor if anything was found."""
+        if refresh_tickers:
+            for symbol in symbols:
+                for exchange_id in self.exchange_manager.exchanges_config.keys():
+                    self._update_ticker(exchange_id, symbol, self.websocket_manager.get_market_data(exchange_id, symbol))
+
+        if self.sharded_scanner is not None:
+            return # The scan workers pick the new quotes up from shared memory; _consume_shard_scans handles their routes
+
+        self._refresh_fees()
+        self._process_routes(symbols, self._scan_routes(symbols, incremental=refresh_tickers))
+
+    def _refresh_fees(self) -> Dict[str, float]:
+        # Fees are read once per scan instead of twice per route
+        fees = {exchange_id: self.exchange_manager.get_exchange_trading_fee(exchange_id) for exchange_id in self.spread_matrix.exchanges}
+        self.spread_matrix.set_fees(fees)
+        self.consolidated_book.set_fees(fees)
+        if self.triangular is not None:
+            for exchange_id, fee in fees.items():
+                for opportunity in self.triangular.set_fee(exchange_id, fee):
+                    logger.info(f"Triangular opportunity on {exchange_id} after a fee change: {' -> '.join(opportunity.path)} ({opportunity.profit_pct:.3f}%).")
+        return fees
+
+    def _process_routes(self, symbols, routes: List[Tuple[str, str, str, float]]):
+        """Builds, emits and closes the routes of one scan of symbols (in this process or a scan worker)."""
+        symbol_opportunities = {symbol: [] for symbol in symbols}
+        for symbol, buy_exchange_id, sell_exchange_id, potential_profit_pct in routes:
+            opportunity = self._build_opportunity(symbol, buy_exchange_id, sell_exchange_id, potential_profit_pct)
+            if opportunity is not None:
+                symbol_opportunities[symbol].append(opportunity)
 
-        # Find arbitrage opportunities
-        self.opportunities.clear() # Clear old opportunities
         opportunities_found_total = 0
-
-        for symbol in TRADING_CONFIG["trade_symbols"]:
-            for buy_exchange_id, buy_exchange_tickers in self.tickers.items():
-                if symbol not in buy_exchange_tickers or not buy_exchange_tickers[symbol]:
-                    continue
-                
-                buy_price = buy_exchange_tickers[symbol].get("ask")
-                
-                # Ensure buy_price is not None and is a valid number
-                if buy_price is None or not isinstance(buy_price, (int, float)) or buy_price <= 0:
-                    continue
-
-                for sell_exchange_id, sell_exchange_tickers in self.tickers.items():
-                    if buy_exchange_id == sell_exchange_id:
-                        continue
-                    if symbol not in sell_exchange_tickers or not sell_exchange_tickers[symbol]:
-                        continue
-                    
-                    sell_price = sell_exchange_tickers[symbol].get("bid")
-
-                    # Ensure sell_price is not None and is a valid number
-                    if sell_price is None or not isinstance(sell_price, (int, float)) or sell_price <= 0:
-                        continue
-
-                    # Calculate potential profit (simplified, without fees)
-                    if sell_price > buy_price: # Only consider if sell price is higher than buy price
-                        # Get trading fees for both exchanges
-                        buy_fee = self.exchange_manager.get_exchange_trading_fee(buy_exchange_id)
-                        sell_fee = self.exchange_manager.get_exchange_trading_fee(sell_exchange_id)
-
-                        # Calculate profit after fees
-                        # Assuming fees are a percentage of the trade amount
-                        effective_buy_price = buy_price * (1 + buy_fee)
-                        effective_sell_price = sell_price * (1 - sell_fee)
-
-                        if effective_sell_price > effective_buy_price:
-                            potential_profit_pct = ((effective_sell_price - effective_buy_price) / effective_buy_price) * 100
-                            
-                            # Apply minimum profit threshold from config
-                            min_profit_threshold = TRADING_CONFIG.get("min_profit_threshold", 0.001)
-
-                            if potential_profit_pct > min_profit_threshold * 100:
-                                # Dynamic max_quantity based on order book depth and volume
-                                buy_order_book = buy_exchange_tickers[symbol].get("asks", [])
-                                sell_order_book = sell_exchange_tickers[symbol].get("bids", [])
-
-                                # Calculate max tradable quantity considering order book depth
-                                max_quantity = self._calculate_max_tradable_quantity(
-                                    buy_price, sell_price, buy_order_book, sell_order_book, min_profit_threshold
-                                )
-
-                                if max_quantity <= 0:
-                                    continue # No profitable quantity found
-
-                                potential_profit_usd = (effective_sell_price - effective_buy_price) * max_quantity
-                                
-                                # Opportunity Scoring
-                                opportunity_score = self._score_opportunity(
-                                    potential_profit_pct, max_quantity, 
-                                    buy_fee,
-                                    sell_fee,
-                                    # Placeholder for actual volatility, need to implement in MarketStats
-                                    0.0, # self.exchange_manager.get_exchange_volatility(buy_exchange_id, symbol),
-                                    0.0  # self.exchange_manager.get_exchange_volatility(sell_exchange_id, symbol)
-                                )
-
-                                opportunity = ArbitrageOpportunity(
-                                    symbol=symbol,
-                                    buy_exchange=buy_exchange_id,
-                                    sell_exchange=sell_exchange_id,
-                                    buy_price=buy_price,
-                                    sell_price=sell_price,
-                                    potential_profit_pct=potential_profit_pct,
-                                    potential_profit_usd=potential_profit_usd,
-                                    max_quantity=max_quantity,
-                                    timestamp=time.time(),
-                                    score=opportunity_score
-                                )
-                                self.opportunities.append(opportunity)
-                                opportunities_found_total += 1
-            
-            if opportunities_found_total > 0:
-                logger.info(f"Found {opportunities_found_total} arbitrage opportunities for {symbol}.")
+        now = time.time()
+        seen = []
+        for symbol, opportunities in symbol_opportunities.items():
+            self.opportunities[symbol] = opportunities
+            emitted = self._emit_changed(opportunities, now, seen)
+            if emitted:
+                opportunities_found_total += emitted
+                logger.info(f"Found {emitted} new or changed arbitrage opportunities for {symbol}.")
+        if self.cross_quote_routes is not None and len(self.cross_quote_routes):
+            emitted = self._emit_changed(self._scan_cross_quote_routes(symbols), now, seen)
+            if emitted:
+                opportunities_found_total += emitted
+                logger.info(f"Found {emitted} new or changed cross-quote opportunities.")
+        for lifecycle in self.tracker.sweep(symbols, seen, now):
+            self.opportunity_queue.remove(lifecycle.route_key) # The route closed before the executor got to it
+
+        if opportunities_found_total > 0:
+            self.opportunity_event.set()
 
         self.last_scan_time = time.time()
-        self.monitoring_system.update_performance_metrics(
-            active_trades_count=0, # This should come from trading_engine
-            opportunities_found=opportunities_found_total,
-            trade_execution_times=[] # This should come from trading_engine
+        self._opportunities_since_metrics += opportunities_found_total
+        # Evaluation runs per tick, so system metrics (psutil) are refreshed at most once per main loop interval
+        if self.last_scan_time - self._last_metrics_update >= self.performance_config.get("main_loop_interval", 1):
+            self.monitoring_system.update_performance_metrics(
+                active_trades_count=0, # This should come from trading_engine
+                opportunities_found=self._opportunities_since_metrics,
+                trade_execution_times=[] # This should come from trading_engine
+            )
+            self._opportunities_since_metrics = 0
+            self._last_metrics_update = self.last_scan_time
+            dropped = self.pending_updates.dropped
+            if dropped > self._dropped_updates_reported:
+                logger.warning(f"Scanner is falling behind the feed: {dropped - self._dropped_updates_reported} updates dropped since the last report ({self.pending_updates.get_stats()}).")
+                self._dropped_updates_reported = dropped
+
+    def _emit_changed(self, opportunities: List[ArbitrageOpportunity], now: float, seen: List[Tuple]) -> int:
+        """Passes the new or materially changed opportunities to the executor; returns how many."""
+        emitted = 0
+        for opportunity in opportunities:
+            seen.append(opportunity.route_key)
+            if not self.tracker.observe(opportunity, now):
+                continue
+            if self.route_stats is not None and self.route_stats.is_blocked(opportunity.route_id, now):
+                self.blocked_routes_skipped += 1
+                logger.debug(f"Not queueing {opportunity.route_id}: its recent trades mostly failed to fill.")
+                continue
+            if self.opportunity_queue.push(opportunity, now):
+                emitted += 1
+        return emitted
+
+    def _update_ticker(self, exchange_id: str, symbol: str, tick: Optional[Tick]):
+        if tick is not None and tick.recv_ts and (time.monotonic() - tick.recv_ts) * 1000 > self.max_quote_age_ms:
+            # A stalled connection keeps serving its last quote; never arbitrage against it
+            self.stale_quotes_skipped += 1
+            self.spread_matrix.clear(exchange_id, symbol)
+            self.consolidated_book.remove(exchange_id, symbol)
+            if self.triangular is not None:
+                self.triangular.clear(exchange_id, symbol)
+            if self.sharded_scanner is not None:
+                self.sharded_scanner.clear(exchange_id, symbol)
+            logger.debug(f"Skipping stale quote for {symbol} on {exchange_id} ({(time.monotonic() - tick.recv_ts) * 1000:.0f}ms old).")
+            self.tickers.get(exchange_id, {}).pop(symbol, None)
+            return
+        if tick is not None and tick.bid is not None and tick.ask is not None:
+            if exchange_id not in self.tickers:
+                self.tickers[exchange_id] = {}
+            self.spread_matrix.update(exchange_id, symbol, tick.bid, tick.ask)
+            self.consolidated_book.update(exchange_id, symbol, tick.bid, tick.ask)
+            if self.sharded_scanner is not None:
+                self.sharded_scanner.publish(exchange_id, symbol, tick.bid, tick.ask)
+            stats = self.market_stats.get(symbol)
+            if stats is None:
+                stats = self.market_stats[symbol] = MarketStats(symbol, history_capacity=self.history_capacity,
+                                                                volatility_window=self.volatility_window)
+            # Unchanged venues are re-read whenever another venue ticks; only a new quote is a new sample
+            tick_time = tick.timestamp / 1000 if tick.timestamp else time.time()
+            if stats.last_update.get(exchange_id) != tick_time:
+                stats.add_price_data(exchange_id, tick.bid, tick.ask, tick_time)
+            if self.triangular is not None:
+                for opportunity in self.triangular.on_quote(exchange_id, symbol, tick.bid, tick.ask):
+                    logger.info(f"Triangular opportunity on {exchange_id}: {' -> '.join(opportunity.path)} ({opportunity.profit_pct:.3f}%).")
+            # Depth comes from the locally maintained L2 book; top-N views are cached per book version
+            order_book_depth = self.performance_config.get("order_book_depth", 20)
+            order_book = self.websocket_manager.get_order_book(exchange_id, symbol) if hasattr(self.websocket_manager, "get_order_book") else None
+            if order_book is not None:
+                self.order_books.setdefault(exchange_id, {})[symbol] = order_book
+            else:
+                self.order_books.get(exchange_id, {}).pop(symbol, None)
+            self.tickers[exchange_id][symbol] = {
+                "bid": tick.bid,
+                "ask": tick.ask,
+                "timestamp": tick.timestamp,
+                "bids": order_book.top_bids(order_book_depth) if order_book else [],
+                "asks": order_book.top_asks(order_book_depth) if order_book else [],
+            }
+        else:
+            # This warning is expected if data isn't immediately available, but should resolve as data streams in.
+            logger.debug(f"No valid WebSocket data for {symbol} on {exchange_id} yet.")
+            self.tickers.get(exchange_id, {}).pop(symbol, None)
+            self.spread_matrix.clear(exchange_id, symbol)
+            self.consolidated_book.remove(exchange_id, symbol)
+            if self.triangular is not None:
+                self.triangular.clear(exchange_id, symbol)
+            if self.sharded_scanner is not None:
+                self.sharded_scanner.clear(exchange_id, symbol)
+
+    def _scan_routes(self, symbols, incremental: bool = False) -> List[Tuple[str, str, str, float]]:
+        """(symbol, buy_exchange, sell_exchange, profit_pct) of every route of symbols that clears the profit threshold after fees.
+
+        Incremental passes (a few symbols that just ticked) read the consolidated
+        book, which settles most symbols from its best bid and ask alone; full
+        scans price every route at once in the spread matrix. Both return the
+        same routes.
+        """
+        min_profit_threshold = TRADING_CONFIG.get("min_profit_threshold", 0.001)
+        if incremental:
+            return self.consolidated_book.scan(min_profit_threshold, symbols)
+        return self.spread_matrix.scan(min_profit_threshold, self.spread_matrix.rows(symbols))
+
+    def _build_opportunity(self, symbol: str, buy_exchange_id: str, sell_exchange_id: str, potential_profit_pct: float) -> Optional[ArbitrageOpportunity]:
+        """Sizes and scores one route that passed the spread scan; None when the books cannot fill a profitable quantity."""
+        # Worker routes can be one poll old; the quote may have gone stale or been invalidated since
+        buy_ticker = self.tickers.get(buy_exchange_id, {}).get(symbol)
+        sell_ticker = self.tickers.get(sell_exchange_id, {}).get(symbol)
+        if buy_ticker is None or sell_ticker is None:
+            return None
+        buy_fee = self.exchange_manager.get_exchange_trading_fee(buy_exchange_id)
+        sell_fee = self.exchange_manager.get_exchange_trading_fee(sell_exchange_id)
+
+        # Profit-maximizing quantity from both books' depth, with the VWAP net profit it actually earns
+        fill = self._size_route((symbol, buy_exchange_id, sell_exchange_id), buy_exchange_id, symbol,
+                                sell_exchange_id, symbol, buy_fee, sell_fee)
+        if fill.quantity <= 0:
+            return None # No profitable quantity found
+
+        opportunity = ArbitrageOpportunity(
+            symbol=symbol,
+            buy_exchange=buy_exchange_id,
+            sell_exchange=sell_exchange_id,
+            buy_price=buy_ticker["ask"],
+            sell_price=sell_ticker["bid"],
+            potential_profit_pct=fill.profit_pct,
+            potential_profit_usd=fill.profit,
+            max_quantity=fill.quantity,
+            timestamp=time.time(),
         )
 
+        # Opportunity Scoring
+        opportunity.score = self._score_opportunity(
+            fill.profit_pct, fill.quantity,
+            buy_fee,
+            sell_fee,
+            self.get_volatility(buy_exchange_id, symbol) or 0.0,
+            self.get_volatility(sell_exchange_id, symbol) or 0.0,
+            opportunity.route_id
+        )
+        return opportunity
+
+    def _scan_cross_quote_routes(self, symbols) -> List[ArbitrageOpportunity]:
+        """Re-prices the cross-quote routes through any of symbols (as a traded or conversion leg)."""
+        symbols = set(symbols)
+        self.cross_quote_opportunities = {
+            legs: opportunity for legs, opportunity in self.cross_quote_opportunities.items()
+            if not any(leg[0] in symbols for leg in legs)
+        }
+        found = []
+        min_profit_threshold = TRADING_CONFIG.get("min_profit_threshold", 0.001)
+        for route in self.cross_quote_routes.scan(min_profit_threshold, self.spread_matrix.rows(symbols)):
+            opportunity = self._build_cross_quote_opportunity(route)
+            if opportunity is not None:
+                self.cross_quote_opportunities[opportunity.route_key] = opportunity
+                found.append(opportunity)
+        return found
+
+    def _build_cross_quote_opportunity(self, route: CrossQuoteRoute) -> Optional[ArbitrageOpportunity]:
+        """Sizes and scores a synthetic route; the conversion leg is assumed deep enough for the notional."""
+        buy_ticker = self.tickers.get(route.buy_exchange, {}).get(route.buy_symbol)
+        sell_ticker = self.tickers.get(route.sell_exchange, {}).get(route.sell_symbol)
+        if buy_ticker is None or sell_ticker is None:
+            return None
+        buy_fee = self.exchange_manager.get_exchange_trading_fee(route.buy_exchange)
+        sell_fee = self.exchange_manager.get_exchange_trading_fee(route.sell_exchange)
+        # Sell proceeds are converted at the live conversion rate, so the fill is in the buy leg's quote currency
+        # (a stablecoin for the families this targets)
+        fill = self._size_route(route.legs, route.buy_exchange, route.buy_symbol, route.sell_exchange, route.sell_symbol,
+                                buy_fee, sell_fee, route.conversion_rate)
+        if fill.quantity <= 0:
+            return None
+        opportunity = ArbitrageOpportunity(
+            symbol=route.buy_symbol,
+            buy_exchange=route.buy_exchange,
+            sell_exchange=route.sell_exchange,
+            buy_price=buy_ticker["ask"],
+            sell_price=sell_ticker["bid"],
+            potential_profit_pct=fill.profit_pct,
+            potential_profit_usd=fill.profit,
+            max_quantity=fill.quantity,
+            timestamp=time.time(),
+            route="cross_quote",
+            legs=route.legs,
+        )
+        opportunity.score = self._score_opportunity(fill.profit_pct, fill.quantity, buy_fee, sell_fee,
+                                                    self.get_volatility(route.buy_exchange, route.buy_symbol) or 0.0,
+                                                    self.get_volatility(route.sell_exchange, route.sell_symbol) or 0.0,
+                                                    opportunity.route_id)
+        return opportunity
+
+    def _book_depth(self, exchange_id: str, symbol: str, side: str) -> Tuple[BookDepth, Any]:
+        """(cumulative depth, cache token) of one book side. Local books reuse their per-version arrays and
+        tokens; depth copied into the ticker (no local book) is rebuilt and never cached."""
+        depth = self.performance_config.get("order_book_depth", 20)
+        order_book = self.order_books.get(exchange_id, {}).get(symbol)
+        if order_book is not None:
+            return order_book.depth(side, depth), (id(order_book), order_book.version)
+        return BookDepth(self.tickers[exchange_id][symbol].get(side, [])), None
+
+    def _size_route(self, route_key: Tuple, buy_exchange_id: str, buy_symbol: str, sell_exchange_id: str, sell_symbol: str,
+                    buy_fee: float, sell_fee: float, sell_rate: float = 1.0) -> DepthFill:
+        """Optimal fill of a route, cached until one of its books or its prices changes.
+
+        A tick on a third venue re-evaluates every route of the symbol; routes
+        whose two books did not move reuse their last fill instead of walking
+        the books again.
+        """
+        asks, ask_token = self._book_depth(buy_exchange_id, buy_symbol, "asks")
+        bids, bid_token = self._book_depth(sell_exchange_id, sell_symbol, "bids")
+        min_profit_threshold = TRADING_CONFIG.get("min_profit_threshold", 0.001)
+        max_trade_amount_usd = TRADING_CONFIG.get("max_trade_amount_usd", 100.0)
+        if ask_token is None or bid_token is None:
+            return optimal_fill(asks, bids, buy_fee, sell_fee, min_profit_threshold, max_trade_amount_usd, sell_rate)
+        key = (ask_token, bid_token, buy_fee, sell_fee, sell_rate, min_profit_threshold, max_trade_amount_usd)
+        cached = self._fill_cache.get(route_key)
+        if cached is not None and cached[0] == key:
+            return cached[1]
+        fill = optimal_fill(asks, bids, buy_fee, sell_fee, min_profit_threshold, max_trade_amount_usd, sell_rate)
+        self._fill_cache[route_key] = (key, fill)
+        return fill
+
+    def get_volatility(self, exchange_id: str, symbol: str) -> Optional[float]:
+        """Streaming realized volatility of symbol on exchange over volatility_window_seconds, None without enough ticks."""
+        stats = self.market_stats.get(symbol)
+        return stats.get_price_volatility(exchange_id) if stats is not None else None
+
+    def get_price_history(self, exchange_id: str, symbol: str, seconds: float = 300, max_points: int = 0) -> Optional[Dict[str, List[float]]]:
+        """Recent quotes of symbol on exchange as JSON-ready columns, for charts; None when nothing was recorded."""
+        stats = self.market_stats.get(symbol)
+        window = stats.get_price_window(exchange_id, seconds) if stats is not None else None
+        return window.to_dict(max_points) if window is not None else None
 
     def get_arbitrage_opportunities(self) -> List[ArbitrageOpportunity]:
-        return list(self.opportunities)
-
-    def get_market_summary(self) -> Dict[str, Any]:
-        summary = {"tickers": self.tickers, "last_scan": self.last_scan_time}
-        return summary
-
-    def _calculate_max_tradable_quantity(self, buy_price, sell_price, buy_order_book, sell_order_book, min_profit_threshold):
-        # This is a more robust calculation considering order book depth.
-        # It finds the maximum quantity that can be traded while maintaining the min_profit_threshold.
-
-        max_buy_quantity = 0.0
-        current_buy_cost = 0.0
-        for price, quantity in buy_order_book:
-            if price <= buy_price: # Only consider asks at or below our desired buy price
-                max_buy_quantity += quantity
-                current_buy_cost += price * quantity
-            else:
-                break # Order book is sorted by price, so we can stop
-        
-        max_sell_quantity = 0.0
-        current_sell_revenue = 0.0
-        for price, quantity in sell_order_book:
-            if price >= sell_price: # Only consider bids at or above our desired sell price
-                max_sell_quantity += quantity
-                current_sell_revenue += price * quantity
-            else:
-                break # Order book is sorted by price, so we can stop
+        opportunities = [opportunity for symbol_opportunities in list(self.opportunities.values()) for opportunity in symbol_opportunities]
+        return opportunities + list(self.cross_quote_opportunities.values())
 
-        # The actual tradable quantity is limited by the liquidity on both sides
-        tradable_quantity = min(max_buy_quantity, max_sell_quantity)
+    def pop_opportunity(self) -> Optional[ArbitrageOpportunity]:
+        """Highest-scored pending opportunity that has not expired, removed from the queue; None when there is none."""
+        return self.opportunity_queue.pop()
 
-        # Further refine max_quantity based on MAX_TRADE_AMOUNT_USD from config
-        max_trade_amount_usd = TRADING_CONFIG.get("max_trade_amount_usd", 100.0)
-        max_quantity_from_usd = max_trade_amount_usd / buy_price if buy_price > 0 else 0
-        max_quantity = min(tradable_quantity, max_quantity_from_usd)
+    def drain_pending_opportunities(self) -> List[ArbitrageOpportunity]:
+        """Pops every pending opportunity, best score first."""
+        opportunities = []
+        while (opportunity := self.opportunity_queue.pop()) is not None:
+            opportunities.append(opportunity)
+        return opportunities
 
-        return max(0.0, max_quantity)
+    def get_market_summary(self) -> Dict[str, Any]:
+        summary = {"tickers": self.tickers, "last_scan": self.last_scan_time, "feed_conflation": self.pending_updates.get_stats(),
+                   "consolidated": self.consolidated_book.snapshot(), "opportunity_lifecycle": self.tracker.get_stats(),
+                   "opportunity_queue": self.opportunity_queue.get_stats()}
+        if self.route_stats is not None:
+            summary["route_stats"] = dict(self.route_stats.get_stats(), blocked_skipped=self.blocked_routes_skipped)
+        if self.sharded_scanner is not None:
+            summary["scan_shards"] = self.sharded_scanner.get_stats()
+        if self.cross_quote_routes is not None:
+            summary["cross_quote"] = {"routes": len(self.cross_quote_routes), "families": len(self.cross_quote_routes.families),
+                                      "profitable": len(self.cross_quote_opportunities), "evaluations": self.cross_quote_routes.evaluations}
+        if self.triangular is not None:
+            summary["triangular"] = self.triangular.get_stats()
+            summary["triangular_opportunities"] = [
+                {"exchange": opportunity.exchange, "path": list(opportunity.path), "profit_pct": opportunity.profit_pct}
+                for opportunity in self.triangular.get_opportunities()[:20]
+            ]
+        return summary
 
-    def _score_opportunity(self, potential_profit_pct, max_quantity, buy_fee, sell_fee, buy_volatility, sell_volatility):
+    def _score_opportunity(self, potential_profit_pct, max_quantity, buy_fee, sell_fee, buy_volatility, sell_volatility, route_id=None):
         # Implement a comprehensive scoring system for arbitrage opportunities
         # This is a simplified example, weights can be adjusted in config.py
         
@@ -280,9 +623,8 @@ class PriceMonitor:
         # Assuming volatility is a small number, e.g., 0.01 for 1% volatility
         normalized_volatility = max(0, 100 - (buy_volatility + sell_volatility) * 1000) # Scale and invert
 
-        # Historical success (placeholder, would come from trade history analysis)
-        # For now, assume a default high value, or integrate with a real historical success rate
-        historical_success_score = 80 # Placeholder
+        # Historical success of this route (decayed fill rate and realized profit), 80 without history
+        historical_success_score = self.route_stats.success_score(route_id) if self.route_stats is not None and route_id else 80
 
         score = (
             normalized_profit * profit_weight +
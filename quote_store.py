@@ -0,0 +1,141 @@
+"""
+Single-writer quote store with lock-free reads, and the conflating queue that hands its updates to consumers.
+"""
+
+import asyncio
+import logging
+from itertools import islice
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+class QuoteStore:
+    """Latest quote per (exchange, symbol), written only by the feed handlers.
+
+    Quotes are immutable records that are replaced wholesale, never mutated in
+    place, so a reader holding a quote always sees a consistent bid/ask pair.
+    Slot replacement and dict copies are single bytecode-level operations under
+    the GIL, which is what lets readers skip the lock entirely. Each exchange
+    carries a version that is bumped on every write, so readers can tell
+    whether anything changed since their last pass.
+
+    Listeners registered with add_listener() are called synchronously with
+    (exchange_id, symbol) after every write, so they must be cheap; the usual
+    pattern is to mark the symbol dirty and wake a task.
+    """
+
+    def __init__(self):
+        self._slots: Dict[str, Dict[str, Any]] = {}
+        self._versions: Dict[str, int] = {}
+        self._listeners: List[Callable[[str, str], None]] = []
+
+    def add_listener(self, listener: Callable[[str, str], None]):
+        self._listeners.append(listener)
+
+    def remove_listener(self, listener: Callable[[str, str], None]):
+        if listener in self._listeners:
+            self._listeners.remove(listener)
+
+    def update(self, exchange_id: str, symbol: str, quote: Any):
+        """Publishes a new quote. Must only be called from the feed (writer) side."""
+        slots = self._slots.get(exchange_id)
+        if slots is None:
+            slots = self._slots[exchange_id] = {}
+        slots[symbol] = quote
+        self._versions[exchange_id] = self._versions.get(exchange_id, 0) + 1
+        for listener in self._listeners:
+            try:
+                listener(exchange_id, symbol)
+            except Exception as e:
+                logger.error(f"Quote listener {listener} failed for {symbol} on {exchange_id}: {e}")
+
+    def get(self, exchange_id: str, symbol: str) -> Optional[Any]:
+        slots = self._slots.get(exchange_id)
+        return slots.get(symbol) if slots is not None else None
+
+    def get_exchange(self, exchange_id: str) -> Dict[str, Any]:
+        """Snapshot of every symbol's latest quote for one exchange, in one call."""
+        slots = self._slots.get(exchange_id)
+        return slots.copy() if slots is not None else {}
+
+    def version(self, exchange_id: str) -> int:
+        return self._versions.get(exchange_id, 0)
+
+    def exchanges(self):
+        return list(self._slots)
+
+class ConflatingQueue:
+    """Bounded queue of pending (exchange, symbol) keys between the feed and a slower consumer.
+
+    A key that is already pending is not queued again: the consumer reads the
+    latest quote from the QuoteStore when it gets to the key, so any number of
+    updates in between collapse into one unit of work (counted as conflated).
+    The queue therefore never holds more than one entry per key, and
+    max_pending caps it below that; keys arriving while it is full are not
+    buffered but counted as dropped and the queue is marked overflowed. The
+    consumer must check take_overflow() after draining and, when it is set,
+    re-evaluate everything, since a venue that goes quiet after its key was
+    dropped would otherwise never have its latest quote looked at.
+    """
+
+    def __init__(self, max_pending: int = 0):
+        self.max_pending = max_pending  # 0 = bounded only by the number of distinct keys
+        self._pending: Dict[Tuple[str, str], None] = {}  # Insertion-ordered, oldest first
+        self._ready = asyncio.Event()
+        self.received = 0   # Updates offered by the feed
+        self.conflated = 0  # Updates folded into a key that was already pending
+        self.dropped = 0    # Updates refused because the queue was full
+        self.overflowed = False  # A key was dropped since the last take_overflow()
+        self.max_backlog = 0
+
+    def put(self, exchange_id: str, symbol: str):
+        """Marks a key as pending. Called inline from the feed writer, so it never blocks."""
+        self.received += 1
+        key = (exchange_id, symbol)
+        pending = self._pending
+        if key in pending:
+            self.conflated += 1
+            return
+        if self.max_pending and len(pending) >= self.max_pending:
+            self.dropped += 1
+            self.overflowed = True
+            return
+        pending[key] = None
+        if len(pending) > self.max_backlog:
+            self.max_backlog = len(pending)
+        self._ready.set()
+
+    async def wait(self):
+        await self._ready.wait()
+
+    def drain(self, max_items: int = 0) -> List[Tuple[str, str]]:
+        """Takes up to max_items pending keys (0 = all), oldest first."""
+        pending = self._pending
+        if not max_items or len(pending) <= max_items:
+            keys = list(pending)
+            pending.clear()
+        else:
+            keys = list(islice(pending, max_items))
+            for key in keys:
+                del pending[key]
+        if not pending:
+            self._ready.clear()
+        return keys
+
+    def take_overflow(self) -> bool:
+        """True (once) if keys were dropped since the last call, i.e. the consumer has to re-evaluate every key."""
+        overflowed = self.overflowed
+        self.overflowed = False
+        return overflowed
+
+    def __len__(self):
+        return len(self._pending)
+
+    def get_stats(self) -> Dict[str, int]:
+        return {
+            "received": self.received,
+            "conflated": self.conflated,
+            "dropped": self.dropped,
+            "pending": len(self._pending),
+            "max_backlog": self.max_backlog,
+        }
@@ -0,0 +1,126 @@
+"""
+Replay feed: drives the live pipeline from recorded market data journals instead of exchange sockets.
+"""
+
+import asyncio
+import heapq
+import logging
+import time
+from typing import Dict
+
+from market_data import Tick
+from market_journal import iter_journal_events, list_journals
+from websocket_manager import WebSocketManager
+
+logger = logging.getLogger(__name__)
+
+def parse_replay_speed(value) -> float:
+    """Parses replay_speed: a multiple of recorded time (1 = real time), or "max"/0 for as fast as possible."""
+    if isinstance(value, str):
+        value = value.strip().lower()
+        if value in ("max", ""):
+            return 0.0
+        value = value.rstrip("x")  # "10x" reads as 10
+    speed = float(value)
+    if speed < 0:
+        raise ValueError(f"Replay speed must be positive or 'max', got {value}")
+    return speed
+
+class ReplayFeedManager(WebSocketManager):
+    """Drop-in replacement for WebSocketManager that replays MarketJournal files.
+
+    Journals of every selected exchange are merged by recorded receive time and
+    pushed through the same handlers as live events, so the quote store, local
+    order books, listeners (PriceMonitor) and latency monitor see exactly what
+    they saw live. Only exchanges configured in EXCHANGES are scanned by the
+    PriceMonitor, as with live feeds.
+
+    Pacing follows replay_speed: 1 keeps the recorded gaps between events, N
+    divides them by N, and "max" only yields to the event loop between events
+    so downstream tasks still get to run on every update.
+    """
+
+    def __init__(self, config):
+        super().__init__(config)
+        self.journal = None  # Never re-record what is being replayed
+        self.record_feed_lag = False  # Recorded exchange timestamps are hours old by replay time
+        self.replay_dir = self.performance_config.get("replay_dir") or self.performance_config.get("journal_dir", "journal")
+        self.replay_speed = parse_replay_speed(self.performance_config.get("replay_speed", "1"))
+        self.replay_exchanges = self.performance_config.get("replay_exchanges") or None
+        self.replay_start_day = self.performance_config.get("replay_start_day") or None  # YYYYMMDD, inclusive
+        self.replay_end_day = self.performance_config.get("replay_end_day") or None
+        self.replay_complete = asyncio.Event()
+        self.replayed_events = 0
+        self.replay_elapsed = 0.0
+        self._replay_adapters: Dict[str, _ReplayAdapter] = {}
+
+    async def start(self):
+        self.feed_tasks.append(asyncio.create_task(self._replay()))
+        speed = "max" if not self.replay_speed else f"{self.replay_speed:g}x"
+        logger.info(f"Replay feed started from {self.replay_dir} at {speed} speed.")
+
+    def _journals_by_day(self):
+        days: Dict[str, list] = {}
+        for day, exchange_id, path in list_journals(self.replay_dir):
+            if self.replay_exchanges and exchange_id not in self.replay_exchanges:
+                continue
+            if (self.replay_start_day and day < self.replay_start_day) or (self.replay_end_day and day > self.replay_end_day):
+                continue
+            days.setdefault(day, []).append((exchange_id, path))
+        return sorted(days.items())
+
+    async def _replay(self):
+        start = time.perf_counter()
+        first_recorded_ns = None
+        try:
+            for day, journals in self._journals_by_day():
+                logger.info(f"Replaying {day}: {', '.join(exchange_id for exchange_id, _ in journals)}")
+                streams = [iter_journal_events(path, exchange_id) for exchange_id, path in journals]
+                for recv_time_ns, event in heapq.merge(*streams, key=lambda item: item[0]):
+                    if self.replay_speed:
+                        if first_recorded_ns is None:
+                            first_recorded_ns = recv_time_ns
+                        delay = (recv_time_ns - first_recorded_ns) / 1e9 / self.replay_speed - (time.perf_counter() - start)
+                        await asyncio.sleep(max(0.0, delay))
+                    else:
+                        await asyncio.sleep(0)
+                    self._dispatch_replayed(event)
+        except Exception as e:
+            logger.error(f"Replay failed after {self.replayed_events} events: {e}")
+        finally:
+            self.replay_elapsed = time.perf_counter() - start
+            rate = self.replayed_events / self.replay_elapsed if self.replay_elapsed > 0 else 0.0
+            logger.info(f"Replay finished: {self.replayed_events} events in {self.replay_elapsed:.2f}s ({rate:,.0f} events/s).")
+            self.replay_complete.set()
+
+    def _dispatch_replayed(self, event):
+        adapter = self._replay_adapters.get(event.exchange)
+        if adapter is None:
+            adapter = self._replay_adapters[event.exchange] = _ReplayAdapter(event.exchange)
+        if type(event) is Tick:
+            # Staleness is judged against the replay clock, not the recording's
+            event.recv_ts = time.monotonic()
+        self._on_feed_event(adapter, event)
+        self.replayed_events += 1
+
+    def get_replay_stats(self):
+        return {
+            "events": self.replayed_events,
+            "elapsed_seconds": self.replay_elapsed,
+            "events_per_second": self.replayed_events / self.replay_elapsed if self.replay_elapsed > 0 else 0.0,
+            "complete": self.replay_complete.is_set(),
+        }
+
+class _ReplayAdapter:
+    """Stands in for a FeedAdapter when routing replayed events.
+
+    Recorded books already contain every snapshot the live feed received
+    (including REST resyncs), so a gap just waits for the next recorded
+    snapshot instead of fetching or re-subscribing.
+    """
+
+    snapshot_via_rest = False
+    exchange_timestamps = False
+
+    def __init__(self, exchange_id: str):
+        self.exchange_id = exchange_id
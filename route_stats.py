@@ -0,0 +1,150 @@
+"""
+Per-route execution history: decayed fill rate, realized vs expected profit, latency and slippage, persisted as JSON.
+"""
+
+import asyncio
+import json
+import logging
+import os
+import time
+from dataclasses import asdict, dataclass, fields
+from typing import Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+@dataclass(slots=True)
+class RouteStats:
+    """Decayed statistics of one route. Counts halve every half_life; means weight recent trades the same way."""
+    attempts: float = 0.0
+    fills: float = 0.0
+    realized_ratio: float = 0.0  # Realized / expected profit of filled trades
+    latency_ms: float = 0.0
+    slippage_pct: float = 0.0  # Adverse price move between detection and fill, both legs summed
+    updated: float = 0.0
+    trades: int = 0  # Not decayed
+
+    @property
+    def fill_rate(self) -> float:
+        return self.fills / self.attempts if self.attempts > 0 else 0.0
+
+class RouteStatsStore:
+    """Route statistics by route_id, updated per completed trade and read by the opportunity scorer.
+
+    Every record decays the route's running counts by 0.5 ** (elapsed /
+    half_life) before adding the new trade, and the means are updated with
+    weight 1 / decayed count, so they are exponentially time-weighted too.
+    Reads are O(1): the success score blends the observed quality (fill rate
+    times the fraction of expected profit realized) with a prior, weighted
+    by how many decayed attempts back it, so sparse or old history drifts
+    back to the prior.
+    """
+
+    def __init__(self, path: Optional[str] = None, half_life: float = 86400.0, prior_score: float = 80.0, prior_weight: float = 2.0,
+                 min_attempts: float = 3.0, min_fill_rate: float = 0.2, save_interval: float = 60.0):
+        self.path = path
+        self.half_life = half_life
+        self.prior_score = prior_score
+        self.prior_weight = prior_weight
+        self.min_attempts = min_attempts
+        self.min_fill_rate = min_fill_rate
+        self.save_interval = save_interval
+        self.routes: Dict[str, RouteStats] = {}
+        self._dirty = False
+
+    def _decay(self, stats: RouteStats, now: float) -> float:
+        return 0.5 ** (max(0.0, now - stats.updated) / self.half_life)
+
+    def record(self, route_id: str, filled: bool, expected_profit_pct: float = 0.0, realized_profit_pct: float = 0.0,
+               latency_ms: float = 0.0, slippage_pct: float = 0.0, now: Optional[float] = None) -> RouteStats:
+        """Adds one finished trade attempt of a route."""
+        now = now if now is not None else time.time()
+        stats = self.routes.get(route_id)
+        if stats is None:
+            stats = self.routes[route_id] = RouteStats()
+        decay = self._decay(stats, now)
+        stats.attempts = stats.attempts * decay + 1.0
+        stats.latency_ms += (latency_ms - stats.latency_ms) / stats.attempts
+        if filled:
+            stats.fills = stats.fills * decay + 1.0
+            ratio = realized_profit_pct / expected_profit_pct if expected_profit_pct > 0 else 0.0
+            stats.realized_ratio += (ratio - stats.realized_ratio) / stats.fills
+            stats.slippage_pct += (slippage_pct - stats.slippage_pct) / stats.fills
+        else:
+            stats.fills *= decay
+        stats.updated = now
+        stats.trades += 1
+        self._dirty = True  # Written by run_periodic_save(), never inline on the trading path
+        return stats
+
+    def get(self, route_id: str) -> Optional[RouteStats]:
+        return self.routes.get(route_id)
+
+    def success_score(self, route_id: str, now: Optional[float] = None) -> float:
+        """0-100 historical success of a route for the opportunity scorer; the prior when it has no history."""
+        stats = self.routes.get(route_id)
+        if stats is None:
+            return self.prior_score
+        evidence = stats.attempts * self._decay(stats, now if now is not None else time.time())
+        observed = 100.0 * stats.fill_rate * min(1.0, max(0.0, stats.realized_ratio))
+        return (self.prior_score * self.prior_weight + observed * evidence) / (self.prior_weight + evidence)
+
+    def is_blocked(self, route_id: str, now: Optional[float] = None) -> bool:
+        """True for a route that recently and repeatedly failed to fill; it becomes eligible again as its history decays."""
+        stats = self.routes.get(route_id)
+        if stats is None:
+            return False
+        evidence = stats.attempts * self._decay(stats, now if now is not None else time.time())
+        return evidence >= self.min_attempts and stats.fill_rate < self.min_fill_rate
+
+    def load(self) -> int:
+        """Loads persisted stats (a missing file is an empty history). Returns the number of routes."""
+        if not self.path or not os.path.exists(self.path):
+            return 0
+        try:
+            with open(self.path) as f:
+                data = json.load(f)
+            names = {field.name for field in fields(RouteStats)}
+            self.routes = {route_id: RouteStats(**{key: value for key, value in values.items() if key in names})
+                           for route_id, values in data.get("routes", {}).items()}
+        except (OSError, ValueError, TypeError) as e:
+            logger.warning(f"Could not load route stats from {self.path}: {e}")
+            return 0
+        logger.info(f"Loaded statistics for {len(self.routes)} routes from {self.path}.")
+        return len(self.routes)
+
+    def _serialize(self) -> str:
+        return json.dumps({"half_life": self.half_life, "routes": {route_id: asdict(stats) for route_id, stats in self.routes.items()}})
+
+    def _write(self, payload: str):
+        """Writes a serialized snapshot atomically (temp file + rename), so a crash never leaves a truncated file."""
+        temporary = f"{self.path}.tmp"
+        try:
+            with open(temporary, "w") as f:
+                f.write(payload)
+            os.replace(temporary, self.path)
+        except OSError as e:
+            self._dirty = True  # Retried on the next save
+            logger.warning(f"Could not save route stats to {self.path}: {e}")
+
+    def save(self):
+        """Writes the stats if anything changed since the last save. Blocks on file I/O; use save_async() on the event loop."""
+        if not self.path or not self._dirty:
+            return
+        self._dirty = False
+        self._write(self._serialize())
+
+    async def save_async(self):
+        """Like save(), but only the snapshot is taken on the event loop; the file is written in a worker thread."""
+        if not self.path or not self._dirty:
+            return
+        self._dirty = False
+        await asyncio.to_thread(self._write, self._serialize())
+
+    async def run_periodic_save(self):
+        """Persists the stats every save_interval seconds until cancelled."""
+        while True:
+            await asyncio.sleep(self.save_interval)
+            await self.save_async()
+
+    def get_stats(self) -> Dict[str, float]:
+        return {"routes": len(self.routes), "trades": sum(stats.trades for stats in self.routes.values())}
@@ -0,0 +1,160 @@
+"""
+Direct-route scanning partitioned across worker processes that read quotes from shared memory.
+"""
+
+import logging
+import multiprocessing
+import queue
+import time
+from multiprocessing import shared_memory
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from shared_quote_table import SharedQuoteTable
+from spread_matrix import SpreadMatrix
+
+logger = logging.getLogger(__name__)
+
+Route = Tuple[str, str, str, float]  # (symbol, buy_exchange, sell_exchange, profit_pct), as SpreadMatrix.scan returns
+
+class ShardedScanner:
+    """Spreads the direct-route scan of trade_symbols over scan worker processes.
+
+    The parent process (the only writer) mirrors every quote it accepts into a
+    SharedQuoteTable and the taker fees into a small shared array. Each worker
+    owns a round-robin shard of the symbols, polls the table's seqlock
+    counters for its columns, keeps a SpreadMatrix of its shard and, whenever
+    something changed, scans the changed symbols and puts
+    (scanned_symbols, routes) on a multiprocessing queue. Messages are plain
+    tuples, so the queue only pickles strings and floats. The parent drains
+    the queue and does everything that needs its own state (order books,
+    sizing, scoring, the opportunity queue). A cleared quote is written as a
+    zero bid/ask, which SpreadMatrix.update treats as missing.
+    """
+
+    def __init__(self, exchanges: Sequence[str], symbols: Sequence[str], processes: int, min_profit: float,
+                 poll_interval: float = 0.001, queue_size: int = 10000):
+        self.exchanges = list(exchanges)
+        self.symbols = list(symbols)
+        self.processes = max(1, processes)
+        self.min_profit = min_profit
+        self.poll_interval = poll_interval
+        self.queue_size = queue_size
+        self.table: Optional[SharedQuoteTable] = None
+        self.fees_shm: Optional[shared_memory.SharedMemory] = None
+        self.fees: Optional[np.ndarray] = None
+        self.results = None
+        self.workers = []
+        self.batches_received = 0
+
+    def start(self, fees: Optional[Dict[str, float]] = None):
+        self.table = SharedQuoteTable(self.exchanges, self.symbols)
+        self.fees_shm = shared_memory.SharedMemory(create=True, size=max(len(self.exchanges), 1) * 8)
+        self.fees = np.ndarray((len(self.exchanges),), dtype=np.float64, buffer=self.fees_shm.buf)
+        self.fees[:] = 0.0
+        if fees:
+            self.set_fees(fees)
+        context = multiprocessing.get_context("spawn")
+        self.results = context.Queue(self.queue_size)
+        for shard in (self.symbols[i::self.processes] for i in range(self.processes)):
+            if not shard:
+                continue
+            process = context.Process(
+                target=_run_scan_shard_process,
+                args=(self.table.name, self.fees_shm.name, self.exchanges, self.symbols, shard, self.min_profit,
+                      self.results, self.poll_interval),
+                daemon=True,
+            )
+            process.start()
+            self.workers.append(process)
+        logger.info(f"Started {len(self.workers)} scan worker process(es) for {len(self.symbols)} symbols on shared quote table {self.table.name}.")
+
+    def set_fees(self, fees: Dict[str, float]):
+        """Taker fees as fractions; a float64 store per exchange, picked up by the workers on their next scan."""
+        for i, exchange in enumerate(self.exchanges):
+            if exchange in fees:
+                self.fees[i] = fees[exchange]
+
+    def publish(self, exchange: str, symbol: str, bid: Optional[float], ask: Optional[float]) -> bool:
+        return self.table.write(exchange, symbol, bid or 0.0, ask or 0.0)
+
+    def clear(self, exchange: str, symbol: str) -> bool:
+        return self.table.write(exchange, symbol, 0.0, 0.0)
+
+    def drain(self, max_batches: int = 0) -> List[Tuple[List[str], List[Route]]]:
+        """Scan results the workers have finished, oldest first, without blocking."""
+        batches = []
+        while not max_batches or len(batches) < max_batches:
+            try:
+                batches.append(self.results.get_nowait())
+            except queue.Empty:
+                break
+        self.batches_received += len(batches)
+        return batches
+
+    def close(self):
+        for process in self.workers:
+            process.terminate()
+            process.join(timeout=5)
+        self.workers = []
+        if self.results is not None:
+            self.results.close()
+            self.results = None
+        if self.table is not None:
+            self.table.close()
+            self.table = None
+        if self.fees_shm is not None:
+            self.fees = None
+            self.fees_shm.close()
+            self.fees_shm.unlink()
+            self.fees_shm = None
+
+    def get_stats(self) -> Dict[str, int]:
+        return {"workers": sum(process.is_alive() for process in self.workers), "batches": self.batches_received}
+
+class ShardScan:
+    """One worker's view: its symbols' table columns, the seqs it last read and a SpreadMatrix of its shard."""
+
+    def __init__(self, table: SharedQuoteTable, shard_symbols: Sequence[str]):
+        self.table = table
+        self.symbols = list(shard_symbols)
+        self.columns = np.array([table.symbol_index[symbol] for symbol in self.symbols], dtype=np.intp)
+        self.last_seqs = np.zeros((len(table.exchanges), len(self.columns)), dtype=table.table["seq"].dtype)
+        self.matrix = SpreadMatrix(self.symbols, table.exchanges)
+
+    def poll(self, min_profit: float, fees: Optional[np.ndarray] = None) -> Optional[Tuple[List[str], List[Route]]]:
+        """Applies the quotes written since the last poll and scans the symbols they touched; None when nothing changed."""
+        exchange_indices, shard_indices = self.table.changed_slots(self.last_seqs, self.columns)
+        if not len(exchange_indices):
+            return None
+        if fees is not None:
+            self.matrix.set_fees(dict(zip(self.table.exchanges, fees.tolist())))
+        for exchange_idx, shard_idx in zip(exchange_indices.tolist(), shard_indices.tolist()):
+            values = self.table.read_slot(exchange_idx, int(self.columns[shard_idx]))
+            if values is None:
+                continue
+            self.last_seqs[exchange_idx, shard_idx] = values[0]
+            self.matrix.update(self.table.exchanges[exchange_idx], self.symbols[shard_idx], values[1], values[2])
+        symbols = [self.symbols[i] for i in np.unique(shard_indices).tolist()]
+        return symbols, self.matrix.scan(min_profit, self.matrix.rows(symbols))
+
+def _run_scan_shard_process(table_name, fees_name, exchanges, table_symbols, shard_symbols, min_profit, results, poll_interval):
+    """Worker process entry point: scans one shard of symbols from the shared quote table and reports its routes."""
+    table = SharedQuoteTable.attach(table_name, exchanges, table_symbols)
+    fees_shm = shared_memory.SharedMemory(name=fees_name)
+    fees = np.ndarray((len(exchanges),), dtype=np.float64, buffer=fees_shm.buf)
+    scan = ShardScan(table, shard_symbols)
+    try:
+        while True:
+            batch = scan.poll(min_profit, fees)
+            if batch is None:
+                time.sleep(poll_interval)
+            else:
+                results.put(batch)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        del fees
+        fees_shm.close()
+        table.close()
@@ -0,0 +1,105 @@
+"""
+Shared-memory quote table for passing normalized top-of-book quotes between processes.
+"""
+
+import logging
+from multiprocessing import shared_memory
+from typing import List, Optional, Tuple
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+QUOTE_DTYPE = np.dtype([
+    ("seq", "u8"),        # Seqlock counter: odd while a write is in progress
+    ("bid", "f8"),
+    ("ask", "f8"),
+    ("bid_qty", "f8"),
+    ("ask_qty", "f8"),
+    ("timestamp", "i8"),  # Exchange event time in ms
+    ("update_id", "i8"),
+])
+
+class SharedQuoteTable:
+    """Fixed [exchanges x symbols] table of quotes in a multiprocessing.shared_memory block.
+
+    Each slot has exactly one writer process. Writers bump the slot's seq to an
+    odd value, write the fields and bump it to even again; readers retry while
+    seq is odd or changed during the read (a seqlock), so reads never block and
+    never return a half-written quote.
+    """
+
+    def __init__(self, exchanges: List[str], symbols: List[str], name: Optional[str] = None, create: bool = True):
+        self.exchanges = list(exchanges)
+        self.symbols = list(symbols)
+        self.exchange_index = {exchange: i for i, exchange in enumerate(self.exchanges)}
+        self.symbol_index = {symbol: i for i, symbol in enumerate(self.symbols)}
+        shape = (len(self.exchanges), len(self.symbols))
+        size = max(int(np.prod(shape)) * QUOTE_DTYPE.itemsize, 1)
+        self.shm = shared_memory.SharedMemory(name=name, create=create, size=size)
+        self.owner = create
+        self.table = np.ndarray(shape, dtype=QUOTE_DTYPE, buffer=self.shm.buf)
+        if create:
+            self.table[:] = 0
+        self.name = self.shm.name
+
+    @classmethod
+    def attach(cls, name: str, exchanges: List[str], symbols: List[str]) -> "SharedQuoteTable":
+        """Opens a table created by the parent process (children share its resource tracker)."""
+        return cls(exchanges, symbols, name=name, create=False)
+
+    def write(self, exchange: str, symbol: str, bid: float, ask: float, bid_qty: float = 0.0,
+              ask_qty: float = 0.0, timestamp: int = 0, update_id: int = 0) -> bool:
+        exchange_idx = self.exchange_index.get(exchange)
+        symbol_idx = self.symbol_index.get(symbol)
+        if exchange_idx is None or symbol_idx is None:
+            return False
+        slot = self.table[exchange_idx, symbol_idx]
+        slot["seq"] += 1
+        slot["bid"] = bid
+        slot["ask"] = ask
+        slot["bid_qty"] = bid_qty
+        slot["ask_qty"] = ask_qty
+        slot["timestamp"] = timestamp
+        slot["update_id"] = update_id
+        slot["seq"] += 1
+        return True
+
+    def read_slot(self, exchange_idx: int, symbol_idx: int, max_retries: int = 100) -> Optional[Tuple]:
+        """Consistent copy of one slot as (seq, bid, ask, bid_qty, ask_qty, timestamp, update_id)."""
+        slot = self.table[exchange_idx, symbol_idx]
+        for _ in range(max_retries):
+            seq_before = int(slot["seq"])
+            if seq_before & 1:
+                continue
+            values = slot.item()
+            if values[0] == seq_before and int(slot["seq"]) == seq_before:
+                return values
+        return None
+
+    def read(self, exchange: str, symbol: str) -> Optional[Tuple]:
+        exchange_idx = self.exchange_index.get(exchange)
+        symbol_idx = self.symbol_index.get(symbol)
+        if exchange_idx is None or symbol_idx is None:
+            return None
+        return self.read_slot(exchange_idx, symbol_idx)
+
+    def changed_slots(self, last_seqs: np.ndarray, columns: Optional[np.ndarray] = None):
+        """Indices of slots written since last_seqs (updated in place), as two index arrays.
+
+        With columns, only those symbol columns are compared; last_seqs and the
+        returned symbol indices are then positions within columns.
+        """
+        seqs = self.table["seq"].copy() if columns is None else self.table["seq"][:, columns]
+        changed = np.nonzero((seqs != last_seqs) & ((seqs & 1) == 0))
+        last_seqs[changed] = seqs[changed]
+        return changed
+
+    def close(self):
+        self.table = None
+        self.shm.close()
+        if self.owner:
+            try:
+                self.shm.unlink()
+            except FileNotFoundError:
+                pass
@@ -0,0 +1,102 @@
+"""
+Vectorized cross-exchange spread scan over contiguous [symbols x exchanges] quote arrays.
+"""
+
+import logging
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+class SpreadMatrix:
+    """Best bid/ask of every (symbol, exchange) in two [S x E] float64 arrays.
+
+    The fee-adjusted prices are maintained on write (ask * (1 + buy fee) and
+    bid * (1 - sell fee)), so a scan is a single broadcast: for every symbol,
+    the net profit of buying on exchange i and selling on exchange j is
+
+        (eff_bid[s, j] - eff_ask[s, i]) / eff_ask[s, i]
+
+    over an [S x E x E] block, and only the routes above the threshold are
+    turned back into Python objects. Missing or invalid quotes are NaN and
+    never compare above the threshold.
+    """
+
+    def __init__(self, symbols: Sequence[str], exchanges: Sequence[str], fees: Optional[Dict[str, float]] = None):
+        self.symbols = list(symbols)
+        self.exchanges = list(exchanges)
+        self.symbol_index = {symbol: i for i, symbol in enumerate(self.symbols)}
+        self.exchange_index = {exchange: i for i, exchange in enumerate(self.exchanges)}
+        shape = (len(self.symbols), len(self.exchanges))
+        self.bids = np.full(shape, np.nan)
+        self.asks = np.full(shape, np.nan)
+        self.fees = np.zeros(len(self.exchanges))
+        self.effective_bids = np.full(shape, np.nan)  # bid * (1 - fee): what a sale actually yields
+        self.effective_asks = np.full(shape, np.nan)  # ask * (1 + fee): what a purchase actually costs
+        self._same_exchange = np.eye(len(self.exchanges), dtype=bool)
+        if fees:
+            self.set_fees(fees)
+
+    def set_fees(self, fees: Dict[str, float]):
+        """Taker fee per exchange as a fraction (0.001 = 0.1%); recomputes the effective prices if any changed."""
+        updated = np.array([fees.get(exchange, fee) for exchange, fee in zip(self.exchanges, self.fees)], dtype=np.float64)
+        if not np.array_equal(updated, self.fees):
+            self.fees = updated
+            np.multiply(self.bids, 1.0 - self.fees, out=self.effective_bids)
+            np.multiply(self.asks, 1.0 + self.fees, out=self.effective_asks)
+
+    def update(self, exchange: str, symbol: str, bid: float, ask: float) -> bool:
+        """Writes one quote. Returns False when the pair is not tracked."""
+        row = self.symbol_index.get(symbol)
+        column = self.exchange_index.get(exchange)
+        if row is None or column is None:
+            return False
+        if not (bid > 0 and ask > 0):
+            self.clear(exchange, symbol)
+            return True
+        fee = self.fees[column]
+        self.bids[row, column] = bid
+        self.asks[row, column] = ask
+        self.effective_bids[row, column] = bid * (1.0 - fee)
+        self.effective_asks[row, column] = ask * (1.0 + fee)
+        return True
+
+    def clear(self, exchange: str, symbol: str):
+        """Removes a quote (stale or missing), so no route uses it."""
+        row = self.symbol_index.get(symbol)
+        column = self.exchange_index.get(exchange)
+        if row is None or column is None:
+            return
+        self.bids[row, column] = self.asks[row, column] = np.nan
+        self.effective_bids[row, column] = self.effective_asks[row, column] = np.nan
+
+    def rows(self, symbols: Iterable[str]) -> np.ndarray:
+        """Row indices of the tracked symbols among symbols."""
+        return np.fromiter((self.symbol_index[symbol] for symbol in symbols if symbol in self.symbol_index), dtype=np.intp)
+
+    def profit_matrix(self, rows: Optional[np.ndarray] = None) -> np.ndarray:
+        """Net-of-fee profit fraction of every route as an [S x E(buy) x E(sell)] array, NaN where a quote is missing."""
+        effective_bids = self.effective_bids if rows is None else self.effective_bids[rows]
+        effective_asks = self.effective_asks if rows is None else self.effective_asks[rows]
+        buy = effective_asks[:, :, None]
+        with np.errstate(invalid="ignore"):
+            return (effective_bids[:, None, :] - buy) / buy
+
+    def scan(self, min_profit: float, rows: Optional[np.ndarray] = None) -> List[Tuple[str, str, str, float]]:
+        """(symbol, buy_exchange, sell_exchange, profit_pct) of every route whose net profit fraction exceeds min_profit."""
+        profit = self.profit_matrix(rows)
+        with np.errstate(invalid="ignore"):
+            mask = profit > min_profit
+        mask &= ~self._same_exchange
+        symbol_rows, buy_columns, sell_columns = np.nonzero(mask)
+        if not len(symbol_rows):
+            return []
+        profit_pct = (profit[symbol_rows, buy_columns, sell_columns] * 100).tolist()
+        if rows is not None:
+            symbol_rows = rows[symbol_rows]
+        symbols, exchanges = self.symbols, self.exchanges
+        return [
+            (symbols[row], exchanges[buy], exchanges[sell], pct)
+            for row, buy, sell, pct in zip(symbol_rows.tolist(), buy_columns.tolist(), sell_columns.tolist(), profit_pct)
+        ]
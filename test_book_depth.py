@@ -0,0 +1,87 @@
+"""
+Unit tests for cumulative book depth and the profit-maximizing route quantity.
+"""
+
+import math
+import random
+import unittest
+
+from book_depth import BookDepth, optimal_fill
+
+def walk(levels, quantity):
+    """Notional of the first quantity units, level by level."""
+    notional, remaining = 0.0, quantity
+    for price, size in levels:
+        take = min(size, remaining)
+        notional += take * price
+        remaining -= take
+        if remaining <= 1e-12:
+            return notional
+    return math.inf
+
+class TestBookDepth(unittest.TestCase):
+    def test_prefix_lookups(self):
+        asks = BookDepth([(100.0, 1.0), (101.0, 2.0), (103.0, 1.0)])
+        self.assertEqual(asks.total_quantity, 4.0)
+        self.assertAlmostEqual(asks.notional(2.5), 100.0 + 1.5 * 101.0)
+        self.assertEqual(asks.notional(5.0), math.inf)
+        self.assertAlmostEqual(asks.quantity_for_notional(100.0 + 101.0), 2.0)
+        self.assertEqual(asks.quantity_for_notional(1e9), 4.0)
+        self.assertEqual(len(BookDepth([])), 0)
+
+    def test_stops_where_marginal_cost_crosses_revenue(self):
+        asks = BookDepth([(100.0, 1.0), (100.5, 1.0), (102.0, 5.0)])
+        bids = BookDepth([(102.0, 0.5), (101.0, 2.0), (99.0, 5.0)])
+        fill = optimal_fill(asks, bids)
+        self.assertAlmostEqual(fill.quantity, 2.0)  # The third ask level costs more than the second bid level pays
+        self.assertAlmostEqual(fill.profit, (102.0 * 0.5 + 101.0 * 1.5) - (100.0 + 100.5))
+        self.assertAlmostEqual(fill.buy_vwap, 100.25)
+        capped = optimal_fill(asks, bids, max_notional=150.0)
+        self.assertAlmostEqual(capped.quantity, 1.0 + 50.0 / 100.5)  # 150 of notional buys the first level and part of the second
+        self.assertEqual(optimal_fill(bids=bids, asks=BookDepth([(105.0, 1.0)])).quantity, 0.0)
+
+    def test_matches_brute_force_on_random_books(self):
+        rng = random.Random(19)
+        for _ in range(300):
+            mid = rng.uniform(10, 1000)
+            asks, bids = [], []
+            price = mid * (1 - rng.uniform(0, 0.004))
+            for _ in range(rng.randint(1, 8)):
+                asks.append((price, rng.uniform(0.1, 3)))
+                price *= 1 + rng.uniform(0.0001, 0.002)
+            price = mid * (1 + rng.uniform(0, 0.004))
+            for _ in range(rng.randint(1, 8)):
+                bids.append((price, rng.uniform(0.1, 3)))
+                price *= 1 - rng.uniform(0.0001, 0.002)
+            buy_fee, sell_fee, min_profit = rng.choice([0.0, 0.001]), rng.choice([0.0, 0.001]), rng.choice([0.0, 0.001])
+            max_notional = rng.choice([math.inf, mid * rng.uniform(0.5, 5)])
+            fill = optimal_fill(BookDepth(asks), BookDepth(bids), buy_fee, sell_fee, min_profit, max_notional)
+
+            limit = min(sum(size for _, size in asks), sum(size for _, size in bids))
+            candidates = {limit * i / 400 for i in range(401)}
+            for levels in (asks, bids):
+                total = 0.0
+                for _, size in levels:
+                    total += size
+                    candidates.add(min(total, limit))
+            best = 0.0
+            for quantity in candidates:
+                cost = walk(asks, quantity) * (1 + buy_fee)
+                profit = walk(bids, quantity) * (1 - sell_fee) - cost
+                if quantity > 0 and cost <= max_notional + 1e-9 and profit >= cost * min_profit - 1e-9:
+                    best = max(best, profit)
+            if fill.quantity > 0:
+                cost = walk(asks, fill.quantity) * (1 + buy_fee)
+                self.assertLessEqual(cost, max_notional * (1 + 1e-9))
+                self.assertGreaterEqual(fill.profit_pct, min_profit * 100 - 1e-7)
+                self.assertAlmostEqual(fill.profit, walk(bids, fill.quantity) * (1 - sell_fee) - cost, places=6)
+            self.assertGreaterEqual(fill.profit, best - 1e-6)
+
+    def test_sell_rate_converts_proceeds(self):
+        asks = BookDepth([(100.0, 1.0)])
+        bids = BookDepth([(101.0, 1.0)])
+        self.assertAlmostEqual(optimal_fill(asks, bids, sell_rate=0.999).profit, 101.0 * 0.999 - 100.0)
+        self.assertEqual(optimal_fill(asks, bids, sell_rate=0.99).quantity, 0.0)
+
+if __name__ == "__main__":
+    unittest.main()
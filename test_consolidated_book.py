@@ -0,0 +1,67 @@
+"""
+Unit tests for the consolidated best bid/offer, checked against the spread matrix after random tick sequences.
+"""
+
+import random
+import unittest
+
+from consolidated_book import ConsolidatedBook
+from spread_matrix import SpreadMatrix
+
+FEES = {"binance": 0.001, "bybit": 0.001, "okx": 0.0008, "kraken": 0.0026, "coinbase": 0.004}
+
+class TestConsolidatedBook(unittest.TestCase):
+    def test_routes_match_full_scan_under_random_ticks(self):
+        rng = random.Random(3)
+        symbols = ["BTCUSDT", "ETHUSDT", "SOLUSDT"]
+        book = ConsolidatedBook(FEES)
+        matrix = SpreadMatrix(symbols, list(FEES), FEES)
+        mids = {symbol: rng.uniform(10, 1000) for symbol in symbols}
+        for step in range(5000):
+            symbol, exchange = rng.choice(symbols), rng.choice(list(FEES))
+            if rng.random() < 0.05:
+                book.remove(exchange, symbol)
+                matrix.clear(exchange, symbol)
+            else:
+                bid = mids[symbol] * (1 + rng.gauss(0, 0.0015))
+                ask = bid * (1 + rng.uniform(-0.001, 0.002))  # Occasionally crossed on one venue
+                book.update(exchange, symbol, bid, ask)
+                matrix.update(exchange, symbol, bid, ask)
+            expected = sorted(route[:3] for route in matrix.scan(0.001, matrix.rows([symbol])))
+            self.assertEqual(sorted(route[:3] for route in book.scan(0.001, [symbol])), expected, f"step {step}")
+            self.assertLessEqual(len(book.get(symbol).bid_heap), 2 * len(FEES) + 9)  # Stale entries are compacted
+
+    def test_best_venues_and_snapshot(self):
+        book = ConsolidatedBook({"binance": 0.001, "kraken": 0.0026})
+        book.update("binance", "BTCUSDT", 100.0, 100.1)
+        book.update("kraken", "BTCUSDT", 100.05, 100.12)
+        quote = book.get("BTCUSDT")
+        self.assertEqual(quote.best_bid(), ("binance", 100.0))  # Kraken's higher bid loses to its fee
+        self.assertEqual(quote.best_ask(), ("binance", 100.1))
+        self.assertEqual(quote.routes(0.0), [])  # Best bid and ask on the same venue, runners-up do not cross
+        book.update("binance", "BTCUSDT", 0.0, 0.0)  # An invalid quote removes the venue
+        self.assertEqual(book.snapshot()["BTCUSDT"], {"bid_exchange": "kraken", "best_bid": 100.05,
+                                                      "ask_exchange": "kraken", "best_ask": 100.12, "venues": 1})
+
+    def test_snapshot_leaves_heaps_untouched(self):
+        book = ConsolidatedBook({"binance": 0.001, "bybit": 0.001})
+        for bid in (100.0, 100.2, 100.1):
+            book.update("binance", "BTCUSDT", bid, bid + 0.1)  # Leaves superseded entries on top of the heaps
+        book.update("bybit", "BTCUSDT", 99.9, 100.0)
+        quote = book.get("BTCUSDT")
+        bid_heap, ask_heap = list(quote.bid_heap), list(quote.ask_heap)
+        self.assertEqual(book.snapshot()["BTCUSDT"], {"bid_exchange": "binance", "best_bid": 100.1,
+                                                      "ask_exchange": "bybit", "best_ask": 100.0, "venues": 2})
+        self.assertEqual(quote.bid_heap, bid_heap)
+        self.assertEqual(quote.ask_heap, ask_heap)
+
+    def test_fee_change_reprices_held_quotes(self):
+        book = ConsolidatedBook({"binance": 0.0, "bybit": 0.0})
+        book.update("binance", "BTCUSDT", 99.0, 100.0)
+        book.update("bybit", "BTCUSDT", 100.5, 101.0)
+        self.assertEqual([route[:3] for route in book.scan(0.004, ["BTCUSDT"])], [("BTCUSDT", "binance", "bybit")])
+        book.set_fees({"binance": 0.001})
+        self.assertEqual(book.scan(0.004, ["BTCUSDT"]), [])
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,91 @@
+"""
+Unit tests for synthetic cross-quote routes, checked against a leg-by-leg calculation.
+"""
+
+import random
+import unittest
+
+from cross_quote_routes import CrossQuoteRouter
+from spread_matrix import SpreadMatrix
+
+FEES = {"binance": 0.001, "bybit": 0.001, "okx": 0.0008}
+CURRENCIES = {"BTCUSDT": ("BTC", "USDT"), "BTCUSDC": ("BTC", "USDC"), "ETHUSDT": ("ETH", "USDT"),
+              "ETHUSDC": ("ETH", "USDC"), "USDCUSDT": ("USDC", "USDT")}
+
+def brute_force(quotes, min_profit):
+    """Profit of every buy-sell-convert route, walking one unit of the start quote currency through the legs."""
+    found = {}
+    for (buy_symbol, buy_exchange), (_, ask) in quotes.items():
+        for (sell_symbol, sell_exchange), (bid, _) in quotes.items():
+            base, pay = CURRENCIES[buy_symbol]
+            sell_base, receive = CURRENCIES[sell_symbol]
+            if sell_base != base or receive == pay or buy_exchange == sell_exchange:
+                continue
+            received = 1 / (ask * (1 + FEES[buy_exchange])) * bid * (1 - FEES[sell_exchange])
+            for conversion_exchange in (buy_exchange, sell_exchange):
+                if ("USDCUSDT", conversion_exchange) not in quotes:
+                    continue
+                conversion_bid, conversion_ask = quotes[("USDCUSDT", conversion_exchange)]
+                fee = FEES[conversion_exchange]
+                if receive == "USDC":
+                    final, side = received * conversion_bid * (1 - fee), "sell"
+                else:
+                    final, side = received / (conversion_ask * (1 + fee)), "buy"
+                if final - 1 > min_profit:
+                    legs = ((buy_symbol, buy_exchange, "buy"), (sell_symbol, sell_exchange, "sell"),
+                            ("USDCUSDT", conversion_exchange, side))
+                    found[legs] = (final - 1) * 100
+    return found
+
+class TestCrossQuoteRoutes(unittest.TestCase):
+    def test_route_index(self):
+        matrix = SpreadMatrix(list(CURRENCIES), list(FEES), FEES)
+        router = CrossQuoteRouter(matrix)
+        # Two families x two directions x 6 ordered venue pairs x 2 conversion venues
+        self.assertEqual(len(router), 48)
+        self.assertEqual(sorted(router.families), ["BTC", "ETH"])
+        self.assertEqual(len(router.route_ids(matrix.rows(["BTCUSDT"]))), 24)
+        self.assertEqual(len(router.route_ids(matrix.rows(["USDCUSDT"]))), 48)
+        self.assertEqual(len(CrossQuoteRouter(SpreadMatrix(["BTCUSDT", "BTCUSDC"], list(FEES)))), 0)  # No conversion market
+
+    def test_matches_leg_by_leg_calculation(self):
+        rng = random.Random(5)
+        matrix = SpreadMatrix(list(CURRENCIES), list(FEES), FEES)
+        router = CrossQuoteRouter(matrix)
+        mids = {"BTCUSDT": 50000.0, "BTCUSDC": 50000.0, "ETHUSDT": 3000.0, "ETHUSDC": 3000.0, "USDCUSDT": 1.0}
+        quotes = {}
+        hits = 0
+        for step in range(2000):
+            symbol, exchange = rng.choice(list(mids)), rng.choice(list(FEES))
+            if rng.random() < 0.05:
+                quotes.pop((symbol, exchange), None)
+                matrix.clear(exchange, symbol)
+            else:
+                bid = mids[symbol] * (1 + rng.gauss(0, 0.0015))
+                quotes[(symbol, exchange)] = (bid, bid * 1.0001)
+                matrix.update(exchange, symbol, bid, bid * 1.0001)
+            expected = brute_force(quotes, 0.001)
+            incremental = {route.legs: route.profit_pct for route in router.scan(0.001, matrix.rows([symbol]))}
+            full = {route.legs: route.profit_pct for route in router.scan(0.001)}
+            self.assertEqual(set(full), set(expected), f"step {step}")
+            self.assertEqual(set(incremental), {legs for legs in expected if any(leg[0] == symbol for leg in legs)})
+            for legs, profit_pct in expected.items():
+                self.assertAlmostEqual(full[legs], profit_pct, places=9)
+            hits += bool(expected)
+        self.assertGreater(hits, 50)
+
+    def test_market_currencies_override_suffix_split(self):
+        matrix = SpreadMatrix(["XBTUSD", "XBTUSDC", "USDCUSD"], ["kraken", "coinbase"], {"kraken": 0.0, "coinbase": 0.0})
+        self.assertEqual(len(CrossQuoteRouter(matrix)), 0)  # The suffix split reads XBTUSD as XB/TUSD
+        router = CrossQuoteRouter(matrix, {"XBTUSD": ("BTC", "USD"), "XBTUSDC": ("BTC", "USDC")})
+        self.assertEqual(sorted(router.families), ["BTC"])
+        self.assertEqual(len(router), 8)
+        matrix.update("kraken", "XBTUSDC", 100.0, 100.0)
+        matrix.update("coinbase", "XBTUSD", 101.0, 101.0)
+        matrix.update("coinbase", "USDCUSD", 1.0, 1.0)
+        route, = router.scan(0.0)
+        self.assertEqual(route.legs, (("XBTUSDC", "kraken", "buy"), ("XBTUSD", "coinbase", "sell"), ("USDCUSD", "coinbase", "buy")))
+        self.assertAlmostEqual(route.profit_pct, 1.0)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,64 @@
+"""
+Tests WebSocketManager against the local exchange simulator, including injected sequence gaps.
+"""
+
+import asyncio
+import unittest
+
+from exchange_simulator import ExchangeSimulator
+from websocket_manager import WebSocketManager
+
+SYMBOLS = ["SIM0USDT", "SIM1USDT", "SIM2USDT"]
+
+class TestExchangeSimulator(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        self.simulator = ExchangeSimulator(symbols=SYMBOLS, rate=3000, seed=7, gap_probability=0.02)
+        await self.simulator.start()
+
+    async def asyncTearDown(self):
+        await self.simulator.stop()
+
+    async def run_feed(self, exchange_id, books):
+        manager = WebSocketManager({
+            "EXCHANGES": {exchange_id: {"api_key": "key", "secret": "secret"}},
+            "TRADING_CONFIG": {"trade_symbols": list(SYMBOLS)},
+            "PERFORMANCE_CONFIG": {
+                "websocket_urls": {"binance": self.simulator.binance_ws_url, "bybit": self.simulator.bybit_ws_url},
+                "binance_rest_url": self.simulator.rest_url,
+            },
+        })
+        await manager.start()
+        try:
+            await asyncio.sleep(1.0)
+            self.simulator.rate = 0  # Stop generating so the local books can catch up with the simulator's
+            for _ in range(300):
+                await asyncio.sleep(0.01)
+                if all(self.local_matches(manager, exchange_id, symbol, books) for symbol in SYMBOLS):
+                    break
+            for symbol in SYMBOLS:
+                self.assertTrue(self.local_matches(manager, exchange_id, symbol, books), f"{exchange_id} {symbol} book diverged")
+                tick = manager.get_market_data(exchange_id, symbol)
+                self.assertIsNotNone(tick)
+                self.assertLess(tick.bid, tick.ask)
+            self.assertGreater(manager.update_counts[exchange_id], 100)
+            # Gaps were injected, so at least one book must have been resynced after its initial sync
+            self.assertGreater(manager.depth_resync_counts[exchange_id], len(SYMBOLS))
+        finally:
+            await manager.close()
+
+    @staticmethod
+    def local_matches(manager, exchange_id, symbol, books):
+        book = manager.get_order_book(exchange_id, symbol)
+        if book is None:
+            return False
+        bids, asks = books[symbol].top_levels(10)
+        return book.top_bids(10) == bids and book.top_asks(10) == asks
+
+    async def test_binance_combined_and_diff_depth(self):
+        await self.run_feed("binance", self.simulator.books)
+
+    async def test_bybit_orderbook_topics(self):
+        await self.run_feed("bybit", self.simulator.bybit_books)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,345 @@
+"""
+Conformance tests for the native feed adapters.
+
+Every adapter runs inside a real WebSocketManager against a local WebSocket
+server that replays recorded frames for its venue, and must end up with the
+same normalized state: a Tick per symbol in the quote store and a synced local
+order book, resynced after a sequence gap. Binance depth snapshots come from a
+local aiohttp server standing in for /api/v3/depth.
+"""
+
+import asyncio
+import json
+import time
+import unittest
+
+import websockets
+from aiohttp import web
+
+from feed_adapters import FEED_ADAPTERS, BinanceFeedAdapter, split_symbol
+from market_data import BookDelta, BookSnapshot, Tick
+from websocket_manager import WebSocketManager
+
+# Frames as captured from each venue (trimmed to a few levels), sent in order after the subscribe requests
+RECORDED_FRAMES = {
+    "binance": [
+        {"stream": "btcusdt@depth@100ms", "data": {"e": "depthUpdate", "E": 1700000000100, "s": "BTCUSDT", "U": 101, "u": 102,
+                                                  "b": [["100.50", "2.0"]], "a": [["101.00", "0.0"], ["101.50", "3.0"]]}},
+        {"stream": "btcusdt@bookTicker", "data": {"u": 400900217, "s": "BTCUSDT", "b": "100.50", "B": "2.0", "a": "101.50", "A": "3.0"}},
+        {"stream": "ethusdt@bookTicker", "data": {"u": 400900218, "s": "ETHUSDT", "b": "20.10", "B": "7.5", "a": "20.20", "A": "1.25"}},
+    ],
+    "bybit": [
+        {"success": True, "ret_msg": "", "conn_id": "cejreaspqfh3sjdnldmg-p", "op": "subscribe"},
+        {"topic": "orderbook.1.BTCUSDT", "type": "snapshot", "ts": 1700000000100,
+         "data": {"s": "BTCUSDT", "b": [["100.50", "2.0"]], "a": [["101.50", "3.0"]], "u": 1803, "seq": 7961638724}},
+        {"topic": "orderbook.1.ETHUSDT", "type": "snapshot", "ts": 1700000000101,
+         "data": {"s": "ETHUSDT", "b": [["20.10", "7.5"]], "a": [["20.20", "1.25"]], "u": 911, "seq": 7961638725}},
+        {"topic": "orderbook.50.BTCUSDT", "type": "snapshot", "ts": 1700000000102,
+         "data": {"s": "BTCUSDT", "b": [["100.00", "1.0"]], "a": [["101.00", "1.0"]], "u": 10, "seq": 7961638726}},
+        {"topic": "orderbook.50.BTCUSDT", "type": "delta", "ts": 1700000000103,
+         "data": {"s": "BTCUSDT", "b": [["100.50", "2.0"]], "a": [["101.00", "0"], ["101.50", "3.0"]], "u": 11, "seq": 7961638727}},
+        {"topic": "orderbook.50.BTCUSDT", "type": "delta", "ts": 1700000000104,
+         "data": {"s": "BTCUSDT", "b": [["99.00", "9.0"]], "a": [], "u": 13, "seq": 7961638729}},  # u=12 was lost
+    ],
+    "okx": [
+        {"event": "subscribe", "arg": {"channel": "bbo-tbt", "instId": "BTC-USDT"}, "connId": "a4d3ae55"},
+        "pong",
+        {"arg": {"channel": "bbo-tbt", "instId": "BTC-USDT"},
+         "data": [{"asks": [["101.50", "3.0", "0", "2"]], "bids": [["100.50", "2.0", "0", "1"]], "ts": "1700000000100", "seqId": 120}]},
+        {"arg": {"channel": "bbo-tbt", "instId": "ETH-USDT"},
+         "data": [{"asks": [["20.20", "1.25", "0", "1"]], "bids": [["20.10", "7.5", "0", "3"]], "ts": "1700000000101", "seqId": 88}]},
+        {"arg": {"channel": "books", "instId": "BTC-USDT"}, "action": "snapshot",
+         "data": [{"asks": [["101.00", "1.0", "0", "1"]], "bids": [["100.00", "1.0", "0", "1"]], "ts": "1700000000102",
+                   "checksum": -855196043, "prevSeqId": -1, "seqId": 123456}]},
+        {"arg": {"channel": "books", "instId": "BTC-USDT"}, "action": "update",
+         "data": [{"asks": [["101.00", "0", "0", "0"], ["101.50", "3.0", "0", "2"]], "bids": [["100.50", "2.0", "0", "1"]],
+                   "ts": "1700000000103", "checksum": 1212121, "prevSeqId": 123456, "seqId": 123460}]},
+        {"arg": {"channel": "books", "instId": "BTC-USDT"}, "action": "update",
+         "data": [{"asks": [], "bids": [["99.00", "9.0", "0", "1"]],
+                   "ts": "1700000000104", "checksum": 3434343, "prevSeqId": 123470, "seqId": 123475}]},  # 123460-123470 lost
+    ],
+    "kraken": [
+        {"channel": "status", "type": "update", "data": [{"api_version": "v2", "connection_id": 1, "system": "online", "version": "2.0.0"}]},
+        {"method": "subscribe", "result": {"channel": "ticker", "symbol": "BTC/USDT"}, "success": True, "time_in": "2023-10-06T17:35:55.440295Z"},
+        {"channel": "heartbeat"},
+        {"channel": "ticker", "type": "snapshot",
+         "data": [{"symbol": "BTC/USDT", "bid": 100.5, "bid_qty": 2.0, "ask": 101.5, "ask_qty": 3.0, "last": 101.0},
+                  {"symbol": "ETH/USDT", "bid": 20.1, "bid_qty": 7.5, "ask": 20.2, "ask_qty": 1.25, "last": 20.15}]},
+        {"channel": "book", "type": "snapshot",
+         "data": [{"symbol": "BTC/USDT", "bids": [{"price": 100.0, "qty": 1.0}], "asks": [{"price": 101.0, "qty": 1.0}], "checksum": 1}]},
+        {"channel": "book", "type": "update",
+         "data": [{"symbol": "BTC/USDT", "bids": [{"price": 100.5, "qty": 2.0}], "asks": [{"price": 101.0, "qty": 0.0}, {"price": 101.5, "qty": 3.0}],
+                   "checksum": 2, "timestamp": "2023-11-14T22:13:20.103000Z"}]},
+    ],
+}
+
+# Frame sent back when the adapter re-subscribes a book after a gap, per exchange_id
+RESYNC_FRAMES = {
+    "bybit": {"topic": "orderbook.50.BTCUSDT", "type": "snapshot", "ts": 1700000000200,
+              "data": {"s": "BTCUSDT", "b": [["100.75", "4.0"]], "a": [["101.25", "5.0"]], "u": 20, "seq": 7961638800}},
+    "okx": {"arg": {"channel": "books", "instId": "BTC-USDT"}, "action": "snapshot",
+            "data": [{"asks": [["101.25", "5.0", "0", "1"]], "bids": [["100.75", "4.0", "0", "1"]], "ts": "1700000000200",
+                      "checksum": 5, "prevSeqId": -1, "seqId": 123500}]},
+}
+
+BINANCE_DEPTH_SNAPSHOT = {"lastUpdateId": 100, "bids": [["100.00", "1.0"]], "asks": [["101.00", "1.0"]]}
+
+SYMBOLS = ["BTCUSDT", "ETHUSDT"]
+
+class RecordedFeedServer:
+    """Local WebSocket server that waits for the adapter's subscribe requests, then replays frames."""
+
+    def __init__(self, frames, expected_requests, resync_frame=None):
+        self.frames = frames
+        self.expected_requests = expected_requests
+        self.resync_frame = resync_frame
+        self.requests = []
+        self.paths = []
+
+    async def handler(self, connection):
+        self.paths.append(connection.request.path)
+        for _ in range(self.expected_requests):
+            self.requests.append(self._decode(await connection.recv()))
+        for frame in self.frames:
+            await connection.send(frame if isinstance(frame, str) else json.dumps(frame))
+        async for message in connection:
+            request = self._decode(message)
+            self.requests.append(request)
+            if self.resync_frame is not None and isinstance(request, dict) and request.get("op", request.get("method")) == "subscribe":
+                await connection.send(json.dumps(self.resync_frame))
+
+    @staticmethod
+    def _decode(message):
+        try:
+            return json.loads(message)
+        except ValueError:
+            return message
+
+    async def __aenter__(self):
+        self.server = await websockets.serve(self.handler, "127.0.0.1", 0)
+        self.url = f"ws://127.0.0.1:{self.server.sockets[0].getsockname()[1]}/ws/"
+        return self
+
+    async def __aexit__(self, *exc_info):
+        self.server.close()
+        await self.server.wait_closed()
+
+class TestSplitSymbol(unittest.TestCase):
+    def test_longest_quote_suffix_wins(self):
+        self.assertEqual(split_symbol("BTCUSDT"), ("BTC", "USDT"))
+        self.assertEqual(split_symbol("BTCUSD"), ("BTC", "USD"))
+        self.assertEqual(split_symbol("ETHFDUSD"), ("ETH", "FDUSD"))
+        self.assertEqual(split_symbol("ETHBTC"), ("ETH", "BTC"))
+        with self.assertRaises(ValueError):
+            split_symbol("USDT")
+
+class TestBinanceCombinedStream(unittest.TestCase):
+    def test_book_ticker_frame_becomes_a_tick(self):
+        manager = WebSocketManager({"EXCHANGES": {}, "TRADING_CONFIG": {"trade_symbols": list(SYMBOLS)}, "PERFORMANCE_CONFIG": {}})
+        adapter = BinanceFeedAdapter({}, {}, SYMBOLS)
+        frame = RECORDED_FRAMES["binance"][2]  # {"stream": "ethusdt@bookTicker", "data": {...}}
+        before = int(time.time() * 1000)
+        events = adapter.parse(json.dumps(frame).encode(), 12.5)
+        self.assertEqual(len(events), 1)
+        tick = events[0]
+        self.assertEqual((tick.exchange, tick.symbol, tick.bid, tick.ask, tick.bid_qty, tick.ask_qty, tick.update_id, tick.recv_ts),
+                         ("binance", "ETHUSDT", 20.1, 20.2, 7.5, 1.25, 400900218, 12.5))
+        self.assertGreaterEqual(tick.timestamp, before)  # bookTicker has no event time, so it is stamped on receipt
+        self.assertTrue(manager._on_feed_event(adapter, tick))
+        self.assertIs(manager.get_market_data("binance", "ETHUSDT"), tick)
+        self.assertIsNone(manager.get_market_data("binance", "BTCUSDT"))
+
+    def test_control_frames_yield_nothing(self):
+        adapter = BinanceFeedAdapter({}, {}, SYMBOLS)
+        self.assertEqual(adapter.parse(b'{"result": null, "id": 1}', 0.0), ())
+        self.assertEqual(adapter.parse(b'{"stream": "btcusdt@bookTicker", "data": {}}', 0.0), ())
+        self.assertEqual(adapter.parse(b'[{"s": "BTCUSDT", "b": "1", "a": "2"}]', 0.0), ())  # Array frame (e.g. !ticker@arr)
+        self.assertEqual(adapter.parse(b'{"stream": "!ticker@arr", "data": [{"s": "BTCUSDT"}]}', 0.0), ())
+        self.assertEqual(adapter.parse(b'"pong"', 0.0), ())
+
+class TestFeedAdapterConformance(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        self.rest_runner = None
+
+    async def asyncTearDown(self):
+        if self.rest_runner is not None:
+            await self.rest_runner.cleanup()
+
+    async def start_depth_snapshot_server(self):
+        async def depth(request):
+            return web.json_response(BINANCE_DEPTH_SNAPSHOT)
+        app = web.Application()
+        app.router.add_get("/api/v3/depth", depth)
+        self.rest_runner = web.AppRunner(app)
+        await self.rest_runner.setup()
+        site = web.TCPSite(self.rest_runner, "127.0.0.1", 0)
+        await site.start()
+        return f"http://127.0.0.1:{site._server.sockets[0].getsockname()[1]}"
+
+    def build_manager(self, exchange_id, url, rest_url=""):
+        return WebSocketManager({
+            "EXCHANGES": {exchange_id: {"api_key": "key", "secret": "secret"}},
+            "TRADING_CONFIG": {"trade_symbols": list(SYMBOLS)},
+            "PERFORMANCE_CONFIG": {
+                "websocket_urls": {exchange_id: url},
+                "binance_rest_url": rest_url,
+                "WEBSOCKET_CONFIG": {exchange_id: {"ping_interval": 0.05}},
+            },
+        })
+
+    async def wait_for(self, condition, timeout=3.0):
+        deadline = asyncio.get_running_loop().time() + timeout
+        while not condition():
+            if asyncio.get_running_loop().time() > deadline:
+                self.fail("Timed out waiting for the feed to reach the expected state")
+            await asyncio.sleep(0.01)
+
+    async def run_conformance(self, exchange_id):
+        adapter_class = FEED_ADAPTERS[exchange_id]
+        rest_url = await self.start_depth_snapshot_server() if adapter_class.snapshot_via_rest else ""
+        probe = adapter_class({}, {}, SYMBOLS)
+        expected_requests = len(probe.subscribe_messages(SYMBOLS, True, True))
+        async with RecordedFeedServer(RECORDED_FRAMES[exchange_id], expected_requests, RESYNC_FRAMES.get(exchange_id)) as server:
+            manager = self.build_manager(exchange_id, server.url, rest_url)
+            await manager.start()
+            try:
+                await self.wait_for(lambda: all(manager.get_market_data(exchange_id, symbol) for symbol in SYMBOLS))
+                btc = manager.get_market_data(exchange_id, "BTCUSDT")
+                eth = manager.get_market_data(exchange_id, "ETHUSDT")
+                self.assertIsInstance(btc, Tick)
+                self.assertEqual((btc.exchange, btc.symbol, btc.bid, btc.ask, btc.bid_qty, btc.ask_qty),
+                                 (exchange_id, "BTCUSDT", 100.5, 101.5, 2.0, 3.0))
+                self.assertEqual((eth.bid, eth.ask, eth.bid_qty, eth.ask_qty), (20.1, 20.2, 7.5, 1.25))
+                self.assertEqual(manager.update_counts[exchange_id], 2)
+
+                def book_at(best_bid):
+                    book = manager.get_order_book(exchange_id, "BTCUSDT")
+                    return book is not None and book.best_bid() == best_bid
+
+                if exchange_id in RESYNC_FRAMES:
+                    # The recorded stream ends with a sequence gap, which must end in a fresh snapshot
+                    await self.wait_for(lambda: book_at(100.75))
+                    book = manager.get_order_book(exchange_id, "BTCUSDT")
+                    self.assertEqual(book.top_bids(5), [(100.75, 4.0)])
+                    self.assertEqual(book.top_asks(5), [(101.25, 5.0)])
+                    self.assertEqual(manager.depth_resync_counts[exchange_id], 2)
+                else:
+                    await self.wait_for(lambda: book_at(100.5))
+                    book = manager.get_order_book(exchange_id, "BTCUSDT")
+                    self.assertEqual(book.top_bids(5), [(100.5, 2.0), (100.0, 1.0)])
+                    self.assertEqual(book.top_asks(5), [(101.5, 3.0)])
+
+                if probe.heartbeat_interval:
+                    heartbeat = probe.heartbeat_message()
+                    await self.wait_for(lambda: heartbeat in server.requests)
+                return manager, server
+            finally:
+                await manager.close()
+
+    async def test_binance(self):
+        manager, server = await self.run_conformance("binance")
+        self.assertTrue(server.paths[0].startswith("/stream?streams=btcusdt@bookTicker/ethusdt@bookTicker/btcusdt@depth@100ms"))
+        self.assertEqual(manager.depth_resync_counts["binance"], 1)
+
+    async def test_bybit(self):
+        _, server = await self.run_conformance("bybit")
+        self.assertEqual(server.requests[0]["args"], ["orderbook.1.BTCUSDT", "orderbook.1.ETHUSDT",
+                                                      "orderbook.50.BTCUSDT", "orderbook.50.ETHUSDT"])
+        self.assertIn({"op": "unsubscribe", "args": ["orderbook.50.BTCUSDT"]}, server.requests)
+
+    async def test_okx(self):
+        _, server = await self.run_conformance("okx")
+        self.assertIn({"channel": "books", "instId": "ETH-USDT"}, server.requests[0]["args"])
+
+    async def test_kraken(self):
+        _, server = await self.run_conformance("kraken")
+        self.assertEqual(server.requests[0]["params"]["symbol"], ["BTC/USDT", "ETH/USDT"])
+
+    def test_adapters_emit_only_normalized_records(self):
+        for exchange_id, adapter_class in FEED_ADAPTERS.items():
+            adapter = adapter_class({}, {}, SYMBOLS)
+            for frame in RECORDED_FRAMES[exchange_id]:
+                message = (frame if isinstance(frame, str) else json.dumps(frame)).encode()
+                for event in adapter.parse(message, 0.0):
+                    self.assertIsInstance(event, (Tick, BookSnapshot, BookDelta), exchange_id)
+                    self.assertEqual(event.exchange, exchange_id)
+                    self.assertIn(event.symbol, SYMBOLS)
+
+class TestRedundantFeeds(unittest.IsolatedAsyncioTestCase):
+    """feed_redundancy=2: the same recorded stream arrives on a primary and a standby connection."""
+
+    def build_manager(self, exchange_id, url, standby_url):
+        return WebSocketManager({
+            "EXCHANGES": {exchange_id: {"api_key": "key", "secret": "secret"}},
+            "TRADING_CONFIG": {"trade_symbols": list(SYMBOLS)},
+            "PERFORMANCE_CONFIG": {
+                "websocket_urls": {exchange_id: url},
+                "websocket_standby_urls": {exchange_id: standby_url},
+                "feed_redundancy": 2,
+                "feed_reconnect_backoff_initial": 0.05,
+            },
+        })
+
+    async def wait_for(self, condition, timeout=3.0):
+        deadline = asyncio.get_running_loop().time() + timeout
+        while not condition():
+            if asyncio.get_running_loop().time() > deadline:
+                self.fail("Timed out waiting for the feed to reach the expected state")
+            await asyncio.sleep(0.01)
+
+    async def test_first_copy_wins_and_standby_keeps_books_alive(self):
+        expected_requests = len(FEED_ADAPTERS["bybit"]({}, {}, SYMBOLS).subscribe_messages(SYMBOLS, True, True))
+        frames, resync = RECORDED_FRAMES["bybit"], RESYNC_FRAMES["bybit"]
+        async with RecordedFeedServer(frames, expected_requests, resync) as primary, \
+                RecordedFeedServer(frames, expected_requests, resync) as standby:
+            manager = self.build_manager("bybit", primary.url, standby.url)
+            await manager.start()
+            try:
+                def book_synced():
+                    book = manager.get_order_book("bybit", "BTCUSDT")
+                    return book is not None and book.best_bid() == 100.75
+
+                await self.wait_for(lambda: book_synced() and len(primary.paths) == len(standby.paths) == 1)
+                await self.wait_for(lambda: manager.duplicate_counts.get("bybit", 0) >= 2)
+                self.assertEqual(manager.update_counts["bybit"], 2)  # Each tick published once
+                # Primary goes away: the standby still carries the shard, so the books stay usable
+                primary.server.close()
+                await self.wait_for(lambda: len(manager._live_sources) == 1)
+                self.assertTrue(book_synced())
+            finally:
+                await manager.close()
+
+    def test_duplicate_tick_rules(self):
+        manager = self.build_manager("binance", "ws://unused/ws/", "ws://unused/ws/")
+        manager._live_sources.update({1, 2})
+
+        def tick(update_id, bid=100.0):
+            return Tick("binance", "BTCUSDT", bid, bid + 1, 1.0, 1.0, 0, update_id)
+
+        self.assertFalse(manager._is_duplicate_tick(tick(10), 1))
+        self.assertTrue(manager._is_duplicate_tick(tick(10), 2))  # Copy from the standby
+        self.assertFalse(manager._is_duplicate_tick(tick(11), 2))  # Standby got there first
+        self.assertTrue(manager._is_duplicate_tick(tick(11), 1))
+        self.assertFalse(manager._is_duplicate_tick(tick(3), 2))  # Same connection going back: venue reset
+        manager._live_sources.discard(2)
+        self.assertFalse(manager._is_duplicate_tick(tick(1), 1))  # Connection 2 is gone, 1 takes over
+        self.assertEqual(manager.duplicate_counts["binance"], 2)
+
+    def test_ticks_without_update_ids_fail_over_on_silence(self):
+        manager = self.build_manager("kraken", "ws://unused/", "ws://unused/")
+        manager._live_sources.update({1, 2})
+        failover = manager.feed_failover_ms / 1000
+
+        def tick(recv_ts):
+            return Tick("kraken", "BTCUSDT", 100.0, 101.0, 1.0, 1.0, 0, 0, recv_ts)
+
+        self.assertFalse(manager._is_duplicate_tick(tick(100.0), 1))
+        self.assertTrue(manager._is_duplicate_tick(tick(100.001), 2))  # Standby copy while the primary is delivering
+        self.assertFalse(manager._is_duplicate_tick(tick(100.5), 1))
+        # The primary stays connected but goes quiet: the standby takes the symbol over
+        self.assertFalse(manager._is_duplicate_tick(tick(100.5 + failover + 0.01), 2))
+        self.assertTrue(manager._is_duplicate_tick(tick(100.6 + failover), 1))  # Late primary copies are now the duplicates
+        self.assertEqual(manager.duplicate_counts["kraken"], 2)
+
+if __name__ == "__main__":
+    unittest.main()
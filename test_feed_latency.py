@@ -0,0 +1,55 @@
+"""
+Unit tests for the feed latency histograms kept by the monitoring system.
+"""
+
+import time
+import unittest
+
+from monitoring import FeedLatencyMonitor, LatencyHistogram
+
+class TestLatencyHistogram(unittest.TestCase):
+    def test_percentiles_of_known_samples(self):
+        histogram = LatencyHistogram()
+        self.assertEqual(histogram.percentile(50), 0.0)
+        for _ in range(90):
+            histogram.record(3.0)
+        for _ in range(10):
+            histogram.record(400.0)
+        self.assertEqual(histogram.percentile(50), 5)     # Upper bound of the (2.5, 5] bucket
+        self.assertEqual(histogram.percentile(90), 5)
+        self.assertEqual(histogram.percentile(99), 400.0) # (250, 500] bucket, capped at the largest sample
+        self.assertEqual(histogram.to_dict(), {"count": 100, "avg_ms": 42.7, "p50_ms": 5, "p99_ms": 400.0, "max_ms": 400.0})
+
+    def test_values_past_the_last_bound_land_in_the_overflow_bucket(self):
+        histogram = LatencyHistogram()
+        histogram.record(0.05)
+        histogram.record(60000.0)
+        self.assertEqual(histogram.percentile(50), 0.1)
+        self.assertEqual(histogram.percentile(99), 60000.0)
+
+class TestFeedLatencyMonitor(unittest.TestCase):
+    def test_inter_arrival_and_stale_feeds(self):
+        monitor = FeedLatencyMonitor()
+        now = time.monotonic()
+        monitor.record_tick("binance", "BTCUSDT", now - 0.002)
+        monitor.record_tick("binance", "BTCUSDT", now)
+        monitor.record_tick("bybit", "BTCUSDT", now - 10.0)
+        self.assertEqual(monitor.inter_arrival[("binance", "BTCUSDT")].count, 1)
+        self.assertAlmostEqual(monitor.inter_arrival[("binance", "BTCUSDT")].percentile(50), 2.0, places=6)  # Only sample caps its bucket
+        self.assertNotIn(("bybit", "BTCUSDT"), monitor.inter_arrival)
+        self.assertEqual([(feed["exchange"], feed["symbol"]) for feed in monitor.get_stale_feeds(5000)], [("bybit", "BTCUSDT")])
+
+    def test_lag_from_ticks_and_direct_samples_share_a_histogram(self):
+        monitor = FeedLatencyMonitor()
+        monitor.record_tick("okx", "BTCUSDT", time.monotonic(), time.time() * 1000 - 40)
+        monitor.record_lag("okx", "BTCUSDT", 3.0)
+        monitor.record_lag("okx", "BTCUSDT", -5.0)  # Clock skew
+        histogram = monitor.feed_lag[("okx", "BTCUSDT")]
+        self.assertEqual(histogram.count, 3)
+        self.assertEqual(histogram.counts[0], 1)
+        self.assertEqual(monitor.get_feed_metrics()["okx"]["BTCUSDT"]["feed_lag"]["count"], 3)
+        monitor.record_lag("kraken", "ETHUSDT", 1.0)  # Lag without ticks (book events only)
+        self.assertEqual(monitor.feed_lag[("kraken", "ETHUSDT")].count, 1)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,68 @@
+"""
+Unit tests for the pluggable feed JSON decoder and the records the adapters decode into.
+"""
+
+import json
+import sys
+import unittest
+from unittest.mock import patch
+
+from feed_adapters import BinanceFeedAdapter, OkxFeedAdapter
+from market_data import JSON_DECODERS, BookDelta, Tick, get_json_decoder
+
+BINANCE_DEPTH = {"stream": "btcusdt@depth@100ms", "data": {"e": "depthUpdate", "E": 1700000000100, "s": "BTCUSDT", "U": 101, "u": 102,
+                                                          "b": [["100.50", "2.0"]], "a": [["101.00", "0.0"], ["101.50", "3.0"]]}}
+OKX_BBO = {"arg": {"channel": "bbo-tbt", "instId": "BTC-USDT"},
+           "data": [{"asks": [["101.50", "3.0", "0", "2"]], "bids": [["100.50", "2.0", "0", "1"]], "ts": "1700000000100", "seqId": 120}]}
+
+def installed_decoders():
+    """Every decoder that imports here, stdlib included."""
+    decoders = {}
+    for name, loader in JSON_DECODERS.items():
+        try:
+            decoders[name] = loader()
+        except ImportError:
+            pass
+    return decoders
+
+class TestJsonDecoder(unittest.TestCase):
+    def test_falls_back_to_stdlib_without_fast_libraries(self):
+        with patch.dict(sys.modules, {"orjson": None, "msgspec": None}):  # None in sys.modules makes the import fail
+            self.assertIs(get_json_decoder("auto"), json.loads)
+            with self.assertLogs("market_data", "WARNING") as logs:
+                self.assertIs(get_json_decoder("orjson"), json.loads)
+            self.assertIn("not installed", logs.output[0])
+
+    def test_unknown_decoder_falls_back_to_stdlib(self):
+        with self.assertLogs("market_data", "WARNING"):
+            self.assertIs(get_json_decoder("yaml"), json.loads)
+
+    def test_every_decoder_reads_bytes_and_str(self):
+        frame = json.dumps(OKX_BBO)
+        for name, loads in installed_decoders().items():
+            self.assertEqual(loads(frame.encode()), OKX_BBO, name)
+            self.assertEqual(loads(frame), OKX_BBO, name)
+
+class TestDecodedRecords(unittest.TestCase):
+    def test_records_match_the_dict_path(self):
+        depth, bbo = BINANCE_DEPTH["data"], OKX_BBO["data"][0]
+        expected_delta = BookDelta("binance", "BTCUSDT", depth["b"], depth["a"], depth["U"], depth["u"], depth["E"])
+        expected_tick = Tick("okx", "BTCUSDT", float(bbo["bids"][0][0]), float(bbo["asks"][0][0]), float(bbo["bids"][0][1]),
+                             float(bbo["asks"][0][1]), int(bbo["ts"]), bbo["seqId"], 5.0)
+        for name, loads in installed_decoders().items():
+            binance = BinanceFeedAdapter({}, {}, ["BTCUSDT"], loads)
+            okx = OkxFeedAdapter({}, {}, ["BTCUSDT"], loads)
+            (delta,) = binance.parse(json.dumps(BINANCE_DEPTH).encode(), 5.0)
+            (tick,) = okx.parse(json.dumps(OKX_BBO).encode(), 5.0)
+            self.assertEqual(delta, expected_delta, name)
+            self.assertEqual(tick, expected_tick, name)
+            self.assertIsNone(tick.raw)  # Raw payloads are only kept with feed_retain_raw
+            self.assertFalse(hasattr(tick, "__dict__"))
+
+    def test_retain_raw_keeps_the_decoded_payload(self):
+        okx = OkxFeedAdapter({}, {"feed_retain_raw": True}, ["BTCUSDT"])
+        (tick,) = okx.parse(json.dumps(OKX_BBO).encode(), 5.0)
+        self.assertEqual(tick.raw, OKX_BBO)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,97 @@
+"""
+Unit tests for the binary market-data journal.
+"""
+
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+import numpy as np
+
+import market_journal
+from market_data import BookDelta, BookSnapshot, Tick
+from market_journal import (FLAG_EVENT_END, JOURNAL_DTYPE, RECORD_BOOK_DELTA, RECORD_BOOK_SNAPSHOT, RECORD_TICK,
+                            MarketJournal, iter_journal, journal_files, read_journal)
+
+DAY_1_NS = 1700000000 * 10**9  # 2023-11-14 UTC
+DAY_2_NS = DAY_1_NS + 86400 * 10**9
+
+class TestMarketJournal(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.directory = self.tmp.name
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def write(self, events, chunk_records=4, clock=DAY_1_NS):
+        journal = MarketJournal(self.directory, chunk_records=chunk_records)
+        journal.start()
+        with mock.patch.object(market_journal.time, "time_ns", return_value=clock):
+            for event in events:
+                journal.record(event)
+        journal.close()
+        return journal
+
+    def test_ticks_and_book_events_round_trip(self):
+        events = [
+            Tick("binance", "BTCUSDT", 100.5, 101.5, 2.0, 3.0, 1700000000100, 7),
+            BookSnapshot("binance", "BTCUSDT", [["100", "1"], ["99", "2"]], [["101", "1"]], 100),
+            BookDelta("binance", "BTCUSDT", [["100.5", "2"]], [["101", "0"], ["101.5", "3"]], 101, 102, 1700000000200, 50),
+        ]
+        journal = self.write(events)
+        self.assertEqual(journal.get_stats()["recorded"], 3)
+
+        records = read_journal(os.path.join(self.directory, "binance-20231114.journal"))
+        self.assertIsInstance(records, np.memmap)  # zero-copy view of the file
+        self.assertEqual(records.dtype, JOURNAL_DTYPE)
+        self.assertEqual(records["kind"].tolist(), [RECORD_TICK, RECORD_BOOK_SNAPSHOT, RECORD_BOOK_SNAPSHOT,
+                                                    RECORD_BOOK_DELTA, RECORD_BOOK_DELTA])
+        self.assertEqual(records["flags"].tolist(), [FLAG_EVENT_END, 0, FLAG_EVENT_END, 0, FLAG_EVENT_END])
+        self.assertEqual(records[0]["symbol"], b"BTCUSDT")
+        self.assertEqual((records[0]["bid"], records[0]["ask"], records[0]["update_id"]), (100.5, 101.5, 7))
+        self.assertEqual(records["bid"][1:3].tolist(), [100.0, 99.0])
+        self.assertTrue(np.isnan(records["ask"][2]))  # snapshot had one ask level for two bid levels
+        self.assertEqual((records[3]["first_update_id"], records[3]["update_id"], records[3]["max_depth"]), (101, 102, 50))
+        self.assertEqual(records["ask_qty"][3:5].tolist(), [0.0, 3.0])  # zero quantity (level removal) is kept
+
+    def test_files_rotate_per_exchange_and_day_and_grow_past_a_chunk(self):
+        ticks = [Tick("binance", "BTCUSDT", 100.0 + i, 101.0 + i) for i in range(10)]
+        self.write(ticks + [Tick("bybit", "ETHUSDT", 20.0, 20.1)], chunk_records=4)
+        self.write([Tick("binance", "BTCUSDT", 200.0, 201.0)], clock=DAY_2_NS)
+
+        names = [os.path.basename(path) for path in journal_files(self.directory)]
+        self.assertEqual(names, ["binance-20231114.journal", "bybit-20231114.journal", "binance-20231115.journal"])
+        day_one = os.path.join(self.directory, "binance-20231114.journal")
+        self.assertEqual(read_journal(day_one)["bid"].tolist(), [100.0 + i for i in range(10)])
+        self.assertEqual([len(batch) for batch in iter_journal(day_one, batch_size=4)], [4, 4, 2])
+
+    def test_reopening_a_journal_appends(self):
+        self.write([Tick("binance", "BTCUSDT", 1.0, 2.0)])
+        self.write([Tick("binance", "BTCUSDT", 3.0, 4.0)])
+        records = read_journal(os.path.join(self.directory, "binance-20231114.journal"))
+        self.assertEqual(records["bid"].tolist(), [1.0, 3.0])
+
+    def test_full_queue_drops_instead_of_blocking(self):
+        journal = MarketJournal(self.directory, queue_size=2)
+        for _ in range(5):
+            journal.record(Tick("binance", "BTCUSDT", 1.0, 2.0))  # writer not started, nothing drains
+        self.assertEqual(journal.dropped, 3)
+        journal.start()
+        journal.close()
+        self.assertEqual(journal.recorded, 2)
+
+    def test_symbols_longer_than_the_field_are_rejected(self):
+        long_symbol = "1000000MOGUSDT-SWAP"  # 19 bytes, would be cut to a different name
+        with self.assertLogs("market_journal", "ERROR") as logs:
+            journal = self.write([Tick("okx", long_symbol, 1.0, 2.0), Tick("okx", "BTCUSDT", 3.0, 4.0),
+                                  BookDelta("okx", long_symbol, [["1", "1"]], [], 1, 1)])
+        self.assertEqual(len(logs.output), 1)  # Logged once per symbol
+        self.assertEqual((journal.recorded, journal.rejected), (1, 2))
+        self.assertEqual(read_journal(os.path.join(self.directory, "okx-20231114.journal"))["symbol"].tolist(), [b"BTCUSDT"])
+        journal = self.write([Tick("okx", "A" * 16, 1.0, 2.0)])  # Exactly the field width fits
+        self.assertEqual(journal.rejected, 0)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,81 @@
+"""
+Unit tests for the bounded top-K opportunity queue, checked against a dict-and-sort model.
+"""
+
+import random
+import unittest
+
+from exchange_manager import ArbitrageOpportunity
+from opportunity_queue import OpportunityQueue
+
+def opportunity(symbol, score, buy="binance", sell="bybit"):
+    return ArbitrageOpportunity(symbol, buy, sell, 100.0, 100.5, 0.5, 0.5, 1.0, 0.0, score=score)
+
+class TestOpportunityQueue(unittest.TestCase):
+    def test_pops_best_first_and_replaces_in_place(self):
+        queue = OpportunityQueue(capacity=10, ttl=5.0)
+        for symbol, score in (("BTCUSDT", 50.0), ("ETHUSDT", 70.0), ("SOLUSDT", 60.0)):
+            queue.push(opportunity(symbol, score), now=0.0)
+        queue.push(opportunity("BTCUSDT", 80.0), now=1.0)  # Same route, new score
+        self.assertEqual(len(queue), 3)
+        self.assertEqual([queue.pop(now=2.0).symbol for _ in range(3)], ["BTCUSDT", "ETHUSDT", "SOLUSDT"])
+        self.assertIsNone(queue.pop(now=2.0))
+
+    def test_capacity_evicts_the_worst(self):
+        queue = OpportunityQueue(capacity=2, ttl=5.0)
+        self.assertTrue(queue.push(opportunity("A", 10.0), now=0.0))
+        self.assertTrue(queue.push(opportunity("B", 30.0), now=0.0))
+        self.assertFalse(queue.push(opportunity("C", 5.0), now=0.0))
+        self.assertTrue(queue.push(opportunity("D", 20.0), now=0.0))
+        self.assertEqual([entry.symbol for entry in queue.snapshot(now=0.0)], ["B", "D"])
+        self.assertEqual(queue.get_stats()["evicted"], 1)
+
+    def test_expired_entries_are_skipped(self):
+        queue = OpportunityQueue(capacity=10, ttl=1.0)
+        queue.push(opportunity("A", 90.0), now=0.0)
+        queue.push(opportunity("B", 10.0), now=0.8)
+        self.assertEqual(queue.pop(now=1.5).symbol, "B")
+        self.assertEqual(queue.get_stats()["expired"], 1)
+        queue.push(opportunity("C", 10.0), now=2.0)
+        self.assertTrue(queue.remove(opportunity("C", 0.0).route_key))
+        self.assertIsNone(queue.pop(now=2.0))
+
+    def test_matches_reference_model(self):
+        rng = random.Random(23)
+        queue = OpportunityQueue(capacity=8, ttl=3.0)
+        model = {}  # {symbol: (score, expires_at)}
+        now = 0.0
+        for step in range(5000):
+            now += rng.uniform(0, 0.3)
+            action = rng.random()
+            if action < 0.6:
+                symbol, score = f"S{rng.randrange(20)}", rng.uniform(0, 100)
+                model = {key: value for key, value in model.items() if value[1] > now}
+                full = symbol not in model and len(model) >= 8
+                accepted = queue.push(opportunity(symbol, score), now=now)
+                if full:
+                    worst = min(model, key=lambda key: model[key][0])
+                    self.assertEqual(accepted, score > model[worst][0], f"step {step}")
+                    if accepted:
+                        del model[worst]
+                if accepted:
+                    model[symbol] = (score, now + 3.0)
+            elif action < 0.9:
+                live = {key: value for key, value in model.items() if value[1] > now}
+                popped = queue.pop(now=now)
+                if not live:
+                    self.assertIsNone(popped)
+                    continue
+                best = max(live, key=lambda key: live[key][0])
+                self.assertEqual(popped.symbol, best, f"step {step}")
+                del model[best]
+            else:
+                symbol = f"S{rng.randrange(20)}"
+                queue.remove(opportunity(symbol, 0.0).route_key)
+                model.pop(symbol, None)
+            self.assertEqual([entry.symbol for entry in queue.snapshot(now=now)],
+                             sorted((key for key, value in model.items() if value[1] > now), key=lambda key: -model[key][0]))
+            self.assertLessEqual(len(queue._best) + len(queue._worst), 4 * queue.capacity + 34)  # Stale heap entries are compacted
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,47 @@
+"""
+Unit tests for route lifecycle tracking and change-only emission.
+"""
+
+import unittest
+
+from exchange_manager import ArbitrageOpportunity
+from opportunity_tracker import OpportunityTracker
+
+def opportunity(profit_pct=0.5, quantity=1.0, symbol="BTCUSDT", buy="binance", sell="bybit", legs=()):
+    return ArbitrageOpportunity(symbol, buy, sell, 100.0, 100.6, profit_pct, profit_pct, quantity, 0.0,
+                                route="cross_quote" if legs else "direct", legs=legs)
+
+class TestOpportunityTracker(unittest.TestCase):
+    def test_persistent_route_is_emitted_once(self):
+        tracker = OpportunityTracker(min_change_pct=0.05, min_quantity_change=0.25)
+        self.assertTrue(tracker.observe(opportunity(0.50), now=10.0))
+        self.assertFalse(tracker.observe(opportunity(0.52), now=10.5))
+        self.assertFalse(tracker.observe(opportunity(0.47, quantity=1.2), now=11.0))
+        later = opportunity(0.49)
+        self.assertFalse(tracker.observe(later, now=12.0))
+        self.assertEqual((later.first_seen, later.last_seen, later.peak_profit_pct), (10.0, 12.0, 0.52))
+        self.assertEqual(later.persistence_seconds, 2.0)
+        self.assertTrue(tracker.observe(opportunity(0.60), now=12.5))  # Profit moved materially
+        self.assertFalse(tracker.observe(opportunity(0.62), now=13.0))  # Compared with the last emission, 0.60
+        self.assertTrue(tracker.observe(opportunity(0.62, quantity=2.0), now=13.5))  # Book depth changed materially
+        self.assertEqual(tracker.get_stats()["suppressed"], 4)
+
+    def test_sweep_closes_routes_missing_from_their_symbols_scan(self):
+        tracker = OpportunityTracker()
+        direct = opportunity()
+        other = opportunity(symbol="ETHUSDT")
+        legs = (("BTCUSDC", "binance", "buy"), ("BTCUSDT", "bybit", "sell"), ("USDCUSDT", "bybit", "buy"))
+        cross = opportunity(symbol="BTCUSDC", legs=legs)
+        for route in (direct, other, cross):
+            tracker.observe(route, now=1.0)
+        self.assertEqual(tracker.sweep(["USDCUSDT"], [], now=3.0)[0].route_id, cross.route_id)  # A conversion leg counts
+        self.assertEqual(tracker.sweep(["BTCUSDT"], [direct.route_key], now=3.0), [])
+        closed, = tracker.sweep(["BTCUSDT"], [], now=4.0)
+        self.assertEqual(closed.route_id, "BTCUSDT:binance>bybit")
+        self.assertEqual(closed.persistence_seconds, 3.0)
+        self.assertEqual(list(tracker.active), [other.route_key])
+        self.assertTrue(tracker.observe(opportunity(), now=5.0))  # Reopened routes are new again
+        self.assertEqual(tracker.get_stats()["closed"], 2)
+
+if __name__ == "__main__":
+    unittest.main()
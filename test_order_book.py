@@ -0,0 +1,58 @@
+"""
+Unit tests for the locally maintained L2 order book.
+"""
+
+import unittest
+
+from order_book import LocalOrderBook
+
+class TestLocalOrderBook(unittest.TestCase):
+    def setUp(self):
+        self.book = LocalOrderBook("binance", "BTCUSDT")
+        self.book.apply_snapshot(
+            bids=[["100", "1"], ["99", "2"], ["98", "3"]],
+            asks=[["101", "1"], ["102", "2"]],
+            last_update_id=100,
+        )
+
+    def test_top_views_are_sorted_best_first(self):
+        self.assertEqual(self.book.top_bids(2), [(100.0, 1.0), (99.0, 2.0)])
+        self.assertEqual(self.book.top_asks(5), [(101.0, 1.0), (102.0, 2.0)])
+        self.assertEqual(self.book.best_bid(), 100.0)
+        self.assertEqual(self.book.best_ask(), 101.0)
+
+    def test_diff_bridging_snapshot_is_applied(self):
+        self.assertTrue(self.book.apply_diff(95, 99, [["97", "5"]], []))  # covered by snapshot, ignored
+        self.assertNotIn(97.0, self.book.bids)
+        self.assertTrue(self.book.apply_diff(99, 101, [["100.5", "4"]], [["101", "0"]]))
+        self.assertEqual(self.book.top_bids(1), [(100.5, 4.0)])
+        self.assertEqual(self.book.best_ask(), 102.0)
+        self.assertEqual(self.book.last_update_id, 101)
+
+    def test_gap_invalidates_book(self):
+        self.assertTrue(self.book.apply_diff(101, 105, [], []))
+        self.assertFalse(self.book.apply_diff(107, 110, [["100", "9"]], []))
+        self.assertFalse(self.book.synced)
+        self.assertEqual(self.book.bids[100.0], 1.0)
+
+    def test_first_diff_must_straddle_snapshot(self):
+        self.assertFalse(self.book.apply_diff(102, 103, [], []))
+        self.assertFalse(self.book.synced)
+
+    def test_views_are_cached_per_version(self):
+        view = self.book.top_bids(3)
+        self.assertIs(view, self.book.top_bids(3))
+        self.book.apply_diff(101, 101, [["98", "0"]], [])
+        self.assertIsNot(view, self.book.top_bids(3))
+        self.assertEqual(self.book.top_bids(3), [(100.0, 1.0), (99.0, 2.0)])
+
+    def test_depth_arrays_are_cached_per_version(self):
+        depth = self.book.depth("asks", 5)
+        self.assertIs(depth, self.book.depth("asks", 5))
+        self.assertEqual(depth.cum_quantity.tolist(), [1.0, 3.0])
+        self.assertEqual(depth.cum_notional.tolist(), [101.0, 305.0])
+        self.book.apply_diff(101, 101, [], [["101", "2"]])
+        self.assertEqual(self.book.depth("asks", 5).cum_quantity.tolist(), [2.0, 4.0])
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,209 @@
+"""
+Unit tests for the streaming volatility and quote history kept in MarketStats, and for PriceMonitor's
+evaluation of feed updates.
+"""
+
+import asyncio
+import math
+import random
+import time
+import unittest
+from unittest.mock import MagicMock
+
+from market_data import Tick
+from order_book import LocalOrderBook
+from price_monitor import MarketStats, PriceMonitor, StreamingVolatility
+
+class TestStreamingVolatility(unittest.TestCase):
+    def test_matches_decayed_sum_of_squared_returns(self):
+        rng = random.Random(20)
+        tracker = StreamingVolatility(window=60.0)
+        prices, times = [100.0], [0.0]
+        tracker.update(prices[0], times[0])
+        self.assertIsNone(tracker.value(0.0))
+        for _ in range(500):
+            times.append(times[-1] + rng.expovariate(2.0))
+            prices.append(prices[-1] * math.exp(rng.gauss(0, 0.001)))
+            tracker.update(prices[-1], times[-1])
+        now = times[-1] + 5.0
+        expected = sum(math.log(prices[i] / prices[i - 1]) ** 2 * math.exp(-(now - times[i]) / 60.0) for i in range(1, len(prices)))
+        self.assertAlmostEqual(tracker.value(now), math.sqrt(expected), places=12)
+
+    def test_quiet_market_decays_towards_zero(self):
+        tracker = StreamingVolatility(window=10.0)
+        tracker.update(100.0, 0.0)
+        tracker.update(101.0, 1.0)
+        self.assertAlmostEqual(tracker.value(1.0), math.log(1.01))
+        self.assertLess(tracker.value(201.0), 1e-5)
+        tracker.update(101.0, 0.5)  # Out-of-order timestamps neither decay nor rewind the clock
+        self.assertAlmostEqual(tracker.value(1.0), math.log(1.01))
+
+    def test_market_stats_tracks_each_exchange(self):
+        stats = MarketStats("BTCUSDT", volatility_window=300.0)
+        self.assertIsNone(stats.get_price_volatility("binance"))
+        stats.add_price_data("binance", 99.0, 101.0, 0.0)
+        stats.add_price_data("binance", 101.0, 103.0, 1.0)
+        stats.add_price_data("bybit", 100.0, 100.0, 1.0)
+        self.assertAlmostEqual(stats.get_price_volatility("binance", now=1.0), math.log(1.02))
+        self.assertIsNone(stats.get_price_volatility("bybit", now=1.0))
+        self.assertEqual(stats.exchanges, ["binance", "bybit"])
+        self.assertEqual(stats.get_price_window("binance", 0.5, now=1.0).mid.tolist(), [102.0])
+        self.assertIsNone(stats.get_price_window("okx", 60))
+
+class StubExchangeManager:
+    def __init__(self, exchange_ids):
+        self.exchanges_config = {exchange_id: {} for exchange_id in exchange_ids}
+        self.exchanges = {}
+        self.fees = {}
+
+    def get_exchange_trading_fee(self, exchange_id):
+        return self.fees.get(exchange_id, 0.001)
+
+class StubFeed:
+    """Latest ticks and local books per (exchange, symbol), read the way PriceMonitor reads WebSocketManager."""
+
+    def __init__(self):
+        self.ticks = {}
+        self.books = {}
+        self.listeners = []
+
+    def subscribe(self, listener):
+        self.listeners.append(listener)
+
+    def publish(self, exchange_id, symbol, bid, ask, recv_ts=None):
+        self.ticks[(exchange_id, symbol)] = Tick(exchange_id, symbol, bid, ask, 1.0, 1.0,
+                                                 recv_ts=time.monotonic() if recv_ts is None else recv_ts)
+        book = self.books[(exchange_id, symbol)] = LocalOrderBook(exchange_id, symbol)
+        book.apply_snapshot([(bid, 1.0)], [(ask, 1.0)], 1)
+        for listener in self.listeners:
+            listener(exchange_id, symbol)
+
+    def get_market_data(self, exchange_id, symbol):
+        return self.ticks.get((exchange_id, symbol))
+
+    def get_exchange_market_data(self, exchange_id):
+        return {symbol: tick for (exchange, symbol), tick in self.ticks.items() if exchange == exchange_id}
+
+    def get_order_book(self, exchange_id, symbol):
+        return self.books.get((exchange_id, symbol))
+
+def make_monitor(exchange_ids=("binance", "bybit", "okx"), **performance_config):
+    feed = StubFeed()
+    monitor = PriceMonitor(StubExchangeManager(exchange_ids), MagicMock(),
+                           dict({"cross_quote_routes_enabled": False}, **performance_config))
+    monitor.set_websocket_manager(feed)
+    return monitor, feed
+
+class TestEventDrivenEvaluation(unittest.TestCase):
+    def test_updates_evaluate_only_their_symbol_once(self):
+        monitor, feed = make_monitor()
+        evaluated = []
+        evaluate = monitor._evaluate_symbols
+        monitor._evaluate_symbols = lambda symbols, **kwargs: (evaluated.append(list(symbols)), evaluate(symbols, **kwargs))
+
+        async def run():
+            task = asyncio.create_task(monitor.start_monitoring())
+            await asyncio.sleep(0.01)
+            self.assertEqual(evaluated, [])  # No polling without updates
+            feed.publish("binance", "BTCUSDT", 99.0, 100.0)
+            await asyncio.sleep(0.01)
+            for bid in (100.0, 101.0, 102.0):  # Back to back, before the scanner runs
+                feed.publish("bybit", "ETHUSDT", bid, bid + 1)
+                feed.publish("okx", "ETHUSDT", bid, bid + 1)
+            await asyncio.sleep(0.01)
+            task.cancel()
+
+        asyncio.run(run())
+        self.assertTrue(monitor.subscribed_to_feed)
+        self.assertEqual(evaluated, [["BTCUSDT"], ["ETHUSDT"]])
+        self.assertEqual(monitor.pending_updates.conflated, 4)
+        self.assertEqual(monitor.tickers["okx"]["ETHUSDT"]["bid"], 102.0)  # Evaluated against the latest quote
+
+    def test_updates_dropped_by_a_full_queue_are_still_evaluated(self):
+        monitor, feed = make_monitor(scan_max_pending_updates=1)
+        evaluated = []
+        evaluate = monitor._evaluate_symbols
+        monitor._evaluate_symbols = lambda symbols, **kwargs: (evaluated.append(list(symbols)), evaluate(symbols, **kwargs))
+
+        async def run():
+            task = asyncio.create_task(monitor.start_monitoring())
+            await asyncio.sleep(0.01)
+            feed.publish("binance", "BTCUSDT", 99.0, 100.0)
+            feed.publish("binance", "ETHUSDT", 9.9, 10.0)  # Queue full: dropped, and ETHUSDT never ticks again
+            await asyncio.sleep(0.01)
+            task.cancel()
+
+        asyncio.run(run())
+        self.assertEqual(monitor.pending_updates.dropped, 1)
+        self.assertEqual(len(evaluated), 1)
+        self.assertIn("ETHUSDT", evaluated[0])
+        self.assertEqual(monitor.tickers["binance"]["ETHUSDT"]["bid"], 9.9)
+
+class TestStaleQuoteExclusion(unittest.TestCase):
+    def test_quote_older_than_max_age_is_dropped_everywhere(self):
+        monitor, feed = make_monitor(max_quote_age_ms=500)
+        feed.publish("binance", "BTCUSDT", 99.0, 100.0)
+        feed.publish("bybit", "BTCUSDT", 101.0, 102.0)
+        monitor._evaluate_symbols(["BTCUSDT"])
+        self.assertEqual(len(monitor.opportunities["BTCUSDT"]), 1)
+
+        feed.publish("bybit", "BTCUSDT", 101.0, 102.0, recv_ts=time.monotonic() - 1.0)  # Connection stalled a second ago
+        monitor._evaluate_symbols(["BTCUSDT"])
+        self.assertNotIn("BTCUSDT", monitor.tickers["bybit"])
+        self.assertIn("BTCUSDT", monitor.tickers["binance"])
+        self.assertEqual(list(monitor.consolidated_book.get("BTCUSDT").quotes), ["binance"])
+        matrix = monitor.spread_matrix
+        self.assertTrue(math.isnan(matrix.bids[matrix.symbol_index["BTCUSDT"], matrix.exchange_index["bybit"]]))
+        self.assertEqual(monitor.spread_matrix.scan(0.0, monitor.spread_matrix.rows(["BTCUSDT"])), [])
+        self.assertEqual(monitor.opportunities["BTCUSDT"], [])
+        self.assertEqual(monitor.stale_quotes_skipped, 1)
+
+class TestFeeRefresh(unittest.TestCase):
+    def test_fee_change_reprices_triangular_cycles(self):
+        monitor, feed = make_monitor(("binance",), triangular_enabled=True)
+        markets = [{"id": symbol, "symbol": f"{base}/{quote}", "base": base, "quote": quote}
+                   for symbol, base, quote in (("BTCUSDT", "BTC", "USDT"), ("ETHUSDT", "ETH", "USDT"), ("ETHBTC", "ETH", "BTC"))]
+        monitor.triangular.min_profit = 0.0
+        monitor.triangular.load_markets("binance", markets, fee=0.001)
+        for symbol, price in (("BTCUSDT", 50000.0), ("ETHUSDT", 3000.0), ("ETHBTC", 0.0601)):
+            monitor.triangular.on_quote("binance", symbol, price, price)
+        self.assertEqual(monitor.triangular.get_opportunities(), [])  # 0.17% gross does not cover three 0.1% fees
+
+        monitor.exchange_manager.fees["binance"] = 0.0
+        monitor._refresh_fees()
+        self.assertEqual(monitor.triangular.graphs["binance"].fee, 0.0)
+        self.assertEqual(len(monitor.triangular.get_opportunities()), 1)
+
+        monitor.exchange_manager.fees["binance"] = 0.002
+        monitor._refresh_fees()
+        self.assertEqual(monitor.triangular.get_opportunities(), [])
+
+class TestShardScanConsumer(unittest.TestCase):
+    def test_batch_naming_a_removed_ticker_is_skipped(self):
+        monitor, feed = make_monitor()
+        feed.publish("binance", "BTCUSDT", 99.0, 100.0)
+        feed.publish("bybit", "BTCUSDT", 101.0, 102.0)
+        feed.publish("okx", "BTCUSDT", 101.5, 102.5)
+        feed.publish("binance", "ETHUSDT", 9.9, 10.0)
+        feed.publish("bybit", "ETHUSDT", 10.2, 10.3)
+        monitor._evaluate_symbols(["BTCUSDT", "ETHUSDT"])
+        monitor.tickers["okx"].pop("BTCUSDT")  # Invalidated after the worker scanned it
+
+        batches = [(["BTCUSDT"], [("BTCUSDT", "binance", "okx", 1.2), ("BTCUSDT", "binance", "bybit", 0.8)]),
+                   (["ETHUSDT"], [("ETHUSDT", "binance", "bybit", 1.8)])]
+        monitor.sharded_scanner = MagicMock()
+        monitor.sharded_scanner.drain.side_effect = [batches] + [[]] * 1000
+
+        async def run():
+            task = asyncio.create_task(monitor._consume_shard_scans())
+            while monitor.sharded_scanner.drain.call_count < 2:
+                await asyncio.sleep(0.001)
+            monitor.sharded_scanner = None
+            await task
+
+        asyncio.run(run())
+        self.assertEqual(sorted(opportunity.route_id for opportunity in monitor.get_arbitrage_opportunities()),
+                         sorted(["BTCUSDT:binance>bybit", "ETHUSDT:binance>bybit"]))
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,111 @@
+"""
+Unit tests for the quote store and the conflating queue between the feed and the scanner.
+"""
+
+import asyncio
+import unittest
+
+from quote_store import ConflatingQueue, QuoteStore
+
+class TestQuoteStore(unittest.TestCase):
+    def test_versions_count_writes_per_exchange(self):
+        store = QuoteStore()
+        self.assertEqual(store.version("binance"), 0)
+        store.update("binance", "BTCUSDT", 1)
+        store.update("binance", "ETHUSDT", 2)
+        store.update("binance", "BTCUSDT", 3)
+        store.update("bybit", "BTCUSDT", 4)
+        self.assertEqual(store.version("binance"), 3)
+        self.assertEqual(store.version("bybit"), 1)
+        self.assertEqual(sorted(store.exchanges()), ["binance", "bybit"])
+        self.assertIsNone(store.get("okx", "BTCUSDT"))
+        self.assertIsNone(store.get("bybit", "ETHUSDT"))
+
+    def test_get_exchange_returns_a_detached_snapshot(self):
+        store = QuoteStore()
+        self.assertEqual(store.get_exchange("binance"), {})
+        store.update("binance", "BTCUSDT", 1)
+        store.update("binance", "ETHUSDT", 2)
+        snapshot = store.get_exchange("binance")
+        self.assertEqual(snapshot, {"BTCUSDT": 1, "ETHUSDT": 2})
+        store.update("binance", "BTCUSDT", 3)
+        store.update("binance", "SOLUSDT", 4)
+        self.assertEqual(snapshot, {"BTCUSDT": 1, "ETHUSDT": 2})  # Later writes do not leak into a held snapshot
+        snapshot["BTCUSDT"] = 0
+        self.assertEqual(store.get("binance", "BTCUSDT"), 3)
+
+    def test_listeners_see_the_written_quote_in_registration_order(self):
+        store = QuoteStore()
+        calls = []
+
+        def failing(exchange_id, symbol):
+            calls.append("failing")
+            raise RuntimeError("boom")
+
+        store.add_listener(lambda exchange_id, symbol: calls.append(("first", store.get(exchange_id, symbol), store.version(exchange_id))))
+        store.add_listener(failing)
+        store.add_listener(lambda exchange_id, symbol: calls.append(("last", exchange_id, symbol)))
+        with self.assertLogs("quote_store", "ERROR"):
+            store.update("binance", "BTCUSDT", 7)  # A failing listener does not stop the others
+        self.assertEqual(calls, [("first", 7, 1), "failing", ("last", "binance", "BTCUSDT")])
+        store.remove_listener(failing)
+        store.remove_listener(failing)  # Removing twice is harmless
+        calls.clear()
+        store.update("binance", "BTCUSDT", 8)
+        self.assertEqual(calls, [("first", 8, 2), ("last", "binance", "BTCUSDT")])
+
+class TestConflatingQueue(unittest.TestCase):
+    def test_repeated_updates_collapse_into_one_key(self):
+        queue = ConflatingQueue()
+        for _ in range(1000):
+            queue.put("binance", "BTCUSDT")
+            queue.put("bybit", "BTCUSDT")
+        queue.put("binance", "ETHUSDT")
+        self.assertEqual(len(queue), 3)
+        self.assertEqual(queue.drain(), [("binance", "BTCUSDT"), ("bybit", "BTCUSDT"), ("binance", "ETHUSDT")])
+        stats = queue.get_stats()
+        self.assertEqual(stats["received"], 2001)
+        self.assertEqual(stats["conflated"], 1998)
+        self.assertEqual(stats["dropped"], 0)
+        self.assertEqual(stats["pending"], 0)
+
+    def test_full_queue_drops_new_keys(self):
+        queue = ConflatingQueue(max_pending=2)
+        queue.put("binance", "BTCUSDT")
+        queue.put("binance", "ETHUSDT")
+        queue.put("binance", "SOLUSDT")
+        queue.put("binance", "BTCUSDT")  # Already pending, conflated rather than dropped
+        self.assertEqual(queue.dropped, 1)
+        self.assertEqual(queue.conflated, 1)
+        self.assertEqual(queue.drain(), [("binance", "BTCUSDT"), ("binance", "ETHUSDT")])
+        self.assertTrue(queue.take_overflow())  # The consumer has to rescan to pick up SOLUSDT
+        self.assertFalse(queue.take_overflow())
+        queue.put("binance", "SOLUSDT")
+        self.assertEqual(queue.drain(), [("binance", "SOLUSDT")])
+        self.assertFalse(queue.take_overflow())
+
+    def test_partial_drain_keeps_order_and_readiness(self):
+        async def run():
+            queue = ConflatingQueue()
+            for symbol in ("A", "B", "C"):
+                queue.put("binance", symbol)
+            await asyncio.wait_for(queue.wait(), 1)
+            self.assertEqual(queue.drain(2), [("binance", "A"), ("binance", "B")])
+            await asyncio.wait_for(queue.wait(), 1)  # Still ready, C is pending
+            self.assertEqual(queue.drain(2), [("binance", "C")])
+            with self.assertRaises(asyncio.TimeoutError):
+                await asyncio.wait_for(queue.wait(), 0.01)
+
+        asyncio.run(run())
+
+    def test_store_listener_feeds_the_queue(self):
+        store = QuoteStore()
+        queue = ConflatingQueue()
+        store.add_listener(queue.put)
+        for price in range(10):
+            store.update("binance", "BTCUSDT", price)
+        self.assertEqual(queue.drain(), [("binance", "BTCUSDT")])
+        self.assertEqual(store.get("binance", "BTCUSDT"), 9)  # The consumer reads the latest value
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,90 @@
+"""
+Unit tests for replaying recorded market data journals through the feed pipeline.
+"""
+
+import asyncio
+import tempfile
+import time
+import unittest
+from unittest import mock
+
+import market_journal
+from market_data import BookDelta, BookSnapshot, Tick
+from market_journal import MarketJournal
+from replay_feed import ReplayFeedManager, parse_replay_speed
+
+BASE_NS = 1700000000 * 10**9
+
+class TestParseReplaySpeed(unittest.TestCase):
+    def test_values(self):
+        self.assertEqual(parse_replay_speed("max"), 0.0)
+        self.assertEqual(parse_replay_speed("1"), 1.0)
+        self.assertEqual(parse_replay_speed("10x"), 10.0)
+        self.assertEqual(parse_replay_speed(2.5), 2.5)
+        with self.assertRaises(ValueError):
+            parse_replay_speed("-1")
+
+class TestReplayFeedManager(unittest.IsolatedAsyncioTestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        # (offset_ns, event), recorded out of exchange order to check the merge by receive time
+        recorded = [
+            (0, BookSnapshot("binance", "BTCUSDT", [["100", "1"]], [["101", "1"]], 100)),
+            (1_000_000, Tick("binance", "BTCUSDT", 100.0, 101.0, 1.0, 1.0, 0, 1)),
+            (3_000_000, BookDelta("binance", "BTCUSDT", [["100.5", "2"]], [["101", "0"], ["101.5", "3"]], 101, 102)),
+            (4_000_000, Tick("binance", "BTCUSDT", 100.5, 101.5, 2.0, 3.0, 0, 2)),
+            (2_000_000, Tick("bybit", "BTCUSDT", 100.2, 101.2, 1.0, 1.0, 0, 7)),
+            (50_000_000, Tick("bybit", "BTCUSDT", 100.3, 101.3, 1.0, 1.0, 0, 8)),
+        ]
+        journal = MarketJournal(self.tmp.name)
+        journal.start()
+        for offset_ns, event in recorded:
+            with mock.patch.object(market_journal.time, "time_ns", return_value=BASE_NS + offset_ns):
+                journal.record(event)
+        journal.close()
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def build_manager(self, speed, **performance_config):
+        return ReplayFeedManager({
+            "EXCHANGES": {},
+            "TRADING_CONFIG": {"trade_symbols": ["BTCUSDT"]},
+            "PERFORMANCE_CONFIG": dict(performance_config, replay_dir=self.tmp.name, replay_speed=speed),
+        })
+
+    async def test_max_speed_replays_through_the_live_handlers_in_receive_order(self):
+        manager = self.build_manager("max")
+        seen = []
+        manager.subscribe(lambda exchange_id, symbol: seen.append((exchange_id, manager.get_market_data(exchange_id, symbol).update_id)))
+        await manager.start()
+        await asyncio.wait_for(manager.replay_complete.wait(), timeout=5)
+        await manager.close()
+
+        self.assertEqual(seen, [("binance", 1), ("bybit", 7), ("binance", 2), ("bybit", 8)])
+        self.assertEqual(manager.replayed_events, 6)
+        tick = manager.get_market_data("binance", "BTCUSDT")
+        self.assertEqual((tick.bid, tick.ask), (100.5, 101.5))
+        self.assertLess(time.monotonic() - tick.recv_ts, 5)  # restamped on the replay clock
+        book = manager.get_order_book("binance", "BTCUSDT")
+        self.assertEqual(book.top_bids(5), [(100.5, 2.0), (100.0, 1.0)])
+        self.assertEqual(book.top_asks(5), [(101.5, 3.0)])
+
+    async def test_paced_replay_keeps_recorded_gaps_scaled_by_speed(self):
+        manager = self.build_manager("1")  # 50ms recorded span
+        start = time.perf_counter()
+        await manager.start()
+        await asyncio.wait_for(manager.replay_complete.wait(), timeout=5)
+        self.assertGreaterEqual(time.perf_counter() - start, 0.045)
+        await manager.close()
+
+    async def test_exchange_filter(self):
+        manager = self.build_manager("max", replay_exchanges=["bybit"])
+        await manager.start()
+        await asyncio.wait_for(manager.replay_complete.wait(), timeout=5)
+        await manager.close()
+        self.assertEqual(manager.replayed_events, 2)
+        self.assertIsNone(manager.get_market_data("binance", "BTCUSDT"))
+
+if __name__ == "__main__":
+    unittest.main()
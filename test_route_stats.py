@@ -0,0 +1,76 @@
+"""
+Unit tests for decayed per-route execution statistics and their persistence.
+"""
+
+import asyncio
+import os
+import tempfile
+import unittest
+
+from route_stats import RouteStatsStore
+
+class TestRouteStatsStore(unittest.TestCase):
+    def test_counts_decay_with_half_life(self):
+        store = RouteStatsStore(half_life=100.0)
+        store.record("BTCUSDT:binance>bybit", True, 0.5, 0.25, latency_ms=100.0, slippage_pct=0.1, now=0.0)
+        stats = store.record("BTCUSDT:binance>bybit", False, latency_ms=300.0, now=100.0)
+        self.assertAlmostEqual(stats.attempts, 1.5)
+        self.assertAlmostEqual(stats.fills, 0.5)
+        self.assertAlmostEqual(stats.fill_rate, 1 / 3)
+        self.assertAlmostEqual(stats.latency_ms, 100.0 + 200.0 / 1.5)  # The recent trade weighs twice as much
+        self.assertAlmostEqual(stats.realized_ratio, 0.5)
+        self.assertEqual(stats.trades, 2)
+
+    def test_score_blends_history_with_prior(self):
+        store = RouteStatsStore(half_life=100.0, prior_score=80.0, prior_weight=2.0)
+        self.assertEqual(store.success_score("unknown"), 80.0)
+        for step in range(2):
+            store.record("good", True, 0.5, 0.5, now=float(step))
+            store.record("bad", False, now=float(step))
+        self.assertGreater(store.success_score("good", now=1.0), 80.0)
+        self.assertLess(store.success_score("bad", now=1.0), 50.0)
+        self.assertAlmostEqual(store.success_score("bad", now=1e6), 80.0, places=3)  # Old history fades to the prior
+
+    def test_failing_route_is_blocked_until_history_decays(self):
+        store = RouteStatsStore(half_life=100.0, min_attempts=3, min_fill_rate=0.2)
+        for _ in range(2):
+            store.record("ETHUSDT:okx>kraken", False, now=0.0)
+        self.assertFalse(store.is_blocked("ETHUSDT:okx>kraken", now=0.0))  # Not enough evidence yet
+        store.record("ETHUSDT:okx>kraken", False, now=0.0)
+        self.assertTrue(store.is_blocked("ETHUSDT:okx>kraken", now=0.0))
+        self.assertFalse(store.is_blocked("ETHUSDT:okx>kraken", now=200.0))
+
+    def test_save_and_load_round_trip(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "route_stats.json")
+            store = RouteStatsStore(path=path)
+            store.record("BTCUSDT:binance>bybit", True, 0.4, 0.3, latency_ms=50.0, now=10.0)
+            store.save()
+            restored = RouteStatsStore(path=path)
+            self.assertEqual(restored.load(), 1)
+            self.assertEqual(restored.get("BTCUSDT:binance>bybit"), store.get("BTCUSDT:binance>bybit"))
+            self.assertFalse(os.path.exists(f"{path}.tmp"))
+            self.assertEqual(RouteStatsStore(path=os.path.join(directory, "missing.json")).load(), 0)
+
+    def test_record_never_writes_and_periodic_save_does(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "route_stats.json")
+            store = RouteStatsStore(path=path, save_interval=0.01)
+            store.record("BTCUSDT:binance>bybit", True, 0.4, 0.3, now=10.0)
+            self.assertFalse(os.path.exists(path))  # Recording stays off the file system
+
+            async def run():
+                task = asyncio.create_task(store.run_periodic_save())
+                while not os.path.exists(path):
+                    await asyncio.sleep(0.01)
+                store.record("BTCUSDT:binance>bybit", False, now=20.0)
+                task.cancel()
+                await store.save_async()  # Final flush on shutdown
+
+            asyncio.run(asyncio.wait_for(run(), 5))
+            restored = RouteStatsStore(path=path)
+            self.assertEqual(restored.load(), 1)
+            self.assertEqual(restored.get("BTCUSDT:binance>bybit").trades, 2)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,78 @@
+"""
+Unit tests for sharded route scanning over the shared quote table, checked against a single SpreadMatrix.
+"""
+
+import random
+import time
+import unittest
+
+import numpy as np
+
+from shared_quote_table import SharedQuoteTable
+from sharded_scanner import ShardedScanner, ShardScan
+from spread_matrix import SpreadMatrix
+
+EXCHANGES = ["binance", "bybit", "okx"]
+FEES = {"binance": 0.001, "bybit": 0.001, "okx": 0.0008}
+
+def random_quotes(rng, symbols):
+    quotes = {}
+    for symbol in symbols:
+        mid = rng.uniform(1, 1000)
+        for exchange in EXCHANGES:
+            price = mid * rng.uniform(0.99, 1.01)
+            quotes[(exchange, symbol)] = (price * 0.9999, price * 1.0001)
+    return quotes
+
+class TestShardScan(unittest.TestCase):
+    def test_shards_report_what_one_matrix_finds(self):
+        rng = random.Random(25)
+        symbols = [f"SYM{i}USDT" for i in range(30)]
+        table = SharedQuoteTable(EXCHANGES, symbols)
+        try:
+            shards = [ShardScan(table, symbols[i::3]) for i in range(3)]
+            fees = np.array([FEES[exchange] for exchange in EXCHANGES])
+            reference = SpreadMatrix(symbols, EXCHANGES, FEES)
+            for (exchange, symbol), (bid, ask) in random_quotes(rng, symbols).items():
+                table.write(exchange, symbol, bid, ask)
+                reference.update(exchange, symbol, bid, ask)
+            table.write("okx", "SYM4USDT", 0.0, 0.0)  # Cleared quote
+            reference.clear("okx", "SYM4USDT")
+            found, scanned = [], []
+            for shard in shards:
+                symbols_scanned, routes = shard.poll(0.001, fees)
+                scanned += symbols_scanned
+                found += routes
+                self.assertIsNone(shard.poll(0.001, fees))  # Nothing written since
+            self.assertEqual(sorted(scanned), sorted(symbols))
+            self.assertEqual(sorted(found), sorted(reference.scan(0.001)))
+            table.write("bybit", "SYM7USDT", 1.0, 1.0001)
+            symbols_scanned, _ = shards[7 % 3].poll(0.001, fees)
+            self.assertEqual(symbols_scanned, ["SYM7USDT"])
+        finally:
+            table.close()
+
+class TestShardedScanner(unittest.TestCase):
+    def test_worker_processes_report_routes(self):
+        symbols = [f"SYM{i}USDT" for i in range(8)]
+        scanner = ShardedScanner(EXCHANGES, symbols, processes=2, min_profit=0.001, poll_interval=0.001)
+        scanner.start(FEES)
+        try:
+            scanner.publish("binance", "SYM3USDT", 99.9, 100.0)
+            scanner.publish("bybit", "SYM3USDT", 101.0, 101.1)
+            scanner.publish("okx", "SYM6USDT", 50.0, 50.01)
+            routes, deadline = [], time.time() + 30
+            while not routes and time.time() < deadline:
+                for _, batch_routes in scanner.drain():
+                    routes += batch_routes
+                time.sleep(0.01)
+            self.assertEqual(len(routes), 1)
+            symbol, buy_exchange, sell_exchange, profit_pct = routes[0]
+            self.assertEqual((symbol, buy_exchange, sell_exchange), ("SYM3USDT", "binance", "bybit"))
+            self.assertAlmostEqual(profit_pct, (101.0 * 0.999 - 100.0 * 1.001) / (100.0 * 1.001) * 100)
+            self.assertEqual(scanner.get_stats()["workers"], 2)
+        finally:
+            scanner.close()
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,72 @@
+"""
+Unit tests for the vectorized spread scan, checked against the route-by-route calculation.
+"""
+
+import random
+import unittest
+
+import numpy as np
+
+from spread_matrix import SpreadMatrix
+
+FEES = {"binance": 0.001, "bybit": 0.001, "okx": 0.0008, "kraken": 0.0026}
+
+def brute_force(quotes, fees, min_profit):
+    routes = {}
+    for (symbol, buy_exchange), (_, ask) in quotes.items():
+        for (other_symbol, sell_exchange), (bid, _) in quotes.items():
+            if other_symbol != symbol or sell_exchange == buy_exchange:
+                continue
+            effective_buy = ask * (1 + fees[buy_exchange])
+            effective_sell = bid * (1 - fees[sell_exchange])
+            profit = (effective_sell - effective_buy) / effective_buy
+            if profit > min_profit:
+                routes[(symbol, buy_exchange, sell_exchange)] = profit * 100
+    return routes
+
+class TestSpreadMatrix(unittest.TestCase):
+    def test_matches_route_by_route_scan(self):
+        rng = random.Random(7)
+        symbols = [f"SYM{i}USDT" for i in range(40)]
+        matrix = SpreadMatrix(symbols, list(FEES), FEES)
+        quotes = {}
+        for symbol in symbols:
+            mid = rng.uniform(1, 1000)
+            for exchange in FEES:
+                if rng.random() < 0.1:
+                    continue  # No quote from this venue
+                bid = mid * (1 + rng.gauss(0, 0.003))
+                quotes[(symbol, exchange)] = (bid, bid * 1.0002)
+                matrix.update(exchange, symbol, *quotes[(symbol, exchange)])
+        expected = brute_force(quotes, FEES, 0.001)
+        found = {route[:3]: route[3] for route in matrix.scan(0.001)}
+        self.assertGreater(len(expected), 0)
+        self.assertEqual(set(found), set(expected))
+        for route, profit_pct in expected.items():
+            self.assertAlmostEqual(found[route], profit_pct, places=9)
+
+    def test_row_subset_and_cleared_quotes(self):
+        matrix = SpreadMatrix(["BTCUSDT", "ETHUSDT"], ["binance", "bybit"], {"binance": 0.001, "bybit": 0.001})
+        matrix.update("binance", "BTCUSDT", 99.0, 100.0)
+        matrix.update("bybit", "BTCUSDT", 101.0, 102.0)
+        matrix.update("binance", "ETHUSDT", 9.9, 10.0)
+        matrix.update("bybit", "ETHUSDT", 10.1, 10.2)
+        routes = matrix.scan(0.001, matrix.rows(["ETHUSDT", "SOLUSDT"]))  # Untracked symbols are ignored
+        self.assertEqual([route[:3] for route in routes], [("ETHUSDT", "binance", "bybit")])
+        matrix.clear("bybit", "BTCUSDT")
+        self.assertEqual([route[:3] for route in matrix.scan(0.001)], [("ETHUSDT", "binance", "bybit")])
+        self.assertFalse(matrix.update("kraken", "BTCUSDT", 1.0, 2.0))
+        matrix.update("bybit", "ETHUSDT", 0.0, 10.2)  # Invalid quotes are treated as missing
+        self.assertEqual(matrix.scan(0.0), [])
+
+    def test_fee_change_reprices_existing_quotes(self):
+        matrix = SpreadMatrix(["BTCUSDT"], ["binance", "bybit"], {"binance": 0.0, "bybit": 0.0})
+        matrix.update("binance", "BTCUSDT", 99.0, 100.0)
+        matrix.update("bybit", "BTCUSDT", 100.5, 101.0)
+        self.assertEqual(len(matrix.scan(0.004)), 1)
+        matrix.set_fees({"binance": 0.001})
+        self.assertEqual(matrix.scan(0.004), [])
+        self.assertTrue(np.isclose(matrix.effective_asks[0, 0], 100.1))
+
+if __name__ == "__main__":
+    unittest.main()
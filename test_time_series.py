@@ -0,0 +1,62 @@
+"""
+Unit tests for the columnar quote ring buffer, checked against a plain list of samples.
+"""
+
+import random
+import unittest
+
+import numpy as np
+
+from time_series import QuoteSeries
+
+class TestQuoteSeries(unittest.TestCase):
+    def test_windows_match_reference_across_wraparound(self):
+        rng = random.Random(21)
+        series = QuoteSeries(capacity=50)
+        samples = []
+        timestamp = 0.0
+        for step in range(400):
+            timestamp += rng.choice([0.0, 0.5, 1.0, 2.5])
+            bid = 100 + rng.gauss(0, 1)
+            ask = bid + rng.uniform(0.01, 0.1)
+            series.append(timestamp, bid, ask)
+            samples.append((timestamp, bid, ask))
+            held = samples[-50:]
+            self.assertEqual(len(series), len(held))
+            self.assertEqual(series.latest().timestamp.tolist(), [sample[0] for sample in held], f"step {step}")
+            self.assertEqual(series.latest(7).ask.tolist(), [sample[2] for sample in held[-7:]])
+            start, end = timestamp - rng.uniform(0, 40), timestamp - rng.uniform(0, 5)
+            window = series.window(start, end)
+            self.assertEqual(window.bid.tolist(), [sample[1] for sample in held if start <= sample[0] <= end])
+        last = series.last()
+        self.assertEqual((last["timestamp"], last["bid"], last["ask"]), samples[-1])
+        self.assertAlmostEqual(last["mid"], (samples[-1][1] + samples[-1][2]) / 2)
+
+    def test_windows_are_views(self):
+        series = QuoteSeries(capacity=4)
+        for i in range(6):
+            series.append(float(i), 100.0 + i, 101.0 + i)
+        window = series.window(3.0)
+        self.assertTrue(np.shares_memory(window.mid, series.data))
+        self.assertEqual(window.spread.tolist(), [1.0, 1.0, 1.0])
+        self.assertEqual(len(series.window(10.0)), 0)
+        self.assertEqual(len(series.window(4.0, 3.0)), 0)
+
+    def test_late_samples_keep_timestamps_sorted(self):
+        series = QuoteSeries(capacity=8)
+        series.append(10.0, 1.0, 1.0)
+        series.append(9.0, 2.0, 2.0)
+        self.assertEqual(series.latest().timestamp.tolist(), [10.0, 10.0])
+        self.assertEqual(series.window(10.0).bid.tolist(), [1.0, 2.0])
+
+    def test_chart_export(self):
+        series = QuoteSeries(capacity=100)
+        for i in range(100):
+            series.append(float(i), 100.0, 100.0)
+        chart = series.latest().to_dict(max_points=10)
+        self.assertLessEqual(len(chart["timestamp"]), 10)
+        self.assertEqual(chart["timestamp"][-1], 99.0)  # The latest sample is always kept
+        self.assertEqual(chart["timestamp"], sorted(chart["timestamp"]))
+
+if __name__ == "__main__":
+    unittest.main()
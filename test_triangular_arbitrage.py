@@ -0,0 +1,101 @@
+"""
+Unit tests for the incremental triangular arbitrage detector.
+"""
+
+import itertools
+import math
+import random
+import unittest
+
+from triangular_arbitrage import TriangularArbitrageDetector
+
+def market(base, quote):
+    return {"id": base + quote, "symbol": f"{base}/{quote}", "base": base, "quote": quote, "spot": True, "active": True}
+
+MARKETS = {m["symbol"]: m for m in [market("BTC", "USDT"), market("ETH", "USDT"), market("ETH", "BTC"),
+                                    market("SOL", "USDT"), market("SOL", "BTC"), market("SOL", "ETH")]}
+
+def brute_force(quotes, fee, min_profit, max_length=3):
+    """Profit of every simple cycle, walking the quotes directly."""
+    rates = {}
+    for symbol, (bid, ask) in quotes.items():
+        m = next(m for m in MARKETS.values() if m["id"] == symbol)
+        rates[(m["quote"], m["base"])] = (1 - fee) / ask
+        rates[(m["base"], m["quote"])] = bid * (1 - fee)
+    currencies = sorted({currency for pair in rates for currency in pair})
+    found = {}
+    for length in range(3, max_length + 1):
+        for cycle in itertools.permutations(currencies, length):
+            if cycle[0] != min(cycle):
+                continue  # One rotation per cycle
+            hops = list(zip(cycle, cycle[1:] + cycle[:1]))
+            if all(hop in rates for hop in hops):
+                profit = math.prod(rates[hop] for hop in hops) - 1
+                if profit > min_profit:
+                    found[frozenset(hops)] = profit * 100
+    return found
+
+def detected(detector):
+    found = {}
+    for opportunity in detector.get_opportunities("binance"):
+        hops = frozenset(zip(opportunity.path, opportunity.path[1:]))
+        found[hops] = opportunity.profit_pct
+    return found
+
+class TestTriangularArbitrage(unittest.TestCase):
+    def test_cycle_enumeration(self):
+        detector = TriangularArbitrageDetector(max_cycle_length=3)
+        self.assertEqual(detector.load_markets("binance", MARKETS), 8)  # 4 triangles, both directions
+        detector = TriangularArbitrageDetector(max_cycle_length=4)
+        self.assertEqual(detector.load_markets("binance", MARKETS), 14)  # Plus 3 quadrangles, both directions
+        detector = TriangularArbitrageDetector()
+        self.assertEqual(detector.load_markets("binance", MARKETS, symbols=["BTCUSDT", "ETHUSDT", "ETHBTC"]), 2)
+
+    def test_detects_cycle_from_usdt(self):
+        detector = TriangularArbitrageDetector(min_profit=0.001)
+        detector.load_markets("binance", MARKETS, fee=0.001)
+        self.assertEqual(detector.on_quote("binance", "BTCUSDT", 50000.0, 50001.0), [])
+        self.assertEqual(detector.on_quote("binance", "ETHUSDT", 3000.0, 3000.5), [])
+        opportunity, = detector.on_quote("binance", "ETHBTC", 0.0612, 0.06121)
+        self.assertEqual(opportunity.path, ("USDT", "ETH", "BTC", "USDT"))
+        self.assertEqual(opportunity.legs, (("ETHUSDT", "buy"), ("ETHBTC", "sell"), ("BTCUSDT", "sell")))
+        expected = (1 / 3000.5) * 0.0612 * 50000.0 * 0.999 ** 3 - 1
+        self.assertAlmostEqual(opportunity.profit_pct, expected * 100)
+        self.assertEqual(detector.on_quote("binance", "ETHBTC", 0.0612, 0.06121), [])  # Already reported
+        detector.clear("binance", "BTCUSDT")
+        self.assertEqual(detector.get_opportunities(), [])
+
+    def test_incremental_matches_brute_force(self):
+        rng = random.Random(11)
+        detector = TriangularArbitrageDetector(min_profit=0.0005, max_cycle_length=4)
+        detector.load_markets("binance", MARKETS, fee=0.00075)
+        prices = {"BTCUSDT": 50000.0, "ETHUSDT": 3000.0, "ETHBTC": 0.06, "SOLUSDT": 100.0, "SOLBTC": 0.002, "SOLETH": 1 / 30}
+        quotes = {}
+        hits = 0
+        for step in range(3000):
+            symbol = rng.choice(list(prices))
+            bid = prices[symbol] * (1 + rng.gauss(0, 0.003))
+            quotes[symbol] = (bid, bid * 1.0002)
+            detector.on_quote("binance", symbol, *quotes[symbol])
+            expected = brute_force(quotes, 0.00075, 0.0005, 4)
+            found = detected(detector)
+            self.assertEqual(set(found), set(expected), f"step {step}")
+            for hops, profit_pct in expected.items():
+                self.assertAlmostEqual(found[hops], profit_pct, places=8)
+            hits += bool(expected)
+        self.assertGreater(hits, 100)
+
+    def test_fee_change_shifts_weights(self):
+        detector = TriangularArbitrageDetector(min_profit=0.0)
+        detector.load_markets("binance", MARKETS, fee=0.0)
+        for symbol, bid in (("BTCUSDT", 50000.0), ("ETHUSDT", 3000.0)):
+            detector.on_quote("binance", symbol, bid, bid)
+        self.assertEqual(len(detector.on_quote("binance", "ETHBTC", 0.0601, 0.0601)), 1)
+        self.assertEqual(detector.set_fee("binance", 0.001), [])
+        self.assertEqual(detector.get_opportunities(), [])  # Closed by the fee change itself, before the next quote
+        self.assertEqual(detector.on_quote("binance", "ETHBTC", 0.0601, 0.0601), [])
+        self.assertEqual(len(detector.set_fee("binance", 0.0)), 1)
+        self.assertEqual(len(detector.get_opportunities()), 1)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,154 @@
+"""
+Tests for the user-data streams: parsing of recorded private frames, balance book
+seeding, and a WebSocketManager running a Bybit private stream against a local server.
+"""
+
+import asyncio
+import json
+import unittest
+
+import websockets
+
+from user_data import (ORDER_CLOSED, ORDER_OPEN, BalanceBook, BalanceUpdate, BinanceUserDataAdapter,
+                       BybitUserDataAdapter, OrderUpdate)
+from websocket_manager import WebSocketManager
+
+BINANCE_FRAMES = [
+    {"e": "executionReport", "E": 1700000000100, "s": "BTCUSDT", "c": "arb-1", "S": "BUY", "o": "LIMIT", "q": "0.50000000",
+     "p": "100.00000000", "x": "TRADE", "X": "PARTIALLY_FILLED", "i": 4293153, "l": "0.20000000", "z": "0.20000000",
+     "L": "100.00000000", "n": "0.00020000", "N": "BTC", "Z": "20.00000000", "C": ""},
+    {"e": "executionReport", "E": 1700000000150, "s": "BTCUSDT", "c": "arb-1", "S": "BUY", "o": "LIMIT", "q": "0.50000000",
+     "p": "100.00000000", "x": "TRADE", "X": "FILLED", "i": 4293153, "l": "0.30000000", "z": "0.50000000",
+     "L": "99.00000000", "n": "0.00030000", "N": "BTC", "Z": "49.70000000", "C": ""},
+    {"e": "outboundAccountPosition", "E": 1700000000151, "u": 1700000000150,
+     "B": [{"a": "BTC", "f": "0.50000000", "l": "0.00000000"}, {"a": "USDT", "f": "950.30000000", "l": "0.00000000"}]},
+    {"e": "balanceUpdate", "E": 1700000000200, "a": "USDT", "d": "100.00000000", "T": 1700000000199},
+]
+
+BYBIT_FRAMES = [
+    {"success": True, "ret_msg": "", "op": "auth", "conn_id": "cejreassvfrsfvb9v1a0-2m"},
+    {"success": True, "ret_msg": "", "op": "subscribe", "conn_id": "cejreassvfrsfvb9v1a0-2m"},
+    {"id": "5923240c6880ab-c59f-420b-9adb-3639adc9dd90", "topic": "order", "creationTime": 1700000000300,
+     "data": [{"symbol": "ETHUSDT", "orderId": "1321052653536515584", "orderLinkId": "arb-2", "side": "Sell",
+               "orderType": "Limit", "price": "2000", "qty": "1.5", "orderStatus": "Filled", "avgPrice": "2000.5",
+               "cumExecQty": "1.5", "cumExecValue": "3000.75", "cumExecFee": "3.00075", "feeCurrency": "USDT",
+               "updatedTime": "1700000000299", "category": "spot"}]},
+    {"id": "592324d2bce751-ad38-48eb-8f42-4671d1fb4d4e", "topic": "wallet", "creationTime": 1700000000301,
+     "data": [{"accountType": "UNIFIED", "coin": [{"coin": "ETH", "walletBalance": "0.5", "locked": "0.1"},
+                                                  {"coin": "USDT", "walletBalance": "3997.74925", "locked": "0"}]}]},
+]
+
+class TestUserDataParsing(unittest.TestCase):
+    def test_binance_execution_reports_accumulate_fees(self):
+        adapter = BinanceUserDataAdapter({}, {})
+        partial, = adapter.parse(json.dumps(BINANCE_FRAMES[0]))
+        self.assertIsInstance(partial, OrderUpdate)
+        self.assertEqual((partial.order_id, partial.side, partial.status, partial.filled, partial.average),
+                         ("4293153", "buy", ORDER_OPEN, 0.2, 100.0))
+        filled, = adapter.parse(json.dumps(BINANCE_FRAMES[1]))
+        self.assertEqual(filled.status, ORDER_CLOSED)
+        self.assertTrue(filled.is_final)
+        self.assertAlmostEqual(filled.average, 99.4)
+        self.assertAlmostEqual(filled.fee, 0.0005)
+        self.assertEqual(adapter._fees, {})
+        order = filled.to_order_dict()
+        self.assertEqual((order["id"], order["status"], order["price"], order["fee"]["currency"]), ("4293153", "closed", 100.0, "BTC"))
+
+    def test_binance_account_position_and_expiry(self):
+        adapter = BinanceUserDataAdapter({}, {})
+        balance, = adapter.parse(json.dumps(BINANCE_FRAMES[2]))
+        self.assertEqual(list(balance.balances), [("BTC", 0.5, 0.0), ("USDT", 950.3, 0.0)])
+        self.assertEqual(adapter.parse(json.dumps(BINANCE_FRAMES[3])), ())
+        with self.assertRaises(ConnectionError):
+            adapter.parse(json.dumps({"e": "listenKeyExpired", "E": 1700000000400, "listenKey": "abc"}))
+
+    def test_bybit_topics(self):
+        adapter = BybitUserDataAdapter({"api_key": "key", "secret": "secret"}, {})
+        auth, subscribe = adapter.login_messages()
+        self.assertEqual(auth["op"], "auth")
+        self.assertEqual(len(auth["args"][2]), 64)
+        self.assertEqual(subscribe, {"op": "subscribe", "args": ["order", "wallet"]})
+        self.assertEqual(adapter.parse(json.dumps(BYBIT_FRAMES[0])), ())
+        order, = adapter.parse(json.dumps(BYBIT_FRAMES[2]))
+        self.assertEqual((order.symbol, order.side, order.status, order.filled, order.average, order.fee),
+                         ("ETHUSDT", "sell", ORDER_CLOSED, 1.5, 2000.5, 3.00075))
+        balance, = adapter.parse(json.dumps(BYBIT_FRAMES[3]))
+        self.assertEqual(list(balance.balances), [("ETH", 0.4, 0.1), ("USDT", 3997.74925, 0.0)])
+        with self.assertRaises(ConnectionError):
+            adapter.parse(json.dumps({"success": False, "ret_msg": "Params Error", "op": "auth"}))
+
+class TestBalanceBook(unittest.TestCase):
+    def test_reads_need_a_seeded_stream(self):
+        book = BalanceBook()
+        book.apply(BalanceUpdate("binance", [("USDT", 10.0, 0.0)]))
+        self.assertIsNone(book.get_free("binance", "USDT"))
+        book.seed("binance", {"free": {"USDT": 5.0, "BTC": 1.0}, "used": {"BTC": 0.5}}, requested_at=0)
+        self.assertEqual(book.get_free("binance", "USDT"), 10.0)  # Pushed after the snapshot was requested
+        self.assertEqual(book.get_free("binance", "BTC"), 1.0)
+        self.assertEqual(book.get_free("binance", "ETH"), 0.0)
+        self.assertEqual(book.get_exchange("binance")["total"]["BTC"], 1.5)
+        book.set_live("binance", False)
+        self.assertIsNone(book.get_free("binance", "BTC"))
+
+    def test_snapshot_requested_after_a_push_wins(self):
+        book = BalanceBook()
+        book.apply(BalanceUpdate("bybit", [("USDT", 10.0, 0.0)]))
+        book.seed("bybit", {"free": {"USDT": 7.0}, "used": {}}, requested_at=book.sequence)
+        self.assertEqual(book.get_free("bybit", "USDT"), 7.0)
+
+class FakeBalanceSource:
+    def __init__(self, snapshot):
+        self.snapshot = snapshot
+        self.requests = 0
+
+    async def fetch_balance_snapshot(self, exchange_id):
+        self.requests += 1
+        return self.snapshot
+
+class TestUserDataStream(unittest.IsolatedAsyncioTestCase):
+    async def test_bybit_private_stream(self):
+        requests = []
+
+        async def handler(connection):
+            for _ in range(2):  # auth, subscribe
+                requests.append(json.loads(await connection.recv()))
+            for frame in BYBIT_FRAMES:
+                await connection.send(json.dumps(frame))
+            async for message in connection:
+                requests.append(json.loads(message))
+
+        server = await websockets.serve(handler, "127.0.0.1", 0)
+        url = f"ws://127.0.0.1:{server.sockets[0].getsockname()[1]}/v5/private"
+        manager = WebSocketManager({
+            "EXCHANGES": {"bybit": {"api_key": "key", "secret": "secret"}},
+            "TRADING_CONFIG": {"trade_symbols": []},  # No market data, only the private stream
+            "PERFORMANCE_CONFIG": {"user_data_enabled": True, "user_data_urls": {"bybit": url}},
+        })
+        manager.balance_source = FakeBalanceSource({"free": {"BTC": 2.0, "USDT": 1.0}, "used": {}})
+        received = []
+        manager.subscribe_orders(received.append)
+        await manager.start()
+        try:
+            for _ in range(300):
+                if manager.balance_book.is_live("bybit") and manager.user_data_counts.get("bybit") == 2:
+                    break
+                await asyncio.sleep(0.01)
+            update = await manager.wait_for_order_update("bybit", "1321052653536515584", timeout=3.0)
+            self.assertIsNotNone(update)
+            self.assertEqual(update.status, ORDER_CLOSED)
+            self.assertEqual(received, [update])
+            self.assertTrue(manager.is_user_data_live("bybit"))
+            self.assertEqual(manager.balance_source.requests, 1)
+            self.assertEqual(manager.balance_book.get_free("bybit", "BTC"), 2.0)
+            self.assertEqual(manager.balance_book.get_free("bybit", "USDT"), 3997.74925)
+            self.assertEqual(requests[0]["op"], "auth")
+            self.assertEqual(requests[1]["args"], ["order", "wallet"])
+        finally:
+            await manager.close()
+            server.close()
+            await server.wait_closed()
+        self.assertFalse(manager.is_user_data_live("bybit"))
+        self.assertFalse(manager.balance_book.is_live("bybit"))
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,70 @@
+"""
+Unit tests for WebSocketManager's feed plumbing: symbol sharding and the shared quote table drained from
+feed worker processes.
+"""
+
+import asyncio
+import unittest
+
+from market_data import Tick
+from shared_quote_table import SharedQuoteTable
+from websocket_manager import WebSocketManager
+
+EXCHANGES = ["binance", "bybit"]
+SYMBOLS = [f"SYM{i}USDT" for i in range(7)]
+
+def build_manager(**performance_config):
+    return WebSocketManager({
+        "EXCHANGES": {exchange_id: {"api_key": "key", "secret": "secret"} for exchange_id in EXCHANGES},
+        "TRADING_CONFIG": {"trade_symbols": list(SYMBOLS)},
+        "PERFORMANCE_CONFIG": dict(performance_config),
+    })
+
+class TestShardSymbols(unittest.TestCase):
+    def assert_partition(self, shards):
+        flattened = [symbol for shard in shards for symbol in shard]
+        self.assertEqual(sorted(flattened), sorted(SYMBOLS))  # Every symbol, none twice
+        self.assertTrue(all(shards))
+
+    def test_fixed_size_shards(self):
+        shards = build_manager(feed_shard_size=3)._shard_symbols(SYMBOLS)
+        self.assert_partition(shards)
+        self.assertEqual([len(shard) for shard in shards], [3, 3, 1])
+
+    def test_shard_count_splits_evenly(self):
+        manager = build_manager()
+        for shard_count in (1, 2, 3, 7, 10):
+            shards = manager._shard_symbols(SYMBOLS, shard_count)
+            self.assert_partition(shards)
+            self.assertEqual(len(shards), min(shard_count, len(SYMBOLS)))
+            self.assertLessEqual(max(map(len, shards)) - min(map(len, shards)), 1)
+
+class TestSharedQuoteTableDrain(unittest.IsolatedAsyncioTestCase):
+    async def test_each_written_row_is_published_once(self):
+        manager = build_manager(feed_shared_poll_interval=0.001)
+        manager.shared_quote_table = table = SharedQuoteTable(EXCHANGES, SYMBOLS)
+        published = []
+        manager.subscribe(lambda exchange_id, symbol: published.append((exchange_id, symbol)))
+        drain = asyncio.create_task(manager._drain_shared_quote_table())
+        try:
+            table.write("binance", "SYM0USDT", 100.0, 101.0, 2.0, 3.0, 1700000000100, 7)
+            table.write("bybit", "SYM3USDT", 20.0, 20.5, 1.0, 1.0, 1700000000101, 9)
+            await asyncio.sleep(0.05)  # Many polls without new writes
+            self.assertEqual(sorted(published), [("binance", "SYM0USDT"), ("bybit", "SYM3USDT")])
+            tick = manager.get_market_data("binance", "SYM0USDT")
+            self.assertIsInstance(tick, Tick)
+            self.assertEqual((tick.bid, tick.ask, tick.bid_qty, tick.ask_qty, tick.timestamp, tick.update_id),
+                             (100.0, 101.0, 2.0, 3.0, 1700000000100, 7))
+
+            table.write("binance", "SYM0USDT", 100.5, 101.0, 2.0, 3.0, 1700000000200, 8)
+            await asyncio.sleep(0.05)
+            self.assertEqual(published.count(("binance", "SYM0USDT")), 2)
+            self.assertEqual(len(published), 3)
+            self.assertEqual(manager.get_market_data("binance", "SYM0USDT").bid, 100.5)
+            self.assertEqual(manager.update_counts, {"binance": 2, "bybit": 1})
+        finally:
+            drain.cancel()
+            table.close()
+
+if __name__ == "__main__":
+    unittest.main()
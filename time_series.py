@@ -0,0 +1,106 @@
+"""
+Columnar ring buffers of top-of-book quotes, with zero-copy windows by count or time range.
+"""
+
+from typing import Dict, List, Optional
+
+import numpy as np
+
+FIELDS = ("timestamp", "bid", "ask", "mid", "spread")
+TIMESTAMP, BID, ASK, MID, SPREAD = range(len(FIELDS))
+
+class QuoteWindow:
+    """A contiguous run of samples; every column is a view into the series' buffer, not a copy.
+
+    Views are only valid until the series wraps over them, so readers should
+    finish with (or copy) a window before the next capacity appends.
+    """
+
+    __slots__ = ("data",)
+
+    def __init__(self, data: np.ndarray):
+        self.data = data  # [len(FIELDS) x n]
+
+    def __len__(self) -> int:
+        return self.data.shape[1]
+
+    @property
+    def timestamp(self) -> np.ndarray:
+        return self.data[TIMESTAMP]
+
+    @property
+    def bid(self) -> np.ndarray:
+        return self.data[BID]
+
+    @property
+    def ask(self) -> np.ndarray:
+        return self.data[ASK]
+
+    @property
+    def mid(self) -> np.ndarray:
+        return self.data[MID]
+
+    @property
+    def spread(self) -> np.ndarray:
+        return self.data[SPREAD]
+
+    def to_dict(self, max_points: int = 0) -> Dict[str, List[float]]:
+        """Columns as lists for JSON, thinned to at most max_points samples (0 = all) keeping the latest."""
+        data = self.data
+        if max_points and len(self) > max_points:
+            step = -(-len(self) // max_points)
+            data = data[:, len(self) - 1::-step][:, ::-1]
+        return {name: data[index].tolist() for index, name in enumerate(FIELDS)}
+
+class QuoteSeries:
+    """Fixed-capacity history of one (exchange, symbol) in one preallocated [fields x 2*capacity] array.
+
+    Every sample is written twice, at slot i and i + capacity, so the latest
+    `count` samples always sit in one contiguous slice ending at
+    head + capacity: windows are plain slices with no wrap-around copy, and
+    a time range is two binary searches on the timestamp row. Timestamps are
+    kept non-decreasing (a late sample is stamped with the latest time).
+    """
+
+    __slots__ = ("capacity", "data", "count", "head")
+
+    def __init__(self, capacity: int = 1024):
+        if capacity < 1:
+            raise ValueError("capacity must be at least 1")
+        self.capacity = capacity
+        self.data = np.zeros((len(FIELDS), 2 * capacity))
+        self.count = 0
+        self.head = 0  # Slot of the next write
+
+    def __len__(self) -> int:
+        return self.count
+
+    def append(self, timestamp: float, bid: float, ask: float):
+        if self.count and timestamp < self.data[TIMESTAMP, self.head + self.capacity - 1]:
+            timestamp = self.data[TIMESTAMP, self.head + self.capacity - 1]
+        sample = (timestamp, bid, ask, (bid + ask) / 2, ask - bid)
+        self.data[:, self.head] = sample
+        self.data[:, self.head + self.capacity] = sample
+        self.head = (self.head + 1) % self.capacity
+        if self.count < self.capacity:
+            self.count += 1
+
+    def latest(self, count: Optional[int] = None) -> QuoteWindow:
+        """The last count samples (all held samples when None), oldest first."""
+        count = self.count if count is None else max(0, min(count, self.count))
+        end = self.head + self.capacity
+        return QuoteWindow(self.data[:, end - count:end])
+
+    def window(self, start: float, end: Optional[float] = None) -> QuoteWindow:
+        """Samples with start <= timestamp <= end (to the latest sample when end is None)."""
+        held = self.latest()
+        timestamps = held.timestamp
+        first = int(np.searchsorted(timestamps, start, side="left"))
+        last = len(held) if end is None else int(np.searchsorted(timestamps, end, side="right"))
+        return QuoteWindow(held.data[:, first:max(first, last)])
+
+    def last(self) -> Optional[Dict[str, float]]:
+        if not self.count:
+            return None
+        column = self.data[:, self.head + self.capacity - 1]
+        return dict(zip(FIELDS, column.tolist()))
@@ -12,7 +12,7 @@ from enum import Enum
 import json
 
 from exchange_manager import ExchangeManager, ArbitrageOpportunity
-from config import TRADING_CONFIG, RISK_CONFIG
+from config import TRADING_CONFIG, RISK_CONFIG, PERFORMANCE_CONFIG
 
 logger = logging.getLogger(__name__)
 
@@ -68,10 +68,12 @@ class ArbitrageTrade:
 class TradingEngine:
     """Executes arbitrage trades automatically."""
     
-    def __init__(self, exchange_manager: ExchangeManager):
+    def __init__(self, exchange_manager: ExchangeManager, route_stats=None):
         self.exchange_manager = exchange_manager
+        self.route_stats = route_stats  # RouteStatsStore fed with each finished trade
         self.active_trades: Dict[str, ArbitrageTrade] = {}
         self.completed_trades: List[ArbitrageTrade] = []
+        self.in_flight_routes: Dict[Tuple, str] = {}  # route_key -> id of the active trade working it
         self.is_trading_enabled = False
         self.daily_stats = {
             'trades_executed': 0,
@@ -89,6 +91,13 @@ class TradingEngine:
         # Performance tracking
         self.execution_times = []
         self.order_fill_rates = {'buy': [], 'sell': []}
+        
+        # Set by pushed order updates (user-data streams) to wake the trade monitors
+        self.order_update_event = asyncio.Event()
+    
+    def on_order_update(self, update):
+        """Order listener for WebSocketManager.subscribe_orders."""
+        self.order_update_event.set()
     
     def enable_trading(self):
         """Enable automatic trading."""
@@ -124,26 +133,39 @@ class TradingEngine:
             logger.warning("Circuit breaker triggered, cannot execute trades")
             return None
         
+        if opportunity.route != "direct":
+            logger.debug(f"Skipping {opportunity.route} route: only direct two-leg routes are executed")
+            return None
+        
+        if opportunity.route_key in self.in_flight_routes:
+            logger.debug(f"Skipping {opportunity.route_id}: trade {self.in_flight_routes[opportunity.route_key]} is still working this route")
+            return None
+        
         # Check daily limits
         if not self._check_daily_limits():
             return None
         
         # Check risk limits
-        if not self._check_risk_limits(opportunity):
+        if not await self._check_risk_limits(opportunity):
             return None
         
         # Calculate optimal trade size
-        trade_amount = self._calculate_trade_size(opportunity)
+        trade_amount = await self._calculate_trade_size(opportunity)
         if trade_amount <= 0:
             logger.debug("Trade amount too small, skipping")
             return None
         
+        # Re-checked after the awaits above: another task may have taken the route meanwhile
+        if opportunity.route_key in self.in_flight_routes:
+            return None
+        
         # Create trade object
         trade_id = str(uuid.uuid4())
         trade = self._create_arbitrage_trade(trade_id, opportunity, trade_amount)
         
         # Add to active trades
         self.active_trades[trade_id] = trade
+        self.in_flight_routes[opportunity.route_key] = trade_id
         
         # Execute the trade
         try:
@@ -169,7 +191,7 @@ class TradingEngine:
         
         return True
     
-    def _check_risk_limits(self, opportunity: ArbitrageOpportunity) -> bool:
+    async def _check_risk_limits(self, opportunity: ArbitrageOpportunity) -> bool:
         """Check risk limits for the opportunity."""
         # Check maximum open positions
         if len(self.active_trades) >= RISK_CONFIG['max_open_positions']:
@@ -180,11 +202,11 @@ class TradingEngine:
         base_currency = opportunity.symbol.split('/')[0]
         quote_currency = opportunity.symbol.split('/')[1]
         
-        # Check balances
-        buy_balance = self.exchange_manager.get_balance(
+        # Check balances (served from the balance book while the exchange's user-data stream is live)
+        buy_balance = await self.exchange_manager.get_balance(
             opportunity.buy_exchange, quote_currency
         )
-        sell_balance = self.exchange_manager.get_balance(
+        sell_balance = await self.exchange_manager.get_balance(
             opportunity.sell_exchange, base_currency
         )
         
@@ -196,7 +218,7 @@ class TradingEngine:
         
         return True
     
-    def _calculate_trade_size(self, opportunity: ArbitrageOpportunity) -> float:
+    async def _calculate_trade_size(self, opportunity: ArbitrageOpportunity) -> float:
         """Calculate optimal trade size based on available capital, risk limits, and opportunity liquidity."""
         # The max_quantity from the opportunity is already calculated based on order book depth and profitability
         # in price_monitor.py. We will use this as the primary determinant.
@@ -205,10 +227,10 @@ class TradingEngine:
         base_currency = opportunity.symbol.split("/")[0]
         quote_currency = opportunity.symbol.split("/")[1]
         
-        buy_balance = self.exchange_manager.get_balance(
+        buy_balance = await self.exchange_manager.get_balance(
             opportunity.buy_exchange, quote_currency
         )
-        sell_balance = self.exchange_manager.get_balance(
+        sell_balance = await self.exchange_manager.get_balance(
             opportunity.sell_exchange, base_currency
         )
         
@@ -392,6 +414,8 @@ class TradingEngine:
         start_time = time.time()
         
         while time.time() - start_time < timeout:
+            self.order_update_event.clear()
+            
             # Check buy order status
             if trade.buy_order.status == OrderStatus.PLACED:
                 await self._update_order_status(trade.buy_order)
@@ -412,8 +436,11 @@ class TradingEngine:
                 trade.status = TradeStatus.FAILED
                 break
             
-            # Small delay before next check
-            await asyncio.sleep(0.1)
+            # Wake on the next pushed order update, or poll again after a short delay
+            try:
+                await asyncio.wait_for(self.order_update_event.wait(), 0.1)
+            except asyncio.TimeoutError:
+                pass
         
         # Handle timeout
         if trade.status == TradeStatus.EXECUTING:
@@ -423,9 +450,16 @@ class TradingEngine:
     async def _update_order_status(self, order: Order):
         """Update the status of an individual order."""
         try:
-            exchange_order = await self.exchange_manager.get_order_status(
-                order.exchange, order.exchange_order_id, order.symbol
-            )
+            user_data = self.exchange_manager.user_data
+            if user_data is not None and user_data.is_user_data_live(order.exchange):
+                update = user_data.get_order_update(order.exchange, order.exchange_order_id)
+                if update is None:
+                    return  # Nothing pushed yet, so the order has not changed
+                exchange_order = update.to_order_dict()
+            else:
+                exchange_order = await self.exchange_manager.fetch_order(
+                    order.exchange, order.symbol, order.exchange_order_id
+                )
             
             # Update order details
             if exchange_order['status'] == 'closed':
@@ -529,14 +563,33 @@ class TradingEngine:
             if trade.actual_profit_usd < 0:
                 self.daily_stats['total_loss_usd'] += abs(trade.actual_profit_usd)
         
+        if self.route_stats is not None:
+            self._record_route_stats(trade)
+        
         # Check if single trade loss limit is exceeded
         if abs(trade.actual_profit_usd) > RISK_CONFIG['max_single_trade_loss_usd']:
             logger.warning(f"Single trade loss limit exceeded: ${abs(trade.actual_profit_usd):.2f}")
     
+    def _record_route_stats(self, trade: ArbitrageTrade):
+        """Feed a finished trade's fill, realized profit, latency and slippage back into its route's history."""
+        opportunity = trade.opportunity
+        buy_price = trade.buy_order.filled_price or trade.buy_order.price or opportunity.buy_price
+        sell_price = trade.sell_order.filled_price or trade.sell_order.price or opportunity.sell_price
+        filled = trade.status == TradeStatus.COMPLETED
+        cost = trade.buy_order.filled_amount * buy_price
+        slippage_pct = ((buy_price - opportunity.buy_price) / opportunity.buy_price +
+                        (opportunity.sell_price - sell_price) / opportunity.sell_price) * 100 if filled else 0.0
+        self.route_stats.record(opportunity.route_id, filled, opportunity.potential_profit_pct,
+                                trade.actual_profit_usd / cost * 100 if cost > 0 else 0.0,
+                                trade.execution_time_ms or 0.0, slippage_pct)
+    
     def _move_to_completed(self, trade: ArbitrageTrade):
         """Move a trade from active to completed."""
         if trade.id in self.active_trades:
             del self.active_trades[trade.id]
+        route_key = trade.opportunity.route_key
+        if self.in_flight_routes.get(route_key) == trade.id:
+            del self.in_flight_routes[route_key]
         self.completed_trades.append(trade)
         
         # Keep only recent completed trades in memory
@@ -593,7 +646,7 @@ class TradingEngine:
 
     async def _estimate_slippage(self, exchange_id: str, symbol: str, side: str, amount: float, price: float) -> float:
         """Estimates potential slippage for a given order."""
-        order_book = await self.exchange_manager.get_order_book(exchange_id, symbol, limit=TRADING_CONFIG["order_book_depth"])
+        order_book = await self.exchange_manager.get_order_book(exchange_id, symbol, limit=PERFORMANCE_CONFIG.get("order_book_depth", 20))
         if not order_book:
             logger.warning(f"Could not fetch order book for slippage estimation on {exchange_id} {symbol}")
             return 0.0 # Cannot estimate slippage
@@ -0,0 +1,208 @@
+"""
+Triangular (cyclic) arbitrage within a single exchange, evaluated incrementally per quote update.
+"""
+
+import logging
+import math
+import time
+from dataclasses import dataclass
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+BUY = "buy"
+SELL = "sell"
+
+@dataclass(slots=True)
+class TriangularOpportunity:
+    """A profitable currency cycle on one exchange, e.g. USDT -> BTC -> ETH -> USDT."""
+    exchange: str
+    path: Tuple[str, ...]  # Currencies visited, starting and ending with the same one
+    legs: Tuple[Tuple[str, str], ...]  # (native symbol, "buy" / "sell") per hop
+    profit_pct: float  # Net of fees, for one unit of the start currency
+    timestamp: float
+
+class _ExchangeGraph:
+    """Currency graph of one exchange: two directed edges per market, cycles precomputed and indexed by market.
+
+    Edge weights are -log(rate net of fee), so a cycle is profitable when
+    its weights sum below -log(1 + min_profit). Edge E (one past the last
+    market edge) is a padding edge that always weighs 0, which lets cycles
+    of different lengths share one [C x max_length] index array.
+    """
+
+    def __init__(self, exchange_id: str, markets: Sequence[Tuple[str, str, str]], fee: float,
+                 max_cycle_length: int, start_currencies: Sequence[str], max_cycles: int):
+        self.exchange_id = exchange_id
+        self.fee = fee
+        self.market_index: Dict[str, int] = {}
+        self.edges: List[Tuple[str, str, str, str]] = []  # (from, to, symbol, side); edge 2m buys market m, 2m+1 sells it
+        for symbol, base, quote in markets:
+            if symbol in self.market_index or base == quote:
+                continue
+            self.market_index[symbol] = len(self.market_index)
+            self.edges.append((quote, base, symbol, BUY))
+            self.edges.append((base, quote, symbol, SELL))
+        self.weights = np.full(len(self.edges) + 1, np.inf)
+        self.weights[-1] = 0.0
+        self.cycle_edges, self.cycles_by_market = self._find_cycles(max_cycle_length, max_cycles)
+        self._paths: List[Optional[Tuple]] = [None] * len(self.cycle_edges)  # (path, legs), built on first hit
+        self._start_rank = {currency: rank for rank, currency in enumerate(start_currencies)}
+        self.profitable: Dict[int, TriangularOpportunity] = {}
+
+    def _find_cycles(self, max_cycle_length: int, max_cycles: int):
+        currencies = sorted({edge[0] for edge in self.edges})
+        rank = {currency: i for i, currency in enumerate(currencies)}
+        outgoing: Dict[str, List[int]] = {}
+        for index, (source, _, _, _) in enumerate(self.edges):
+            outgoing.setdefault(source, []).append(index)
+        cycles: List[List[int]] = []
+        padding = len(self.edges)
+        for start in currencies:
+            # Only cycles whose lowest-ranked currency is the start, so each rotation is found once
+            stack = [(start, [], {start})]
+            while stack and len(cycles) < max_cycles:
+                currency, path, visited = stack.pop()
+                for edge in outgoing.get(currency, ()):
+                    target = self.edges[edge][1]
+                    if target == start and len(path) >= 2:
+                        cycles.append(path + [edge] + [padding] * (max_cycle_length - len(path) - 1))
+                    elif target not in visited and rank[target] > rank[start] and len(path) + 1 < max_cycle_length:
+                        stack.append((target, path + [edge], visited | {target}))
+        if len(cycles) >= max_cycles:
+            logger.warning(f"{self.exchange_id}: triangular cycle enumeration capped at {max_cycles} cycles.")
+        cycle_edges = np.array(cycles, dtype=np.intp).reshape(len(cycles), max_cycle_length)
+        by_market: List[List[int]] = [[] for _ in self.market_index]
+        for cycle_id, edges in enumerate(cycles):
+            for edge in set(edges):
+                if edge != padding:
+                    by_market[edge // 2].append(cycle_id)
+        return cycle_edges, [np.array(sorted(set(ids)), dtype=np.intp) for ids in by_market]
+
+    def path_of(self, cycle_id: int) -> Tuple[Tuple[str, ...], Tuple[Tuple[str, str], ...]]:
+        """Currencies and legs of a cycle, rotated to start from the preferred start currency."""
+        cached = self._paths[cycle_id]
+        if cached is not None:
+            return cached
+        edges = [self.edges[edge] for edge in self.cycle_edges[cycle_id].tolist() if edge != len(self.edges)]
+        default_rank = len(self._start_rank)
+        first = min(range(len(edges)), key=lambda i: (self._start_rank.get(edges[i][0], default_rank), edges[i][0]))
+        edges = edges[first:] + edges[:first]
+        path = tuple(edge[0] for edge in edges) + (edges[0][0],)
+        legs = tuple((edge[2], edge[3]) for edge in edges)
+        self._paths[cycle_id] = (path, legs)
+        return path, legs
+
+class TriangularArbitrageDetector:
+    """Finds profitable currency cycles on each exchange from top-of-book updates.
+
+    Every simple cycle of up to max_cycle_length currencies is enumerated once
+    when an exchange's markets are loaded and indexed by the markets it trades.
+    A quote update rewrites the two edges of its market and re-prices only the
+    cycles through that market, as one gather-and-sum over their edge weights,
+    so no shortest-path search runs per tick.
+    """
+
+    def __init__(self, min_profit: float = 0.001, max_cycle_length: int = 3,
+                 start_currencies: Sequence[str] = ("USDT", "USDC", "USD", "BTC", "ETH"), max_cycles: int = 200000):
+        self.min_profit = min_profit
+        self.max_cycle_length = max(3, max_cycle_length)
+        self.start_currencies = tuple(start_currencies)
+        self.max_cycles = max_cycles
+        self.graphs: Dict[str, _ExchangeGraph] = {}
+        self.evaluations = 0  # Cycles priced so far
+
+    @property
+    def log_threshold(self) -> float:
+        return -math.log1p(self.min_profit)
+
+    def load_markets(self, exchange_id: str, markets, fee: float = 0.001, symbols: Optional[Iterable[str]] = None):
+        """Builds an exchange's graph from ccxt markets ({symbol: {"id", "base", "quote", ...}}).
+
+        symbols limits the graph to the native ids that are actually streamed;
+        cycles through markets without quotes could never be priced.
+        """
+        wanted = set(symbols) if symbols is not None else None
+        entries = []
+        for market in (markets.values() if isinstance(markets, dict) else markets):
+            if market.get("active") is False or market.get("spot") is False:
+                continue
+            native_id = market.get("id") or market["symbol"].replace("/", "")
+            if wanted is None or native_id in wanted:
+                entries.append((native_id, market["base"], market["quote"]))
+        graph = _ExchangeGraph(exchange_id, entries, fee, self.max_cycle_length, self.start_currencies, self.max_cycles)
+        self.graphs[exchange_id] = graph
+        logger.info(f"Triangular detector: {exchange_id} graph with {len(graph.market_index)} markets, {len(graph.cycle_edges)} cycles.")
+        return len(graph.cycle_edges)
+
+    def set_fee(self, exchange_id: str, fee: float) -> List[TriangularOpportunity]:
+        """Re-prices an exchange's cycles at a new taker fee; returns the cycles that just became profitable."""
+        graph = self.graphs.get(exchange_id)
+        if graph is None or graph.fee == fee:
+            return []
+        # Weights already include the old fee; shift every finite edge by the difference
+        finite = np.isfinite(graph.weights[:-1])
+        graph.weights[:-1][finite] += math.log1p(-graph.fee) - math.log1p(-fee)
+        graph.fee = fee
+        return self._evaluate(graph, np.arange(len(graph.cycle_edges)))
+
+    def on_quote(self, exchange_id: str, symbol: str, bid: float, ask: float) -> List[TriangularOpportunity]:
+        """Applies a top-of-book update and returns the cycles through this market that just became profitable."""
+        graph = self.graphs.get(exchange_id)
+        if graph is None:
+            return []
+        market = graph.market_index.get(symbol)
+        if market is None:
+            return []
+        weights = graph.weights
+        if bid > 0 and ask > 0:
+            fee_weight = -math.log1p(-graph.fee)
+            weights[2 * market] = math.log(ask) + fee_weight  # quote -> base: 1 quote buys (1 - fee) / ask base
+            weights[2 * market + 1] = -math.log(bid) + fee_weight  # base -> quote: 1 base sells for bid * (1 - fee) quote
+        else:
+            weights[2 * market] = weights[2 * market + 1] = np.inf
+        return self._evaluate(graph, graph.cycles_by_market[market])
+
+    def clear(self, exchange_id: str, symbol: str) -> List[TriangularOpportunity]:
+        """Removes a stale or missing quote; cycles through it stop being profitable."""
+        return self.on_quote(exchange_id, symbol, 0.0, 0.0)
+
+    def _evaluate(self, graph: _ExchangeGraph, cycle_ids: np.ndarray) -> List[TriangularOpportunity]:
+        if not len(cycle_ids):
+            return []
+        self.evaluations += len(cycle_ids)
+        sums = graph.weights[graph.cycle_edges[cycle_ids]].sum(axis=1)
+        hits = sums < self.log_threshold
+        profitable = graph.profitable
+        if profitable:
+            for cycle_id in cycle_ids[~hits].tolist():
+                profitable.pop(cycle_id, None)
+        if not hits.any():
+            return []
+        now = time.time()
+        found = []
+        for cycle_id, weight in zip(cycle_ids[hits].tolist(), sums[hits].tolist()):
+            path, legs = graph.path_of(cycle_id)
+            opportunity = TriangularOpportunity(graph.exchange_id, path, legs, math.expm1(-weight) * 100, now)
+            if cycle_id not in profitable:
+                found.append(opportunity)
+            profitable[cycle_id] = opportunity
+        return found
+
+    def get_opportunities(self, exchange_id: Optional[str] = None) -> List[TriangularOpportunity]:
+        """Cycles that were profitable at their last evaluation, best first."""
+        if exchange_id is None:
+            graphs = list(self.graphs.values())
+        else:
+            graphs = [self.graphs[exchange_id]] if exchange_id in self.graphs else []
+        opportunities = [opportunity for graph in graphs for opportunity in graph.profitable.values()]
+        return sorted(opportunities, key=lambda opportunity: -opportunity.profit_pct)
+
+    def get_stats(self) -> Dict[str, int]:
+        return {
+            "cycles": sum(len(graph.cycle_edges) for graph in self.graphs.values()),
+            "profitable": sum(len(graph.profitable) for graph in self.graphs.values()),
+            "evaluations": self.evaluations,
+        }
@@ -0,0 +1,349 @@
+"""
+Authenticated user-data streams: pushed order and balance updates.
+
+Adapters speak each venue's private WebSocket protocol and normalize what it
+pushes into OrderUpdate and BalanceUpdate records. WebSocketManager keeps one
+stream per exchange, applies balances to a BalanceBook and hands order updates
+to its order listeners (the trading engine), so order status and balances no
+longer need a REST round-trip on the execution path.
+"""
+
+import hashlib
+import hmac
+import json
+import logging
+import time
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Sequence, Tuple, Type
+
+import aiohttp
+
+logger = logging.getLogger(__name__)
+
+# Order states use ccxt's vocabulary, so pushed updates and REST fetch_order results read the same
+ORDER_OPEN = "open"
+ORDER_CLOSED = "closed"
+ORDER_CANCELED = "canceled"
+ORDER_REJECTED = "rejected"
+ORDER_EXPIRED = "expired"
+FINAL_ORDER_STATES = (ORDER_CLOSED, ORDER_CANCELED, ORDER_REJECTED, ORDER_EXPIRED)
+
+@dataclass(slots=True)
+class OrderUpdate:
+    """Latest state of one order, as pushed by the venue."""
+    exchange: str
+    symbol: str  # Native symbol, e.g. BTCUSDT
+    order_id: str
+    client_order_id: str
+    side: str  # "buy" / "sell"
+    status: str  # ORDER_* state
+    price: float  # Limit price (0 for market orders)
+    amount: float
+    filled: float  # Cumulative filled quantity
+    average: Optional[float]  # Average fill price, None until something filled
+    fee: float = 0.0  # Cumulative fee, in fee_currency
+    fee_currency: str = ""
+    timestamp: int = 0  # Venue event time in ms
+
+    @property
+    def is_final(self) -> bool:
+        return self.status in FINAL_ORDER_STATES
+
+    def to_order_dict(self) -> Dict[str, Any]:
+        """The subset of a ccxt order dict the trading engines read."""
+        return {
+            "id": self.order_id,
+            "clientOrderId": self.client_order_id,
+            "symbol": self.symbol,
+            "side": self.side,
+            "status": self.status,
+            "price": self.price or self.average,
+            "amount": self.amount,
+            "filled": self.filled,
+            "average": self.average,
+            "fee": {"cost": self.fee, "currency": self.fee_currency},
+            "timestamp": self.timestamp,
+        }
+
+@dataclass(slots=True)
+class BalanceUpdate:
+    """New absolute balances for the assets that changed on one exchange."""
+    exchange: str
+    balances: Sequence[Tuple[str, float, float]]  # [(asset, free, locked), ...]
+    timestamp: int = 0  # Venue event time in ms (informational, pushes are applied in stream order)
+
+class BalanceBook:
+    """Free/locked balance per (exchange, asset), kept current by pushed BalanceUpdates.
+
+    The book is seeded from a REST balance snapshot whenever an exchange's
+    stream (re)connects. Pushes are applied in stream order and stamped with
+    a local sequence number; a snapshot only fills in assets that were not
+    pushed since it was requested, so a snapshot that raced with a push never
+    overwrites the newer value. An exchange only counts as live while its
+    stream is connected and seeded; readers fall back to REST otherwise.
+    """
+
+    def __init__(self):
+        self._balances: Dict[str, Dict[str, Tuple[float, float, int]]] = {}  # {exchange: {asset: (free, locked, seq)}}
+        self._live: set = set()
+        self.sequence = 0
+
+    def apply(self, update: BalanceUpdate):
+        self.sequence += 1
+        balances = self._balances.setdefault(update.exchange, {})
+        for asset, free, locked in update.balances:
+            balances[asset] = (free, locked, self.sequence)
+
+    def seed(self, exchange_id: str, snapshot: Dict[str, Dict[str, float]], requested_at: int):
+        """Loads a ccxt-style {"free": {...}, "used": {...}} snapshot requested when sequence was requested_at."""
+        free, used = snapshot.get("free") or {}, snapshot.get("used") or {}
+        balances = self._balances.setdefault(exchange_id, {})
+        for asset in set(free) | set(used):
+            current = balances.get(asset)
+            if current is None or current[2] <= requested_at:
+                balances[asset] = (float(free.get(asset) or 0.0), float(used.get(asset) or 0.0), requested_at)
+        self._live.add(exchange_id)
+
+    def set_live(self, exchange_id: str, live: bool):
+        if live:
+            self._live.add(exchange_id)
+        else:
+            self._live.discard(exchange_id)
+
+    def is_live(self, exchange_id: str) -> bool:
+        return exchange_id in self._live
+
+    def get_free(self, exchange_id: str, asset: str) -> Optional[float]:
+        """Free balance, or None when the exchange is not live (the caller should ask REST)."""
+        if exchange_id not in self._live:
+            return None
+        entry = self._balances.get(exchange_id, {}).get(asset)
+        return entry[0] if entry is not None else 0.0
+
+    def get_exchange(self, exchange_id: str) -> Dict[str, Dict[str, float]]:
+        """ccxt-style {"free", "used", "total"} view of one exchange."""
+        balances = self._balances.get(exchange_id, {})
+        return {
+            "free": {asset: free for asset, (free, _, _) in balances.items()},
+            "used": {asset: locked for asset, (_, locked, _) in balances.items()},
+            "total": {asset: free + locked for asset, (free, locked, _) in balances.items()},
+        }
+
+class UserDataAdapter:
+    """Base class for a venue's private user-data stream.
+
+    connection_url() may do REST work first (Binance creates a listen key),
+    login_messages() authenticate and subscribe right after connecting, and
+    keepalive() runs every keepalive_interval seconds while connected.
+    """
+
+    exchange_id = ""
+    default_url = ""
+    sandbox_url = ""
+    heartbeat_interval = 0.0
+    keepalive_interval = 0.0
+
+    def __init__(self, exchange_config: Dict[str, Any], performance_config: Dict[str, Any], json_loads=None):
+        self.exchange_config = exchange_config or {}
+        self.performance_config = performance_config or {}
+        self.json_loads = json_loads or json.loads
+        self.api_key = self.exchange_config.get("api_key", "")
+        self.secret = self.exchange_config.get("secret", "")
+        self.url = self.sandbox_url if self.exchange_config.get("sandbox", False) and self.sandbox_url else self.default_url
+        if self.performance_config.get("user_data_urls", {}).get(self.exchange_id):
+            self.url = self.performance_config["user_data_urls"][self.exchange_id]
+
+    async def connection_url(self) -> str:
+        return self.url
+
+    def login_messages(self) -> List[Any]:
+        return []
+
+    def heartbeat_message(self) -> Optional[Any]:
+        return None
+
+    async def keepalive(self):
+        pass
+
+    async def close(self):
+        pass
+
+    def parse(self, message) -> Sequence:
+        """Decodes one frame into OrderUpdate / BalanceUpdate records (empty for control frames)."""
+        raise NotImplementedError
+
+    @staticmethod
+    def encode(message) -> str:
+        return message if isinstance(message, str) else json.dumps(message)
+
+USER_DATA_ADAPTERS: Dict[str, Type[UserDataAdapter]] = {}
+
+def register_user_data_adapter(adapter_class: Type[UserDataAdapter]) -> Type[UserDataAdapter]:
+    USER_DATA_ADAPTERS[adapter_class.exchange_id] = adapter_class
+    return adapter_class
+
+def get_user_data_adapter(exchange_id: str) -> Optional[Type[UserDataAdapter]]:
+    return USER_DATA_ADAPTERS.get(exchange_id)
+
+@register_user_data_adapter
+class BinanceUserDataAdapter(UserDataAdapter):
+    """Binance spot user data stream: executionReport, outboundAccountPosition and balanceUpdate.
+
+    The stream is addressed by a listen key from POST /api/v3/userDataStream,
+    which expires after 60 minutes unless it is kept alive with a PUT.
+    """
+
+    exchange_id = "binance"
+    default_url = "wss://stream.binance.com:9443/ws/"
+    sandbox_url = "wss://stream.testnet.binance.vision/ws/"
+    keepalive_interval = 30 * 60.0
+
+    ORDER_STATUSES = {
+        "NEW": ORDER_OPEN,
+        "PARTIALLY_FILLED": ORDER_OPEN,
+        "PENDING_CANCEL": ORDER_OPEN,
+        "FILLED": ORDER_CLOSED,
+        "CANCELED": ORDER_CANCELED,
+        "REJECTED": ORDER_REJECTED,
+        "EXPIRED": ORDER_EXPIRED,
+        "EXPIRED_IN_MATCH": ORDER_EXPIRED,
+    }
+
+    def __init__(self, exchange_config, performance_config, json_loads=None):
+        super().__init__(exchange_config, performance_config, json_loads)
+        self.rest_url = "https://testnet.binance.vision" if self.exchange_config.get("sandbox", False) else "https://api.binance.com"
+        if self.performance_config.get("binance_rest_url"):
+            self.rest_url = self.performance_config["binance_rest_url"]
+        self.listen_key = None
+        self._fees: Dict[str, float] = {}  # order id -> cumulative commission, executionReport only carries the last fill's
+
+    async def _listen_key_request(self, method: str, params=None) -> Dict[str, Any]:
+        url = f"{self.rest_url.rstrip('/')}/api/v3/userDataStream"
+        headers = {"X-MBX-APIKEY": self.api_key}
+        async with aiohttp.ClientSession() as session:
+            async with session.request(method, url, params=params, headers=headers, timeout=aiohttp.ClientTimeout(total=10)) as response:
+                response.raise_for_status()
+                return await response.json()
+
+    async def connection_url(self):
+        self.listen_key = (await self._listen_key_request("POST"))["listenKey"]
+        return f"{self.url.rstrip('/')}/{self.listen_key}"
+
+    async def keepalive(self):
+        await self._listen_key_request("PUT", {"listenKey": self.listen_key})
+
+    async def close(self):
+        if self.listen_key:
+            try:
+                await self._listen_key_request("DELETE", {"listenKey": self.listen_key})
+            except Exception as e:
+                logger.debug(f"Could not delete Binance listen key: {e}")
+            self.listen_key = None
+
+    def parse(self, message):
+        event = self.json_loads(message)
+        if "data" in event and "stream" in event:
+            event = event["data"]
+        event_type = event.get("e")
+        if event_type == "executionReport":
+            order_id = str(event["i"])
+            fee = self._fees.get(order_id, 0.0) + float(event.get("n") or 0.0)
+            status = self.ORDER_STATUSES.get(event["X"], ORDER_OPEN)
+            if status in FINAL_ORDER_STATES:
+                self._fees.pop(order_id, None)
+            else:
+                self._fees[order_id] = fee
+            filled = float(event["z"])
+            return (OrderUpdate(
+                "binance",
+                event["s"],
+                order_id,
+                event.get("C") or event.get("c", ""),  # C is the original client id on cancels
+                event["S"].lower(),
+                status,
+                float(event["p"]),
+                float(event["q"]),
+                filled,
+                float(event["Z"]) / filled if filled else None,
+                fee,
+                event.get("N") or "",
+                event.get("E", 0),
+            ),)
+        if event_type == "outboundAccountPosition":
+            return (BalanceUpdate("binance", [(entry["a"], float(entry["f"]), float(entry["l"])) for entry in event["B"]],
+                                  event.get("u") or event.get("E", 0)),)
+        if event_type == "listenKeyExpired":
+            raise ConnectionError("Binance listen key expired")
+        # balanceUpdate (deposits/withdrawals) is always followed by an outboundAccountPosition with the new totals
+        return ()
+
+@register_user_data_adapter
+class BybitUserDataAdapter(UserDataAdapter):
+    """Bybit v5 private stream: the order and wallet topics, authenticated with an HMAC-signed auth request."""
+
+    exchange_id = "bybit"
+    default_url = "wss://stream.bybit.com/v5/private"
+    sandbox_url = "wss://stream-testnet.bybit.com/v5/private"
+    heartbeat_interval = 20.0
+    auth_expiry_ms = 10000
+
+    ORDER_STATUSES = {
+        "New": ORDER_OPEN,
+        "PartiallyFilled": ORDER_OPEN,
+        "Untriggered": ORDER_OPEN,
+        "Filled": ORDER_CLOSED,
+        "Cancelled": ORDER_CANCELED,
+        "PartiallyFilledCanceled": ORDER_CANCELED,
+        "Deactivated": ORDER_CANCELED,
+        "Rejected": ORDER_REJECTED,
+    }
+
+    def login_messages(self):
+        expires = int(time.time() * 1000) + self.auth_expiry_ms
+        signature = hmac.new(self.secret.encode(), f"GET/realtime{expires}".encode(), hashlib.sha256).hexdigest()
+        return [
+            {"op": "auth", "args": [self.api_key, expires, signature]},
+            {"op": "subscribe", "args": ["order", "wallet"]},
+        ]
+
+    def heartbeat_message(self):
+        return {"op": "ping"}
+
+    def parse(self, message):
+        data = self.json_loads(message)
+        topic = data.get("topic")
+        if topic is None:
+            if data.get("success") is False:
+                # A failed auth leaves the stream silent, so fail loudly and let the manager reconnect
+                raise ConnectionError(f"Bybit private stream request {data.get('op')} failed: {data.get('ret_msg')}")
+            return ()
+        if topic == "order":
+            updates = []
+            for order in data["data"]:
+                filled = float(order.get("cumExecQty") or 0.0)
+                average = float(order.get("avgPrice") or 0.0)
+                updates.append(OrderUpdate(
+                    "bybit",
+                    order["symbol"],
+                    order["orderId"],
+                    order.get("orderLinkId", ""),
+                    order["side"].lower(),
+                    self.ORDER_STATUSES.get(order["orderStatus"], ORDER_OPEN),
+                    float(order.get("price") or 0.0),
+                    float(order.get("qty") or 0.0),
+                    filled,
+                    average if filled and average else None,
+                    float(order.get("cumExecFee") or 0.0),
+                    order.get("feeCurrency", ""),
+                    int(order.get("updatedTime") or data.get("creationTime", 0)),
+                ))
+            return updates
+        if topic == "wallet":
+            balances = []
+            for account in data["data"]:
+                for coin in account.get("coin", []):
+                    locked = float(coin.get("locked") or 0.0)
+                    free = float(coin.get("walletBalance") or 0.0) - locked
+                    balances.append((coin["coin"], free, locked))
+            return (BalanceUpdate("bybit", balances, data.get("creationTime", 0)),) if balances else ()
+        return ()
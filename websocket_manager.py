@@ -1,9 +1,20 @@
 import asyncio
+import itertools
 import logging
-import json
+import multiprocessing
+import random
+import time
 import websockets
 import ccxt.async_support as ccxt
-from datetime import datetime
+import numpy as np
+
+from order_book import LocalOrderBook
+from quote_store import QuoteStore
+from market_data import BookDelta, BookSnapshot, Tick, get_json_decoder
+from shared_quote_table import SharedQuoteTable
+from feed_adapters import get_feed_adapter
+from market_journal import MarketJournal
+from user_data import BalanceBook, BalanceUpdate, get_user_data_adapter
 
 logger = logging.getLogger(__name__)
 
@@ -12,70 +23,503 @@ class WebSocketManager:
         self.config = config
         self.exchanges_config = config["EXCHANGES"]
         self.trade_symbols = config["TRADING_CONFIG"]["trade_symbols"]
-        self.market_data = {}
-        self.lock = asyncio.Lock()
+        self.trade_symbol_set = set(self.trade_symbols)
+        self.quote_store = QuoteStore() # Single writer (the feed handlers), lock-free readers
         self.exchange_ws_clients = {}
+        self.feed_tasks = []
+        self.performance_config = config.get("PERFORMANCE_CONFIG", {})
         self.binance_ws_url = "wss://stream.binance.com:9443/ws/" # Default for production
         if self.exchanges_config.get("binance", {}).get("sandbox", False):
             self.binance_ws_url = "wss://stream.testnet.binance.vision/ws/" # Binance testnet WebSocket URL
-        self.binance_update_count = 0
-        self.bybit_update_count = 0
+        if self.performance_config.get("websocket_urls", {}).get("binance"):
+            self.binance_ws_url = self.performance_config["websocket_urls"]["binance"]
+        self.binance_stream_mode = self.performance_config.get("binance_stream_mode", "book_ticker")
+        self.json_loads = get_json_decoder(self.performance_config.get("feed_json_decoder", "auto"))
+        self.retain_raw = self.performance_config.get("feed_retain_raw", False)
+        self.native_feeds = self.performance_config.get("websocket_data_source", "native_websocket") == "native_websocket"
+        self.feed_adapters = {} # {exchange_id: FeedAdapter} for exchanges running a native feed
+        self.order_books = {} # {exchange_id: {symbol: LocalOrderBook}}
+        self.depth_buffers = {} # {(exchange_id, symbol): [BookDelta]} while a REST resync is in flight
+        self.depth_resync_tasks = {}
+        self.depth_resync_counts = {} # {exchange_id: completed book (re)syncs}
+        self.update_counts = {} # {exchange_id: top-of-book updates received}
+        self.feed_shard_size = max(1, self.performance_config.get("feed_shard_size", 50))
+        self.feed_shard_processes = self.performance_config.get("feed_shard_processes", 0)
+        self.feed_processes = []
+        self.feed_redundancy = max(1, self.performance_config.get("feed_redundancy", 1))
+        self.reconnect_backoff_initial = self.performance_config.get("feed_reconnect_backoff_initial", 0.5)
+        self.reconnect_backoff_max = self.performance_config.get("feed_reconnect_backoff_max", 30)
+        self.duplicate_counts = {} # {exchange_id: copies from redundant connections discarded}
+        self._feed_sources = itertools.count(1) # One id per connection attempt
+        self._live_sources = set()
+        self._tick_sources = {} # {(exchange_id, symbol): (update_id, source, recv_ts)} of the last published tick
+        self.feed_failover_ms = self.performance_config.get("feed_failover_ms", 1000)
+        self._book_sources = {} # {(exchange_id, symbol): source} whose events last advanced the book
+        self.shared_quote_table = None
+        self.feed_latency_monitor = None # FeedLatencyMonitor, attached by ArbitrageBot
+        self.record_feed_lag = True
+        self.user_data_enabled = self.performance_config.get("user_data_enabled", False)
+        self.user_data_adapters = {} # {exchange_id: UserDataAdapter} for exchanges with a private stream
+        self.user_data_counts = {} # {exchange_id: order/balance updates received}
+        self.balance_book = BalanceBook()
+        self.balance_source = None # Anything with async fetch_balance_snapshot(exchange_id) (ExchangeManager), attached by ArbitrageBot
+        self.order_listeners = []
+        self.order_updates = {} # {(exchange_id, order_id): latest OrderUpdate}, bounded by order_update_cache_size
+        self.order_update_cache_size = self.performance_config.get("order_update_cache_size", 10000)
+        self.order_update_wait = self.performance_config.get("order_update_wait_seconds", 2.0)
+        self._order_waiters = {} # {(exchange_id, order_id): [Future]} from wait_for_order_update
+        self._user_data_connected = set()
+        self.journal = None
+        if self.performance_config.get("journal_enabled", False):
+            self.journal = MarketJournal(
+                self.performance_config.get("journal_dir", "journal"),
+                queue_size=self.performance_config.get("journal_queue_size", 100000),
+                chunk_records=self.performance_config.get("journal_chunk_records", 65536),
+            )
 
     async def start(self):
         """Start WebSocket connections for all configured exchanges."""
-        tasks = []
+        if self.journal is not None:
+            self.journal.start()
         for exchange_id, exchange_config in self.exchanges_config.items():
             if exchange_config.get("api_key") and exchange_config.get("secret"):
-                if exchange_id == "binance":
-                    tasks.append(self._connect_binance_native_ws())
+                adapter_class = get_feed_adapter(exchange_id) if self.native_feeds else None
+                if adapter_class is not None:
+                    self.feed_adapters[exchange_id] = adapter_class(exchange_config, self.performance_config, self.trade_symbols, self.json_loads)
                 else:
-                    tasks.append(self._connect_and_subscribe(exchange_id, exchange_config))
-        await asyncio.gather(*tasks)
+                    self.feed_tasks.append(asyncio.create_task(self._connect_and_subscribe(exchange_id, exchange_config)))
+                user_data_class = get_user_data_adapter(exchange_id) if self.user_data_enabled else None
+                if user_data_class is not None:
+                    adapter = self.user_data_adapters[exchange_id] = user_data_class(exchange_config, self.performance_config, self.json_loads)
+                    self.feed_tasks.append(asyncio.create_task(self._run_user_data_stream(adapter)))
+
+        if self.feed_adapters and self.feed_shard_processes > 0:
+            # Top-of-book parsing moves to worker processes; depth (local books) stays in this process
+            self._start_feed_processes()
+            self.feed_tasks.append(asyncio.create_task(self._drain_shared_quote_table()))
+            for adapter in self.feed_adapters.values():
+                if adapter.depth_enabled:
+                    self.feed_tasks.append(asyncio.create_task(self._run_native_feed(adapter, tickers=False)))
+        else:
+            for exchange_id, adapter in self.feed_adapters.items():
+                # Native feeds loop forever, so they run as background tasks instead of blocking start()
+                ticker_arr = exchange_id == "binance" and self.binance_stream_mode == "ticker_arr"
+                self.feed_tasks.append(asyncio.create_task(self._run_native_feed(adapter, tickers=not ticker_arr)))
+                if ticker_arr:
+                    self.feed_tasks.append(asyncio.create_task(self._connect_binance_ticker_arr_ws()))
         logger.info("WebSocket Manager started for all configured exchanges.")
 
-    async def _connect_binance_native_ws(self):
+    def _shard_symbols(self, symbols, shard_count=None):
+        """Splits symbols into shards of feed_shard_size, or into shard_count roughly equal groups."""
+        if shard_count:
+            return [shard for shard in (symbols[i::shard_count] for i in range(shard_count)) if shard]
+        return [symbols[i:i + self.feed_shard_size] for i in range(0, len(symbols), self.feed_shard_size)]
+
+    async def _run_native_feed(self, adapter, tickers=True):
+        """Runs one adapter's feed, feed_redundancy connections per symbol shard."""
+        depth = adapter.depth_enabled
+        if not tickers and not depth:
+            return
+        shards = self._shard_symbols(adapter.symbols)
+        redundancy = f" x{self.feed_redundancy} redundant" if self.feed_redundancy > 1 else ""
+        logger.info(f"{adapter.exchange_id} feed: {len(adapter.symbols)} symbols over {len(shards)} connection(s){redundancy}.")
+        connections = []
+        for shard in shards:
+            depth_sources = set() # Live connections carrying this shard's depth; its books survive while any is up
+            for endpoint in range(self.feed_redundancy):
+                # Locally numbered books cannot be deduped across connections, so their depth stays on the primary
+                shard_depth = depth and (endpoint == 0 or adapter.sequenced_books)
+                if tickers or shard_depth:
+                    connections.append(self._run_feed_connection(adapter, shard, tickers, shard_depth, endpoint, depth_sources))
+        await asyncio.gather(*connections)
+
+    async def _run_feed_connection(self, adapter, symbols, tickers, depth, endpoint=0, depth_sources=None):
+        """Connects, subscribes and dispatches parsed events for one shard, reconnecting with backoff on any error."""
+        exchange_id = adapter.exchange_id
+        uri = adapter.connection_url(symbols, tickers, depth, endpoint)
+        depth_sources = set() if depth_sources is None else depth_sources
+        attempt = 0
+        while True:
+            heartbeat_task = None
+            source = next(self._feed_sources)
+            try:
+                async with websockets.connect(uri) as websocket:
+                    logger.info(f"Connected to {exchange_id} native WebSocket ({len(symbols)} symbols, endpoint {endpoint}): {uri}")
+                    self._live_sources.add(source)
+                    if depth:
+                        depth_sources.add(source)
+                    for request in adapter.subscribe_messages(symbols, tickers, depth):
+                        await websocket.send(adapter.encode(request))
+                    if adapter.heartbeat_interval:
+                        heartbeat_task = asyncio.create_task(self._send_heartbeats(adapter, websocket))
+                    while True:
+                        message = await websocket.recv(decode=False) # Raw bytes, skips the UTF-8 decode
+                        attempt = 0
+                        for event in adapter.parse(message, time.monotonic()):
+                            if not self._on_feed_event(adapter, event, source):
+                                for request in adapter.resync_messages(event.symbol):
+                                    await websocket.send(adapter.encode(request))
+            except Exception as e:
+                self._live_sources.discard(source)
+                depth_sources.discard(source)
+                delay = self._reconnect_delay(attempt)
+                attempt += 1
+                logger.error(f"{exchange_id} native WebSocket error (endpoint {endpoint}): {e}. Reconnecting in {delay:.1f} seconds...")
+                if depth and not depth_sources:
+                    # Deltas were lost while no connection carried them, so this shard's books have to be rebuilt from a snapshot
+                    for symbol in symbols:
+                        book = self.order_books.get(exchange_id, {}).get(symbol)
+                        if book is not None:
+                            book.invalidate()
+                await asyncio.sleep(delay)
+            finally:
+                self._live_sources.discard(source)
+                depth_sources.discard(source)
+                if heartbeat_task is not None:
+                    heartbeat_task.cancel()
+
+    def _reconnect_delay(self, attempt):
+        """Exponential backoff with jitter, so connections dropped together do not reconnect in lockstep."""
+        delay = min(self.reconnect_backoff_max, self.reconnect_backoff_initial * 2 ** attempt)
+        return delay * random.uniform(0.5, 1.0)
+
+    async def _send_heartbeats(self, adapter, websocket):
+        message = adapter.encode(adapter.heartbeat_message())
+        while True:
+            await asyncio.sleep(adapter.heartbeat_interval)
+            await websocket.send(message)
+
+    async def _run_user_data_stream(self, adapter):
+        """Keeps one exchange's private stream connected; balances go to the balance book, order updates to the order listeners."""
+        exchange_id = adapter.exchange_id
+        attempt = 0
+        while True:
+            background_tasks = []
+            delay = 0.0
+            try:
+                uri = await adapter.connection_url()
+                async with websockets.connect(uri) as websocket:
+                    logger.info(f"Connected to {exchange_id} user data stream.")
+                    for request in adapter.login_messages():
+                        await websocket.send(adapter.encode(request))
+                    self._user_data_connected.add(exchange_id)
+                    if adapter.heartbeat_interval:
+                        background_tasks.append(asyncio.create_task(self._send_heartbeats(adapter, websocket)))
+                    if adapter.keepalive_interval:
+                        background_tasks.append(asyncio.create_task(self._keep_user_data_alive(adapter)))
+                    # Seeded after subscribing, so pushes that race with the snapshot are not lost (see BalanceBook.seed)
+                    background_tasks.append(asyncio.create_task(self._seed_balances(exchange_id)))
+                    while True:
+                        message = await websocket.recv(decode=False)
+                        attempt = 0
+                        for event in adapter.parse(message):
+                            self._on_user_data_event(event)
+            except Exception as e:
+                delay = self._reconnect_delay(attempt)
+                attempt += 1
+                logger.error(f"{exchange_id} user data stream error: {e}. Order and balance reads fall back to REST; reconnecting in {delay:.1f} seconds...")
+            finally:
+                # Updates may be missed until the next connection is seeded again
+                self._user_data_connected.discard(exchange_id)
+                self.balance_book.set_live(exchange_id, False)
+                for task in background_tasks:
+                    task.cancel()
+            await adapter.close()
+            await asyncio.sleep(delay)
+
+    async def _keep_user_data_alive(self, adapter):
+        while True:
+            await asyncio.sleep(adapter.keepalive_interval)
+            try:
+                await adapter.keepalive()
+            except Exception as e:
+                logger.warning(f"{adapter.exchange_id} user data keepalive failed: {e}")
+
+    async def _seed_balances(self, exchange_id):
+        if self.balance_source is None:
+            return
+        requested_at = self.balance_book.sequence
+        try:
+            snapshot = await self.balance_source.fetch_balance_snapshot(exchange_id)
+        except Exception as e:
+            logger.error(f"Could not seed {exchange_id} balances: {e}. Balances are read over REST until the stream reconnects.")
+            return
+        if exchange_id in self._user_data_connected:
+            self.balance_book.seed(exchange_id, snapshot, requested_at)
+            logger.info(f"{exchange_id} balance book seeded with {len(snapshot.get('free') or {})} assets.")
+
+    def _on_user_data_event(self, event):
+        self.user_data_counts[event.exchange] = self.user_data_counts.get(event.exchange, 0) + 1
+        if type(event) is BalanceUpdate:
+            self.balance_book.apply(event)
+            return
+        key = (event.exchange, event.order_id)
+        self.order_updates.pop(key, None) # Re-insert so the dict stays ordered by last update
+        self.order_updates[key] = event
+        if len(self.order_updates) > self.order_update_cache_size:
+            del self.order_updates[next(iter(self.order_updates))]
+        for future in self._order_waiters.pop(key, ()):
+            if not future.done():
+                future.set_result(event)
+        for listener in self.order_listeners:
+            try:
+                listener(event)
+            except Exception as e:
+                logger.error(f"Order listener failed on {event.exchange} order {event.order_id}: {e}")
+
+    def is_user_data_live(self, exchange_id):
+        """True while the exchange's private stream is connected, i.e. pushed order updates can be trusted."""
+        return exchange_id in self._user_data_connected
+
+    def get_order_update(self, exchange_id, order_id):
+        """Latest pushed OrderUpdate for an order, or None if none was seen."""
+        return self.order_updates.get((exchange_id, str(order_id)))
+
+    async def wait_for_order_update(self, exchange_id, order_id, timeout=None):
+        """Latest pushed update for an order, waiting up to timeout (default order_update_wait_seconds) for the first one. None on timeout."""
+        timeout = self.order_update_wait if timeout is None else timeout
+        key = (exchange_id, str(order_id))
+        update = self.order_updates.get(key)
+        if update is not None or not self.is_user_data_live(exchange_id):
+            return update
+        future = asyncio.get_running_loop().create_future()
+        self._order_waiters.setdefault(key, []).append(future)
+        try:
+            return await asyncio.wait_for(future, timeout)
+        except asyncio.TimeoutError:
+            return None
+        finally:
+            waiters = self._order_waiters.get(key)
+            if waiters is not None and future in waiters:
+                waiters.remove(future)
+                if not waiters:
+                    del self._order_waiters[key]
+
+    def subscribe_orders(self, callback):
+        """Registers callback(order_update), called inline for every pushed OrderUpdate."""
+        self.order_listeners.append(callback)
+
+    def unsubscribe_orders(self, callback):
+        if callback in self.order_listeners:
+            self.order_listeners.remove(callback)
+
+    def _on_feed_event(self, adapter, event, source=None):
+        """Routes one normalized event. Returns False when the adapter has to re-subscribe to resync a book.
+
+        source identifies the connection the event arrived on; with redundant
+        connections the first copy of each update wins and later copies are
+        counted in duplicate_counts and dropped.
+        """
+        event_type = type(event)
+        if event_type is Tick:
+            if source is not None and self.feed_redundancy > 1 and self._is_duplicate_tick(event, source):
+                return True
+            self._publish_tick(event, adapter.exchange_timestamps)
+        elif event_type is BookDelta:
+            return self._on_book_delta(adapter, event, source)
+        elif event_type is BookSnapshot:
+            if source is not None and self.feed_redundancy > 1:
+                if self._is_stale_snapshot(event, source):
+                    return True
+                self._book_sources[(event.exchange, event.symbol)] = source
+            self._on_book_snapshot(event)
+        return True
+
+    def _is_duplicate_tick(self, tick, source):
+        """True when another live connection already delivered this update (or a newer one).
+
+        An older update id from the connection that delivered the last tick is a
+        venue reset rather than a copy, and once that connection is gone the
+        next one takes over, so neither is mistaken for a duplicate.
+
+        Ticks without update ids (Kraken) cannot be ordered, so the connection
+        that delivered the last tick keeps the symbol until it has been silent
+        for feed_failover_ms; a primary that stays connected but stops sending
+        then hands over to whichever standby is still delivering.
+        """
+        key = (tick.exchange, tick.symbol)
+        last = self._tick_sources.get(key)
+        if last is not None and last[1] != source and last[1] in self._live_sources:
+            if tick.update_id:
+                duplicate = tick.update_id <= last[0]
+            else:
+                duplicate = (tick.recv_ts - last[2]) * 1000 <= self.feed_failover_ms
+            if duplicate:
+                self.duplicate_counts[tick.exchange] = self.duplicate_counts.get(tick.exchange, 0) + 1
+                return True
+        self._tick_sources[key] = (tick.update_id, source, tick.recv_ts)
+        return False
+
+    def _is_stale_snapshot(self, snapshot, source):
+        """True for a snapshot the book is already past, e.g. the one a standby receives when it reconnects."""
+        book = self.order_books.get(snapshot.exchange, {}).get(snapshot.symbol)
+        if book is None or not book.synced or snapshot.update_id > book.last_update_id:
+            return False
+        book_source = self._book_sources.get((snapshot.exchange, snapshot.symbol))
+        if book_source == source or book_source not in self._live_sources:
+            return False
+        self.duplicate_counts[snapshot.exchange] = self.duplicate_counts.get(snapshot.exchange, 0) + 1
+        return True
+
+    def _publish_tick(self, tick, exchange_timestamp=True):
+        exchange_id = tick.exchange
+        self.quote_store.update(exchange_id, tick.symbol, tick)
+        if self.journal is not None:
+            self.journal.record(tick)
+        if self.feed_latency_monitor is not None:
+            self.feed_latency_monitor.record_tick(exchange_id, tick.symbol, tick.recv_ts, tick.timestamp if exchange_timestamp else None)
+        count = self.update_counts[exchange_id] = self.update_counts.get(exchange_id, 0) + 1
+        if count % 100 == 0: # Log every 100 updates
+            logger.info(f"{exchange_id} update for {tick.symbol}: Bid={tick.bid}, Ask={tick.ask}. Total updates: {count}")
+
+    def _get_or_create_book(self, exchange_id, symbol):
+        books = self.order_books.setdefault(exchange_id, {})
+        book = books.get(symbol)
+        if book is None:
+            book = books[symbol] = LocalOrderBook(exchange_id, symbol)
+        return book
+
+    def _on_book_delta(self, adapter, delta, source=None):
+        """Applies a delta to the local book, starting a resync when it does not continue the sequence.
+
+        Copies of a delta from redundant connections are already covered by the
+        book's last update id, so only the first one is applied (or journaled).
+        """
+        book = self._get_or_create_book(delta.exchange, delta.symbol)
+        if source is not None and self.feed_redundancy > 1 and book.synced and delta.final_update_id <= book.last_update_id:
+            self.duplicate_counts[delta.exchange] = self.duplicate_counts.get(delta.exchange, 0) + 1
+            return True
+        if delta.timestamp and self.record_feed_lag and self.feed_latency_monitor is not None:
+            self.feed_latency_monitor.record_lag(delta.exchange, delta.symbol, time.time() * 1000 - delta.timestamp)
+        if self.journal is not None:
+            self.journal.record(delta)
+        was_synced = book.synced
+        last_update_id = book.last_update_id
+        if was_synced and book.apply_diff(delta.first_update_id, delta.final_update_id, delta.bids, delta.asks):
+            if book.last_update_id != last_update_id:
+                if delta.max_depth:
+                    book.truncate(delta.max_depth)
+                if source is not None and self.feed_redundancy > 1:
+                    self._book_sources[(delta.exchange, delta.symbol)] = source
+            return True
+
+        if not adapter.snapshot_via_rest:
+            # The venue pushes a new snapshot after a re-subscribe; until then deltas have nothing to apply to
+            return not was_synced
+        key = (delta.exchange, delta.symbol)
+        self.depth_buffers.setdefault(key, []).append(delta)
+        resync_task = self.depth_resync_tasks.get(key)
+        if resync_task is None or resync_task.done():
+            self.depth_resync_tasks[key] = asyncio.create_task(self._resync_order_book(adapter, book))
+        return True
+
+    def _on_book_snapshot(self, snapshot):
+        if self.journal is not None:
+            self.journal.record(snapshot)
+        book = self._get_or_create_book(snapshot.exchange, snapshot.symbol)
+        book.apply_snapshot(snapshot.bids, snapshot.asks, snapshot.update_id)
+        if snapshot.max_depth:
+            book.truncate(snapshot.max_depth)
+        self.depth_resync_counts[snapshot.exchange] = self.depth_resync_counts.get(snapshot.exchange, 0) + 1
+        logger.debug(f"{snapshot.exchange} order book for {snapshot.symbol} synced at update {snapshot.update_id}.")
+
+    async def _resync_order_book(self, adapter, book):
+        """Rebuilds a book from a REST snapshot and replays the deltas buffered since the snapshot was requested."""
+        exchange_id, symbol = book.exchange, book.symbol
+        while True:
+            try:
+                snapshot = await adapter.fetch_snapshot(symbol)
+                if self.journal is not None:
+                    self.journal.record(snapshot)
+                book.apply_snapshot(snapshot.bids, snapshot.asks, snapshot.update_id)
+                buffered = self.depth_buffers.pop((exchange_id, symbol), [])
+                if all(book.apply_diff(delta.first_update_id, delta.final_update_id, delta.bids, delta.asks) for delta in buffered):
+                    self.depth_resync_counts[exchange_id] = self.depth_resync_counts.get(exchange_id, 0) + 1
+                    logger.info(f"{exchange_id} order book for {symbol} synced at update {book.last_update_id} ({len(buffered)} buffered diffs replayed).")
+                    return
+                # Snapshot is older than the buffered diffs (or a diff was missed); keep buffering and retry
+                logger.warning(f"{exchange_id} order book for {symbol} could not be bridged from snapshot. Retrying...")
+            except Exception as e:
+                logger.error(f"Failed to fetch {exchange_id} depth snapshot for {symbol}: {e}. Retrying in 1 second...")
+            await asyncio.sleep(1)
+
+    async def _connect_binance_ticker_arr_ws(self):
         """Connects to Binance native WebSocket and subscribes to all-ticker stream."""
         stream_name = "!ticker@arr"
         uri = f"{self.binance_ws_url}{stream_name}"
         logger.info(f"Connecting to Binance native WebSocket: {uri}")
-
+        attempt = 0
         while True:
             try:
                 async with websockets.connect(uri) as websocket:
                     logger.info(f"Connected to Binance native WebSocket: {uri}")
                     while True:
-                        message = await websocket.recv()
-                        data = json.loads(message)
-                        if "data" in data and isinstance(data["data"], list):
-                            for ticker_data in data["data"]:
+                        message = await websocket.recv(decode=False)
+                        attempt = 0
+                        data = self.json_loads(message)
+                        # The raw /ws/ endpoint sends a bare array, the combined endpoint wraps it in "data"
+                        if isinstance(data, dict):
+                            data = data.get("data")
+                        if isinstance(data, list):
+                            for ticker_data in data:
                                 symbol = ticker_data["s"] # Symbol, e.g., BTCUSDT
-                                if symbol in self.trade_symbols:
-                                    async with self.lock:
-                                        self.market_data.setdefault("binance", {})[symbol] = {
-                                            "bid": float(ticker_data["b"]),
-                                            "ask": float(ticker_data["a"]),
-                                            "timestamp": ticker_data["E"],
-                                            "datetime": datetime.fromtimestamp(ticker_data["E"] / 1000).isoformat(),
-                                            "high": float(ticker_data["h"]),
-                                            "low": float(ticker_data["l"]),
-                                            "volume": float(ticker_data["v"]),
-                                            "quoteVolume": float(ticker_data["q"]),
-                                            "info": ticker_data,
-                                            "bids": [],
-                                            "asks": []
-                                        }
-                                    self.binance_update_count += 1
-                                    if self.binance_update_count % 100 == 0: # Log every 100 updates
-                                        logger.info(f"Binance native WS update for {symbol}: Bid={ticker_data['b']}, Ask={ticker_data['a']}. Total updates: {self.binance_update_count}")
+                                if symbol in self.trade_symbol_set:
+                                    self._publish_tick(Tick(
+                                        "binance",
+                                        symbol,
+                                        float(ticker_data["b"]),
+                                        float(ticker_data["a"]),
+                                        float(ticker_data["B"]),
+                                        float(ticker_data["A"]),
+                                        ticker_data["E"],
+                                        ticker_data.get("L", 0),
+                                        time.monotonic(),
+                                        ticker_data if self.retain_raw else None,
+                                    ))
             except Exception as e:
-                logger.error(f"Binance native WebSocket error: {e}. Reconnecting in 5 seconds...")
-                await asyncio.sleep(5)
+                delay = self._reconnect_delay(attempt)
+                attempt += 1
+                logger.error(f"Binance native WebSocket error: {e}. Reconnecting in {delay:.1f} seconds...")
+                await asyncio.sleep(delay)
+
+    def _start_feed_processes(self):
+        """Spawns worker processes that parse top-of-book shards of every native feed and write quotes into shared memory."""
+        exchanges = list(self.feed_adapters)
+        self.shared_quote_table = SharedQuoteTable(exchanges, self.trade_symbols)
+        context = multiprocessing.get_context("spawn")
+        for shard in self._shard_symbols(self.trade_symbols, self.feed_shard_processes):
+            process = context.Process(
+                target=_run_feed_shard_process,
+                args=(self.config, exchanges, shard, self.shared_quote_table.name, self.trade_symbols),
+                daemon=True,
+            )
+            process.start()
+            self.feed_processes.append(process)
+        logger.info(f"Started {len(self.feed_processes)} feed worker process(es) for {', '.join(exchanges)} on shared quote table {self.shared_quote_table.name}.")
+
+    async def _drain_shared_quote_table(self):
+        """Publishes quotes written by the feed worker processes into the quote store."""
+        table = self.shared_quote_table
+        last_seqs = np.zeros(table.table.shape, dtype=table.table["seq"].dtype)
+        poll_interval = self.performance_config.get("feed_shared_poll_interval", 0.001)
+        while True:
+            exchange_indices, symbol_indices = table.changed_slots(last_seqs)
+            for exchange_idx, symbol_idx in zip(exchange_indices.tolist(), symbol_indices.tolist()):
+                values = table.read_slot(exchange_idx, symbol_idx)
+                if values is None:
+                    continue
+                _, bid, ask, bid_qty, ask_qty, timestamp, update_id = values
+                exchange_id = table.exchanges[exchange_idx]
+                symbol = table.symbols[symbol_idx]
+                # Worker-side receive times are not comparable across processes, so only local receive time is recorded
+                self._publish_tick(Tick(exchange_id, symbol, bid, ask, bid_qty, ask_qty, timestamp, update_id, time.monotonic()), False)
+            await asyncio.sleep(poll_interval)
 
     async def _connect_and_subscribe(self, exchange_id, exchange_config):
-        """Connects to exchange WebSocket using CCXT and subscribes to tickers with retry logic."""
+        """Connects to exchange WebSocket using CCXT and subscribes to tickers, retrying with backoff until it succeeds."""
         retries = 0
-        max_retries = 5
-        while retries < max_retries:
+        alert_after = 5
+        while True:
             try:
                 exchange_class = getattr(ccxt, exchange_id)
                 exchange = exchange_class({
@@ -104,49 +548,122 @@ class WebSocketManager:
                 return # Exit loop on successful connection
 
             except Exception as e:
+                delay = self._reconnect_delay(retries)
                 retries += 1
-                delay = 2 ** retries # Exponential backoff
-                logger.error(f"Failed to connect or subscribe to {exchange_id} WebSocket (Attempt {retries}/{max_retries}): {e}. Retrying in {delay} seconds...")
+                logger.error(f"Failed to connect or subscribe to {exchange_id} WebSocket (attempt {retries}): {e}. Retrying in {delay:.1f} seconds...")
+                if retries == alert_after:
+                    logger.critical(f"Still unable to connect to {exchange_id} WebSocket after {retries} attempts. Please check API keys and network access.")
+                failed_client = self.exchange_ws_clients.pop(exchange_id, None)
+                if failed_client is not None:
+                    try:
+                        await failed_client.close() # Every attempt builds a new client, so never leak the old one's sessions
+                    except Exception as close_error:
+                        logger.debug(f"Closing failed {exchange_id} client: {close_error}")
                 await asyncio.sleep(delay)
-        logger.critical(f"Failed to connect to {exchange_id} WebSocket after {max_retries} attempts. Please check API keys and network access.")
 
     async def _watch_ticker(self, exchange, exchange_id, symbol):
         """Watches ticker data for a given exchange and symbol using CCXT."""
+        attempt = 0
         while True:
             try:
                 ticker = await exchange.watch_ticker(symbol)
-                async with self.lock:
-                    self.market_data.setdefault(exchange_id, {})[symbol] = {
-                        "bid": ticker["bid"],
-                        "ask": ticker["ask"],
-                        "timestamp": ticker["timestamp"],
-                        "datetime": ticker["datetime"],
-                        "high": ticker["high"],
-                        "low": ticker["low"],
-                        "volume": ticker["baseVolume"],
-                        "quoteVolume": ticker["quoteVolume"],
-                        "info": ticker["info"],
-                        "bids": [],
-                        "asks": []
-                    }
-                self.bybit_update_count += 1
-                if self.bybit_update_count % 100 == 0: # Log every 100 updates
-                    logger.info(f"Updated {symbol} on {exchange_id}: Bid={ticker['bid']}, Ask={ticker['ask']}. Total updates: {self.bybit_update_count}")
+                attempt = 0
+                self._publish_tick(Tick(
+                    exchange_id,
+                    symbol,
+                    ticker["bid"],
+                    ticker["ask"],
+                    ticker.get("bidVolume") or 0.0,
+                    ticker.get("askVolume") or 0.0,
+                    ticker["timestamp"] or int(time.time() * 1000),
+                    0,
+                    time.monotonic(),
+                    ticker["info"] if self.retain_raw else None,
+                ), ticker["timestamp"] is not None)
             except Exception as e:
-                logger.error(f"Error watching ticker for {symbol} on {exchange_id}: {e}")
-                await asyncio.sleep(5)
+                delay = self._reconnect_delay(attempt)
+                attempt += 1
+                logger.error(f"Error watching ticker for {symbol} on {exchange_id}: {e}. Retrying in {delay:.1f} seconds...")
+                await asyncio.sleep(delay)
+
+    def get_order_book(self, exchange_id, symbol):
+        """Returns the synced local order book for exchange/symbol, or None if there is none yet."""
+        book = self.order_books.get(exchange_id, {}).get(symbol)
+        if book is None or not book.synced:
+            return None
+        return book
+
+    def set_feed_latency_monitor(self, monitor):
+        self.feed_latency_monitor = monitor
+
+    def subscribe(self, callback):
+        """Registers callback(exchange_id, symbol), called inline after every quote update."""
+        self.quote_store.add_listener(callback)
+
+    def unsubscribe(self, callback):
+        self.quote_store.remove_listener(callback)
+
+    def get_market_data(self, exchange_id, symbol):
+        return self.quote_store.get(exchange_id, symbol)
 
     async def get_latest_market_data(self, exchange_id, symbol):
         logger.debug(f"Attempting to retrieve market data for {symbol} on {exchange_id}")
-        async with self.lock:
-            return self.market_data.get(exchange_id, {}).get(symbol, None)
+        return self.quote_store.get(exchange_id, symbol)
+
+    def get_exchange_market_data(self, exchange_id):
+        """Lock-free bulk read: {symbol: latest quote} for every symbol on one exchange."""
+        return self.quote_store.get_exchange(exchange_id)
 
     async def close(self):
         logger.info("Stopping WebSocket Manager...")
+        for task in self.feed_tasks + list(self.depth_resync_tasks.values()):
+            task.cancel()
+        self.feed_tasks = []
+        self.depth_resync_tasks = {}
+        for process in self.feed_processes:
+            process.terminate()
+            process.join(timeout=5)
+        self.feed_processes = []
+        if self.shared_quote_table is not None:
+            self.shared_quote_table.close()
+            self.shared_quote_table = None
+        if self.journal is not None:
+            await asyncio.to_thread(self.journal.close)
         for exchange_id, client in self.exchange_ws_clients.items():
             if client and hasattr(client, 'close'):
                 await client.close()
                 logger.info(f"Closed CCXT WebSocket client for {exchange_id}.")
+        for adapter in self.user_data_adapters.values():
+            await adapter.close()
         logger.info("WebSocket Manager stopped.")
 
 
+def _run_feed_shard_process(config, exchanges, shard_symbols, table_name, table_symbols):
+    """Worker process entry point: runs top-of-book-only native feeds for one shard of symbols
+    and mirrors every quote into the shared quote table owned by the parent process."""
+    shard_config = dict(config)
+    shard_config["EXCHANGES"] = {exchange_id: config["EXCHANGES"][exchange_id] for exchange_id in exchanges}
+    shard_config["TRADING_CONFIG"] = dict(config["TRADING_CONFIG"], trade_symbols=list(shard_symbols))
+    # Depth stays with the parent, which also journals whatever it drains from the table
+    shard_config["PERFORMANCE_CONFIG"] = dict(config["PERFORMANCE_CONFIG"], feed_shard_processes=0,
+                                              feed_depth_enabled=False, journal_enabled=False,
+                                              user_data_enabled=False)
+    table = SharedQuoteTable.attach(table_name, exchanges, table_symbols)
+    manager = WebSocketManager(shard_config)
+
+    def mirror_quote(exchange_id, symbol):
+        tick = manager.get_market_data(exchange_id, symbol)
+        table.write(exchange_id, symbol, tick.bid, tick.ask, tick.bid_qty, tick.ask_qty, tick.timestamp, tick.update_id)
+
+    manager.subscribe(mirror_quote)
+
+    async def run():
+        await manager.start()
+        await asyncio.gather(*manager.feed_tasks)
+
+    try:
+        asyncio.run(run())
+    except KeyboardInterrupt:
+        pass
+    finally:
+        table.close()